@@ -27,6 +27,7 @@ const TicketList = ({ setComponent }) => {
   const { setSelectedTicketNumber } = useTicket();
   const { setTab } = useTabRouter();
   const [tickets, setTickets] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [date, setDate] = useState({
     start_date: getTodayLocalDate(),
     end_date: getTodayLocalDate(),
@@ -37,25 +38,31 @@ const TicketList = ({ setComponent }) => {
   const startOfMonth = (year, month) => dateToISO(new Date(year, month, 1));
   const endOfMonth = (year, month) => dateToISO(new Date(year, month + 1, 0));
 
-  useEffect(() => {
-    const fetchTickets = async () => {
-      try {
-        const response = await fetch(
-          `/api/read/tickets?start_date=${date.start_date}&end_date=${date.end_date}`,
-        );
+  const fetchTickets = async (cursor = null) => {
+    try {
+      const params = new URLSearchParams({
+        start_date: date.start_date,
+        end_date: date.end_date,
+      });
+      if (cursor) params.set("cursor", cursor);
 
-        const data = await response.json();
-        if (data.success) {
-          setTickets(data.tickets);
-          console.log("Fetched tickets:", data.tickets);
-        } else {
-          console.error("Failed to fetch tickets:", data.message);
-        }
-      } catch (error) {
-        console.error("Error fetching tickets:", error);
+      const response = await fetch(`/api/read/tickets?${params.toString()}`);
+
+      const data = await response.json();
+      if (data.success) {
+        setTickets((prev) =>
+          cursor ? [...(prev || []), ...data.tickets] : data.tickets,
+        );
+        setNextCursor(data.next_cursor);
+      } else {
+        console.error("Failed to fetch tickets:", data.message);
       }
-    };
+    } catch (error) {
+      console.error("Error fetching tickets:", error);
+    }
+  };
 
+  useEffect(() => {
     fetchTickets();
   }, [date]);
 
@@ -225,6 +232,14 @@ const TicketList = ({ setComponent }) => {
         ) : (
           <p className={styles.noTickets}>No Tickets for this date range</p>
         )}
+        {nextCursor && (
+          <button
+            className={styles.loadMore}
+            onClick={() => fetchTickets(nextCursor)}
+          >
+            Load More
+          </button>
+        )}
       </div>
     </div>
   );
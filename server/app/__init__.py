@@ -1,23 +1,38 @@
 from flask import Flask
 from config import Config
 from app.extensions import db, bcrypt, cors, login_manager, mail, migrate
-from app.models import User
+from app.utils.principal import principals
 from app.logger import setup_logger
+from app.utils.request_stats import request_stats
+from app.utils.json_provider import json_provider_class
+from app.utils.redis_store import redis_store
+from app.utils.redis_session import session_interface_class
+from app.utils.db_pool import pool_monitor
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class) 
+    app.json = json_provider_class(app.config.get("JSON_PROVIDER", "orjson"))(app)
     
     logger = setup_logger("cerberus")
     app.logger.handlers = logger.handlers
     app.logger.setLevel(logger.level)
     
+    pool_monitor.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     cors.init_app(app)
     login_manager.init_app(app)
     mail.init_app(app)
+    request_stats.init_app(app)
+    redis_store.init_app(app)
+    
+    session_type = app.config.get("SESSION_TYPE", "redis")
+    if session_type == "redis" and not app.config["REDIS_URL"]:
+        app.logger.warning("[SESSION]: REDIS_URL is empty, using signed cookie sessions")
+        session_type = "cookie"
+    app.session_interface = session_interface_class(session_type)()
     
     from app.api import api
     app.register_blueprint(api)
@@ -25,6 +40,7 @@ def create_app(config_class=Config):
     
     @login_manager.user_loader
     def load_user(id):
-        return db.session.get(User, id)
+        # compact cached principal, routes call current_user.hydrate() for the ORM User
+        return principals.load(id)
     
     return app
\ No newline at end of file
@@ -6,6 +6,8 @@ from .read import reader
 from .delete import deleter
 from .reports import reporter
 from .bootstrap import bootstrapper
+from .debug import debugger
+from .jobs import tasker
 
 api = Blueprint("api", __name__, url_prefix="/api")
 
@@ -15,4 +17,6 @@ api.register_blueprint(updator, url_prefix="/update")
 api.register_blueprint(reader, url_prefix="/read")
 api.register_blueprint(deleter, url_prefix="/delete")
 api.register_blueprint(reporter, url_prefix="/reports")
-api.register_blueprint(bootstrapper, url_prefix="/bootstrap")
\ No newline at end of file
+api.register_blueprint(bootstrapper, url_prefix="/bootstrap")
+api.register_blueprint(debugger, url_prefix="/debug")
+api.register_blueprint(tasker, url_prefix="/jobs")
\ No newline at end of file
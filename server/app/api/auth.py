@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.models import User, Ticket, DepartmentEnum, Location
-from app.extensions import db, bcrypt
+from app.extensions import db
+from app.services.password_service import passwords, PasswordsBusy
+from app.utils.redis_session import persist_session
 from flask_login import login_user, logout_user, login_required, current_user
 
 authorizer = Blueprint("auth", __name__)
@@ -42,6 +44,12 @@ def register():
     
     
     
+    try:
+        pw_hash = passwords.hash(pw)
+    except PasswordsBusy:
+        current_app.logger.error(f"[REGISTRATION ERROR]: timed out waiting to hash a password for {email}")
+        return jsonify(success=False, message="Server is busy, please try again"), 503
+    
     new_user = User(
         first_name=first_name,
         last_name=last_name,
@@ -49,7 +57,7 @@ def register():
         department=department_enum.value,
         location_id=location.id,
         is_admin=is_admin,
-        password_hash=bcrypt.generate_password_hash(pw).decode("utf-8")
+        password_hash=pw_hash
     )
     
     try:
@@ -77,11 +85,27 @@ def login():
         current_app.logger.error(f"[LOGIN ERROR]: invalid email has been entered -> {email}")
         return jsonify(success=False, message="Could not find user with this email, please check inputs and try again"), 401
     
-    if not bcrypt.check_password_hash(user.password_hash, pw):
-        current_app.logger.error(f"[LOGIN ERROR]: Invalid password has been entered for {email}")
-        return jsonify(success=False, message="Invalid credentials"), 401
+    try:
+        if not passwords.verify(user.password_hash, pw):
+            current_app.logger.error(f"[LOGIN ERROR]: Invalid password has been entered for {email}")
+            return jsonify(success=False, message="Invalid credentials"), 401
+    except PasswordsBusy:
+        current_app.logger.error(f"[LOGIN ERROR]: timed out waiting for a password check for {email}")
+        return jsonify(success=False, message="Too many logins at once, please try again"), 503
+    
+    # bring hashes made at an older cost up to BCRYPT_LOG_ROUNDS
+    if passwords.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = passwords.hash(pw)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"[LOGIN REHASH ERROR]: {e}")
     
     login_user(user)
+    if not persist_session():
+        logout_user()
+        return jsonify(success=False, message="Could not start a session, please try again"), 503
     current_app.logger.info(f"{user.first_name} {user.last_name} has logged in.")
     return jsonify(success=True, message=f"Logged in as {user.first_name}", user=user.serialize()), 200
 
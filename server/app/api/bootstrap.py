@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.models import User, Location, DepartmentEnum
-from app.extensions import db, bcrypt
+from app.extensions import db
+from app.services.password_service import passwords, PasswordsBusy
 
 bootstrapper = Blueprint("bootstrap", __name__)
 
@@ -38,6 +39,12 @@ def run_bootstrap():
     except ValueError:
         return jsonify(success=False, message="Invalid department"), 400
     
+    try:
+        pw_hash = passwords.hash(data["admin"]["password"])
+    except PasswordsBusy:
+        current_app.logger.error("[BOOTSTRAP ERROR]: timed out waiting to hash the admin password")
+        return jsonify(success=False, message="Server is busy, please try again"), 503
+    
     admin = User(
         email=data["admin"]["email"],
         first_name=str(data["admin"]["first_name"]).title(),
@@ -45,7 +52,7 @@ def run_bootstrap():
         department=department,
         is_admin=True,
         location=location,
-        password_hash=bcrypt.generate_password_hash(data["admin"]["password"]).decode("utf-8")
+        password_hash=pw_hash
     )
     
     db.session.add_all([location, admin])
@@ -1,11 +1,16 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
-from app.models import User, Ticket, Transaction, LineItem, Location, TaxRate, Deduction, SalesCategoryEnum, TaxabilitySourceEnum, PaymentTypeEnum
-from app.models.services.tax_rules import determine_taxability
+from app.models import User, Ticket, Transaction, LineItem, Location, TaxRate, Deduction, TaxabilityOverride, SalesCategoryEnum, TaxabilitySourceEnum, PaymentTypeEnum
 from app.extensions import db
 from datetime import datetime, date as DTdate
 from app.utils.tools import to_int, to_cents, finalize_ticket, finalize_transaction
-from sqlalchemy import select
+from app.utils.totals import compute_line_item_rows
+from app.services.rollup_service import refresh_rollups
+from app.services.report_cache import report_cache
+from app.services.tax_rate_service import tax_rates
+from app.services.taxability_service import taxability_rules
+from sqlalchemy import select, insert
+from sqlalchemy.orm import selectinload
 
 creator = Blueprint("create", __name__)
 
@@ -57,6 +62,7 @@ def create_location():
     try:
         db.session.add_all([new_location, initial_tax])
         db.session.commit()
+        tax_rates.invalidate()
         current_app.logger.info(f"[NEW LOCATION ADDED]: {current_user.first_name} {current_user.last_name} added a new location: {name} | tax rate: {current_tax_rate}")
         return jsonify(success=True, message=f"New location {name}, has been added", new_location=new_location.serialize()), 201
     except Exception as e:
@@ -134,26 +140,23 @@ def create_ticket():
     # -------------------
     # Create line items and attach
     # -------------------
-    for li_data in data.get("line_items", []):
+    raw_line_items = data.get("line_items", [])
+    pairs = []
+    for li_data in raw_line_items:
         try:
-            category = SalesCategoryEnum(li_data["category"])
-            payment_type = PaymentTypeEnum(li_data["payment_type"])
+            pairs.append((SalesCategoryEnum(li_data["category"]), PaymentTypeEnum(li_data["payment_type"])))
         except ValueError:
             return jsonify(success=False, message="Invalid sales category or payment type"), 400
 
-        taxable, tax_source = determine_taxability(
-            category=category,
-            payment_type=payment_type,
-            location=location
-        )
-
+    rules = taxability_rules.resolve_many(pairs, location.id)
+    for li_data, (category, payment_type), (taxable, tax_source) in zip(raw_line_items, pairs, rules):
         line_item = LineItem(
             category=category,
             payment_type=payment_type,
             unit_price=to_int(li_data["unit_price"]),
             taxable=taxable,
             taxability_source=tax_source,
-            tax_rate=location.current_tax_rate or 0,
+            tax_rate=tax_rates.line_item_rate(location, ticket_date),
             is_return=bool(li_data.get("is_return", False))
         )
 
@@ -169,7 +172,9 @@ def create_ticket():
     try:
         db.session.add(ticket)
         finalize_ticket(ticket)
+        keys = refresh_rollups([transaction])
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         current_app.logger.info(
             f"[NEW TICKET]: {user.first_name} {user.last_name} added ticket #{ticket.ticket_number}"
         )
@@ -186,6 +191,235 @@ def create_ticket():
 
 
 
+# ----------------------------
+# Create tickets in bulk
+# ----------------------------
+def parse_unit_price(value):
+    """Integer cents from an int, a whole float or a numeric string; None for anything else"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def parse_bulk_ticket(data, locations, user_ids, taken, seen):
+    """
+    Validate one bulk ticket payload against the pre-fetched lookups.
+    Returns (ticket, None) or (None, error message).
+    """
+    if not isinstance(data, dict):
+        return None, "Ticket must be an object"
+
+    ticket_number = to_int(data.get("ticket_number"))
+    if ticket_number <= 0:
+        return None, "Invalid ticket number"
+    if ticket_number in taken:
+        return None, f"Ticket Number {ticket_number} already in use."
+    if ticket_number in seen:
+        return None, f"Ticket Number {ticket_number} appears more than once in this batch."
+
+    try:
+        ticket_date = datetime.strptime(
+            data.get("date", datetime.today().date().isoformat()), "%Y-%m-%d"
+        ).date()
+    except (TypeError, ValueError):
+        return None, "Invalid date"
+
+    location = locations.get(to_int(data.get("location_id")))
+    if not location:
+        return None, "Invalid location"
+    user_id = to_int(data.get("user_id"))
+    if user_id not in user_ids:
+        return None, "User not found"
+
+    raw_line_items = data.get("line_items", [])
+    if not isinstance(raw_line_items, list):
+        return None, "line_items must be a list"
+
+    parsed = []
+    for li_data in raw_line_items:
+        try:
+            category = SalesCategoryEnum(li_data["category"])
+            payment_type = PaymentTypeEnum(li_data["payment_type"])
+        except (KeyError, TypeError, ValueError):
+            return None, "Invalid sales category or payment type"
+
+        unit_price = parse_unit_price(li_data.get("unit_price"))
+        if unit_price is None:
+            return None, "Invalid unit price, expected whole cents"
+        parsed.append((category, payment_type, unit_price, bool(li_data.get("is_return", False))))
+
+    rules = taxability_rules.resolve_many([(category, payment_type) for category, payment_type, *_ in parsed], location.id)
+    tax_rate = tax_rates.line_item_rate(location, ticket_date)
+    line_items = [
+        {
+            "category": category,
+            "payment_type": payment_type,
+            "unit_price": unit_price,
+            "taxable": taxable,
+            "taxability_source": tax_source,
+            "tax_rate": tax_rate,
+            "is_return": is_return,
+        }
+        for (category, payment_type, unit_price, is_return), (taxable, tax_source) in zip(parsed, rules)
+    ]
+
+    return {
+        "ticket_number": ticket_number,
+        "ticket_date": ticket_date,
+        "location_id": location.id,
+        "user_id": user_id,
+        "line_items": line_items,
+    }, None
+
+
+def total_bulk_tickets(tickets):
+    """Batch compute line items, then the same sums as Transaction.compute_total()"""
+    compute_line_item_rows(li for t in tickets for li in t["line_items"])
+    for t in tickets:
+        t["units"] = t["subtotal"] = t["tax_total"] = t["total"] = 0
+        for li in t["line_items"]:
+            sign = -1 if li["is_return"] else 1
+            t["units"] += 1
+            t["subtotal"] += sign * li["unit_price"]
+            t["tax_total"] += sign * li["tax_amount"]
+            t["total"] += sign * li["total"]
+
+
+@creator.route("/tickets/bulk", methods=["POST"])
+@login_required
+def create_tickets_bulk():
+    """
+    payload: {"tickets": [<same payload as /ticket>, ...]}
+    
+    Every ticket is validated before anything is written. If any ticket fails
+    nothing is saved and the per-ticket results say why; otherwise everything
+    is written with executemany inserts in a single transaction.
+    """
+    data = request.get_json(silent=True) or {}
+    payloads = data.get("tickets") if isinstance(data, dict) else data
+    if not isinstance(payloads, list) or not payloads:
+        return jsonify(success=False, message="tickets must be a non-empty list"), 400
+
+    max_tickets = current_app.config.get("BULK_TICKET_MAX", 1000)
+    if len(payloads) > max_tickets:
+        return jsonify(success=False, message=f"A maximum of {max_tickets} tickets can be posted at once"), 400
+
+    # -------------------
+    # Resolve lookups once
+    # -------------------
+    objects = [p for p in payloads if isinstance(p, dict)]
+    location_ids = {to_int(p.get("location_id")) for p in objects}
+    user_ids = {to_int(p.get("user_id")) for p in objects}
+    numbers = {to_int(p.get("ticket_number")) for p in objects}
+
+    locations = {
+        location.id: location
+        for location in db.session.scalars(select(Location).where(Location.id.in_(location_ids)))
+    }
+    user_ids = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+    taken = set(db.session.scalars(select(Ticket.ticket_number).where(Ticket.ticket_number.in_(numbers))))
+
+    # -------------------
+    # Validate everything up front
+    # -------------------
+    tickets = []
+    results = []
+    seen = set()
+    for index, payload in enumerate(payloads):
+        ticket, error = parse_bulk_ticket(payload, locations, user_ids, taken, seen)
+        number = payload.get("ticket_number") if isinstance(payload, dict) else None
+        if error:
+            results.append({"index": index, "ticket_number": number, "success": False, "message": error})
+            continue
+        seen.add(ticket["ticket_number"])
+        tickets.append(ticket)
+        results.append({"index": index, "ticket_number": ticket["ticket_number"], "success": True})
+
+    if len(tickets) != len(payloads):
+        failed = len(payloads) - len(tickets)
+        return jsonify(
+            success=False,
+            message=f"{failed} of {len(payloads)} tickets are invalid, nothing was saved.",
+            results=results
+        ), 400
+
+    # -------------------
+    # Bulk insert
+    # -------------------
+    try:
+        total_bulk_tickets(tickets)
+        db.session.execute(insert(Ticket), [
+            {
+                "ticket_number": t["ticket_number"],
+                "ticket_date": t["ticket_date"],
+                "location_id": t["location_id"],
+                "user_id": t["user_id"],
+                "subtotal": t["subtotal"],
+                "tax_total": t["tax_total"],
+                "total": t["total"],
+            }
+            for t in tickets
+        ])
+        ticket_ids = dict(db.session.execute(
+            select(Ticket.ticket_number, Ticket.id).where(Ticket.ticket_number.in_(seen))
+        ).all())
+
+        db.session.execute(insert(Transaction), [
+            {
+                "ticket_id": ticket_ids[t["ticket_number"]],
+                "user_id": t["user_id"],
+                "location_id": t["location_id"],
+                "posted_date": t["ticket_date"],
+                "units": t["units"],
+                "subtotal": t["subtotal"],
+                "tax_total": t["tax_total"],
+                "total": t["total"],
+            }
+            for t in tickets
+        ])
+        # every new ticket has exactly one transaction
+        transaction_ids = dict(db.session.execute(
+            select(Transaction.ticket_id, Transaction.id).where(Transaction.ticket_id.in_(ticket_ids.values()))
+        ).all())
+
+        line_items = [
+            {**li, "transaction_id": transaction_ids[ticket_ids[t["ticket_number"]]]}
+            for t in tickets
+            for li in t["line_items"]
+        ]
+        if line_items:
+            db.session.execute(insert(LineItem), line_items)
+
+        keys = refresh_rollups({(t["ticket_date"], t["location_id"], t["user_id"]) for t in tickets})
+        db.session.commit()
+        report_cache.invalidate_sales(keys)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"[BULK TICKET ERROR]: {e}")
+        return jsonify(success=False, message="There was an error when submitting tickets"), 500
+
+    for result in results:
+        result["ticket_id"] = ticket_ids[result["ticket_number"]]
+
+    current_app.logger.info(
+        f"[BULK TICKETS]: {current_user.first_name} {current_user.last_name} added {len(tickets)} tickets"
+    )
+    return jsonify(
+        success=True,
+        message=f"{len(tickets)} tickets added successfully!",
+        results=results
+    ), 201
+
+
 # ----------------------------
 # Add a new transaction to an existing ticket
 # ----------------------------
@@ -211,7 +445,7 @@ def add_transaction(ticket_id):
     
     """
     data = request.get_json()
-    ticket = db.session.get(Ticket, ticket_id)
+    ticket = db.session.get(Ticket, ticket_id, options=[selectinload(Ticket.transactions)])
     if not ticket:
         return jsonify(success=False, message="Ticket not found"), 404
     location = db.session.get(Location, int(data["location_id"]))
@@ -237,26 +471,23 @@ def add_transaction(ticket_id):
     #---------------
     # Create line items
     #---------------
-    for li in data.get("line_items", []):
+    raw_line_items = data.get("line_items", [])
+    pairs = []
+    for li in raw_line_items:
         try:
-            category = SalesCategoryEnum(li["category"])
-            payment_type = PaymentTypeEnum(li["payment_type"])
+            pairs.append((SalesCategoryEnum(li["category"]), PaymentTypeEnum(li["payment_type"])))
         except ValueError:
             return jsonify(success=False, message="Invalid sales category")
-        
-        taxable, tax_source = determine_taxability(
-            category=category,
-            location=location,
-            payment_type=payment_type
-        )
-        
+    
+    rules = taxability_rules.resolve_many(pairs, location.id)
+    for li, (category, payment_type), (taxable, tax_source) in zip(raw_line_items, pairs, rules):
         line_item = LineItem(
             category=category,
             payment_type=payment_type,
             unit_price=li["unit_price"],
             taxable=taxable,
             taxability_source=tax_source,
-            tax_rate=location.current_tax_rate or 0,
+            tax_rate=tax_rates.line_item_rate(location, posted_date),
             is_return=li.get("is_return", False)
         )
         # append line items to transaction
@@ -266,7 +497,9 @@ def add_transaction(ticket_id):
         db.session.add(transaction)
         finalize_transaction(transaction)
         ticket.compute_total()
+        keys = refresh_rollups([transaction])
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         return jsonify(
             success=True,
             message="Transaction added successfully",
@@ -306,9 +539,73 @@ def create_deduction():
     try:
         db.session.add(deduction)
         db.session.commit()
+        report_cache.invalidate_deductions([(date_obj, current_user.location_id, current_user.id)])
         current_app.logger.info(f"[DEDUCTION CREATED]: {current_user.first_name} {current_user.last_name} created deduction {deduction.id}")
         return jsonify(success=True, message="Deduction submitted!", deduction=deduction.serialize()), 201
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"[DEDUCTION CREATION ERROR]: {e}")
         return jsonify(success=False, message="Error submitting deduction."), 500
+
+
+# ----------------------------
+# Create a per-location taxability override
+# ----------------------------
+@creator.route("/taxability_override", methods=["POST"])
+@login_required
+def create_taxability_override():
+    """
+    payload example:
+    
+    {
+        "location_id": 1,
+        "category": "delivery",      # optional, null = every category
+        "payment_type": "snap",      # optional, null = every payment type
+        "taxable": false
+    }
+    """
+    if not current_user.is_admin:
+        return jsonify(success=False, message="Unauthorized"), 403
+    
+    data = request.get_json()
+    location = db.session.get(Location, to_int(data.get("location_id")))
+    if not location:
+        return jsonify(success=False, message="Invalid location"), 404
+    if not isinstance(data.get("taxable"), bool):
+        return jsonify(success=False, message="taxable must be true or false"), 400
+    
+    try:
+        category = SalesCategoryEnum(data["category"]) if data.get("category") else None
+        payment_type = PaymentTypeEnum(data["payment_type"]) if data.get("payment_type") else None
+    except ValueError:
+        return jsonify(success=False, message="Invalid sales category or payment type"), 400
+    
+    # the unique constraint doesn't catch NULLs on every database
+    existing = db.session.query(TaxabilityOverride).filter(
+        TaxabilityOverride.location_id == location.id,
+        TaxabilityOverride.category.is_(None) if category is None else TaxabilityOverride.category == category,
+        TaxabilityOverride.payment_type.is_(None) if payment_type is None else TaxabilityOverride.payment_type == payment_type,
+    ).first()
+    if existing:
+        return jsonify(success=False, message="An override for this rule already exists"), 409
+    
+    override = TaxabilityOverride(
+        location_id=location.id,
+        category=category,
+        payment_type=payment_type,
+        taxable=data["taxable"]
+    )
+    
+    try:
+        db.session.add(override)
+        db.session.commit()
+        taxability_rules.invalidate()
+        current_app.logger.info(
+            f"[TAXABILITY OVERRIDE]: {current_user.first_name} {current_user.last_name} set {location.name} "
+            f"{category or 'all categories'} / {payment_type or 'all payment types'} taxable={override.taxable}"
+        )
+        return jsonify(success=True, message="Taxability override added", override=override.serialize()), 201
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"[TAXABILITY OVERRIDE ERROR]: {e}")
+        return jsonify(success=False, message="Error adding taxability override"), 500
@@ -0,0 +1,53 @@
+from flask import Blueprint, jsonify, current_app
+from flask_login import login_required, current_user
+from app.extensions import db
+from app.utils.db_pool import pool_monitor
+
+debugger = Blueprint("debug", __name__)
+
+
+#-------------------------
+# Request stats
+#-------------------------
+@debugger.route("/stats", methods=["GET"])
+@login_required
+def request_stats():
+    """Rolling per-route latency, SQL and size stats for this worker process"""
+    if not current_user.is_admin:
+        return jsonify(success=False, message="Unauthorized"), 403
+
+    stats = current_app.extensions.get("request_stats")
+    if stats is None:
+        return jsonify(success=False, message="Request stats are disabled"), 404
+
+    return jsonify(success=True, window=stats.window, routes=stats.snapshot()), 200
+
+
+@debugger.route("/stats", methods=["DELETE"])
+@login_required
+def reset_request_stats():
+    if not current_user.is_admin:
+        return jsonify(success=False, message="Unauthorized"), 403
+
+    stats = current_app.extensions.get("request_stats")
+    if stats is None:
+        return jsonify(success=False, message="Request stats are disabled"), 404
+
+    stats.reset()
+    current_app.logger.info(f"[DEBUG STATS]: {current_user.first_name} reset request stats")
+    return jsonify(success=True, message="Request stats reset"), 200
+
+
+
+#-------------------------
+# DB pool
+#-------------------------
+@debugger.route("/pool", methods=["GET"])
+@login_required
+def pool_stats():
+    """Connection pool usage and checkout waits for this worker process"""
+    if not current_user.is_admin:
+        return jsonify(success=False, message="Unauthorized"), 403
+
+    pools = {bind or "default": pool_monitor.snapshot(engine) for bind, engine in db.engines.items()}
+    return jsonify(success=True, pools=pools), 200
@@ -2,7 +2,11 @@
 from flask import Blueprint, jsonify, current_app
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models import Ticket, Deduction, Transaction, LineItem, User
+from app.models import Ticket, Deduction, Transaction, LineItem, User, TaxabilityOverride
+from app.services.rollup_service import refresh_rollups
+from app.services.report_cache import report_cache
+from app.services.taxability_service import taxability_rules
+from app.utils.principal import principals
 
 deleter = Blueprint("delete", __name__)
 
@@ -17,8 +21,11 @@ def delete_ticket(ticket_id):
         return jsonify(success=False, message="Ticket not found"), 404
 
     try:
+        transactions = list(ticket.transactions)
         db.session.delete(ticket)
+        keys = refresh_rollups(transactions)
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         current_app.logger.info(f"[TICKET DELETE] {current_user.first_name} deleted ticket {ticket_id}")
         return jsonify(success=True, message="Ticket deleted successfully."), 200
     except Exception as e:
@@ -40,13 +47,16 @@ def delete_transaction(transaction_id):
     try:
         ticket = transaction.ticket
         
+        # removing it from the ticket deletes it through the delete-orphan cascade
         if ticket:
             ticket.transactions.remove(transaction)
-        db.session.delete(transaction)
-        if ticket:
             ticket.compute_total()
+        else:
+            db.session.delete(transaction)
+        keys = refresh_rollups([transaction])
             
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         current_app.logger.info(f"[TRANSACTION DELETED] {current_user.first_name} deleted transaction {transaction_id}")
         return jsonify(success=True, message="Transaction deleted successfully."), 200
     except Exception as e:
@@ -78,8 +88,10 @@ def delete_line_item(line_item_id):
             transaction.compute_total()
         if ticket:
             ticket.compute_total()
+        keys = refresh_rollups([transaction]) if transaction else set()
         
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         current_app.logger.info(
             f"[LINE ITEM DELETE] {current_user.first_name} deleted line item {line_item_id} from transaction {transaction_id}"
         )
@@ -101,9 +113,12 @@ def delete_deduction(deduction_id):
     if not deduction:
         return jsonify(success=False, message="Deduction not found"), 404
 
+    cache_keys = [(deduction.date, deduction.user.location_id, deduction.user_id)]
+
     try:
         db.session.delete(deduction)
         db.session.commit()
+        report_cache.invalidate_deductions(cache_keys)
         current_app.logger.info(f"[DEDUCTION DELETE] {current_user.first_name} deleted deduction {deduction_id}")
         return jsonify(success=True, message="Deduction deleted successfully."), 200
     except Exception as e:
@@ -125,9 +140,35 @@ def delete_user(user_id):
     try:
         db.session.delete(user)
         db.session.commit()
+        principals.invalidate(user_id)
         current_app.logger.info(f"[USER DELETE] {current_user.first_name} deleted user {user_id}")
         return jsonify(success=True, message="User deleted successfully."), 200
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"[USER DELETE ERROR] {e}")
-        return jsonify(success=False, message="Error deleting user."), 500
\ No newline at end of file
+        return jsonify(success=False, message="Error deleting user."), 500
+
+
+#-------------------
+# DELETE TAXABILITY OVERRIDE
+#-------------------
+@deleter.route("/taxability_override/<int:override_id>", methods=["DELETE"])
+@login_required
+def delete_taxability_override(override_id):
+    if not current_user.is_admin:
+        return jsonify(success=False, message="Unauthorized"), 403
+
+    override = db.session.get(TaxabilityOverride, override_id)
+    if not override:
+        return jsonify(success=False, message="Override not found"), 404
+
+    try:
+        db.session.delete(override)
+        db.session.commit()
+        taxability_rules.invalidate()
+        current_app.logger.info(f"[TAXABILITY OVERRIDE DELETE] {current_user.first_name} deleted override {override_id}")
+        return jsonify(success=True, message="Taxability override deleted."), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"[TAXABILITY OVERRIDE DELETE ERROR] {e}")
+        return jsonify(success=False, message="Error deleting taxability override."), 500
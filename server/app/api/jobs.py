@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required, current_user
+from app.services.jobs import job_runner
+
+tasker = Blueprint("jobs", __name__)
+
+
+#-------------------------
+# Job status
+#-------------------------
+@tasker.route("/<job_id>", methods=["GET"])
+@login_required
+def get_job(job_id):
+    job = job_runner.get(job_id)
+    if not job or (job.user_id != current_user.id and not current_user.is_admin):
+        return jsonify(success=False, message="Job not found"), 404
+    return jsonify(success=True, job=job.serialize()), 200
@@ -1,20 +1,86 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
-from app.models import Ticket, LineItem, Transaction, Deduction, User, Location
+from app.models import Ticket, LineItem, Transaction, Deduction, User, Location, TaxabilityOverride, DepartmentEnum
+from app.models.load_plans import load_plan
 from app.extensions import db
-from datetime import datetime
-from sqlalchemy.orm import selectinload
+from app.utils.tools import encode_cursor, decode_cursor
+from app.services.ticket_detail_service import fetch_ticket_detail
+from app.utils.json_provider import stream_json
+from datetime import datetime, date
+from sqlalchemy import tuple_, select, func, case
+import calendar
+import csv
+import io
+import json
 
 reader = Blueprint("reader", __name__)
 
 
+def paginate_tickets(query):
+    """
+    Keyset pagination over (ticket_date, ticket_number).
+    
+    Reads ?limit= and ?cursor= from the request and returns
+    (tickets, next_cursor, limit). next_cursor is None on the last page.
+    Raises ValueError on a bad limit or cursor.
+    """
+    default_size = current_app.config.get("TICKET_PAGE_SIZE", 100)
+    max_size = current_app.config.get("TICKET_PAGE_SIZE_MAX", 500)
+    
+    try:
+        limit = int(request.args.get("limit", default_size))
+    except ValueError:
+        raise ValueError("limit must be a number")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    limit = min(limit, max_size)
+    
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            after_date, after_number = decode_cursor(cursor)
+            after_date = datetime.strptime(after_date, "%Y-%m-%d").date()
+            after_number = int(after_number)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        query = query.filter(
+            tuple_(Ticket.ticket_date, Ticket.ticket_number) > tuple_(after_date, after_number)
+        )
+    
+    # one extra row tells us whether there is another page
+    tickets = (
+        query
+        .order_by(Ticket.ticket_date.asc(), Ticket.ticket_number.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        next_cursor = encode_cursor(last.ticket_date, last.ticket_number)
+    
+    return tickets, next_cursor, limit
+
+
+def serialize_ticket(ticket):
+    return ticket.serialize(include_relationships=True)
+
+
+def should_stream(tickets):
+    """Stream ticket pages once they reach JSON_STREAM_MIN_ITEMS (0 turns it off)"""
+    threshold = current_app.config.get("JSON_STREAM_MIN_ITEMS", 0)
+    return bool(threshold) and len(tickets) >= threshold
+
+
 # ----------------------------
 # GET SINGLE LOCATION
 # ----------------------------
 @reader.route("/location/<int:location_id>", methods=["GET"])
 @login_required
 def get_location(location_id):
-    location = db.session.get(Location, location_id)
+    location = db.session.get(Location, location_id, options=load_plan("location_card"))
     if not location:
         return jsonify(success=False, message="Location not found."), 404
     return jsonify(success=True, location=location.serialize()), 200
@@ -25,17 +91,31 @@ def get_location(location_id):
 #-------------------
 @reader.route("/locations", methods=["GET"])
 def get_locations():
-    locations = db.session.query(Location).order_by(Location.name.asc()).all()
+    locations = db.session.query(Location).options(*load_plan("location_card")).order_by(Location.name.asc()).all()
     return jsonify(success=True, locations=[l.serialize() for l in locations]), 200
 
 
+#-------------------
+# GET TAXABILITY OVERRIDES
+#-------------------
+@reader.route("/taxability_overrides", methods=["GET"])
+@login_required
+def get_taxability_overrides():
+    query = db.session.query(TaxabilityOverride)
+    location_id = request.args.get("location_id", type=int)
+    if location_id:
+        query = query.filter(TaxabilityOverride.location_id == location_id)
+    overrides = query.order_by(TaxabilityOverride.location_id, TaxabilityOverride.id).all()
+    return jsonify(success=True, overrides=[o.serialize() for o in overrides]), 200
+
+
 #-------------------
 # GET SINGLE USER
 #-------------------
 @reader.route("/user/<int:id>", methods=["GET"])
 @login_required
 def get_user(id):
-    user = db.session.get(User, id)
+    user = db.session.get(User, id, options=load_plan("user_card"))
     if not user:
         return jsonify(success=False, message="User not found"), 404
     
@@ -51,7 +131,7 @@ def get_user(id):
 @reader.route("/users", methods=["GET"])
 @login_required
 def get_users():
-    users = db.session.query(User).filter(User.terminated == False).order_by(User.last_name, User.first_name).all()
+    users = db.session.query(User).options(*load_plan("user_card")).filter(User.terminated == False).order_by(User.last_name, User.first_name).all()
     return jsonify(success=True, users=[u.serialize() for u in users]), 200
 
 
@@ -62,23 +142,22 @@ def get_users():
 @login_required
 def get_ticket(ticket_number):
     try:
-        ticket = db.session.query(Ticket)\
-            .options(selectinload(Ticket.transactions).selectinload(Transaction.line_items))\
-            .filter_by(ticket_number=ticket_number).first()
+        ticket = fetch_ticket_detail(ticket_number)
         if not ticket:
             return jsonify(success=False, message="Ticket not found"), 404
-        return jsonify(success=True, ticket=ticket.serialize(include_relationships=True)), 200
+        return jsonify(success=True, ticket=ticket), 200
     except Exception as e:
         current_app.logger.error(f"[TICKET QUERY ERROR]: {e}")
         return jsonify(success=False, message="Error when fetching ticket"), 500
 
+
 #-------------------
 # GET TICKETS BY USER AND DATE RANGE
 #-------------------
 @reader.route("/tickets/user/<int:user_id>", methods=["GET"])
 @login_required
 def get_tickets_by_user_date_range(user_id):
-    user = db.session.get(User, user_id)
+    user = db.session.get(User, user_id, options=load_plan("user_card"))
     if not user:
         return jsonify(success=False, message="User not found."), 404
     
@@ -104,23 +183,32 @@ def get_tickets_by_user_date_range(user_id):
     if start_date > end_date:
         return jsonify(success=False, message="Start date must be before End Date")
     
-    tickets = (
+    query = (
         db.session.query(Ticket)
-        .options(
-            selectinload(Ticket.transactions).selectinload("line_items")
-        )
+        .options(*load_plan("ticket_detail"))
         .filter(
             Ticket.user_id == user_id,
             Ticket.ticket_date.between(start_date, end_date),
         )
-        .order_by(Ticket.ticket_date.asc(), Ticket.ticket_number.asc())
-        .all()
     )
     
+    try:
+        tickets, next_cursor, page_size = paginate_tickets(query)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e) or "Invalid pagination parameters"), 400
+    
+    if should_stream(tickets):
+        return stream_json(
+            "tickets", [serialize_ticket(t) for t in tickets],
+            success=True, user=user.serialize(), next_cursor=next_cursor, page_size=page_size
+        )
+    
     return jsonify(
         success=True,
         user=user.serialize(),
-        tickets=[t.serialize(include_relationships=True) for t in tickets]
+        tickets=[serialize_ticket(t) for t in tickets],
+        next_cursor=next_cursor,
+        page_size=page_size
     ), 200
     
     
@@ -149,26 +237,215 @@ def get_tickets_by_date_range():
     if start_date > end_date:
         return jsonify(success=False, message="Start date must be before End Date")
     
-    tickets = (
+    query = (
         db.session.query(Ticket)
-        .options(
-            selectinload(Ticket.transactions).selectinload(Transaction.line_items)
-        )
+        .options(*load_plan("ticket_detail"))
         .filter(
             Ticket.ticket_date.between(start_date, end_date),
         )
-        .order_by(Ticket.ticket_date.asc(), Ticket.ticket_number.asc())
-        .all()
     )
     
+    try:
+        tickets, next_cursor, page_size = paginate_tickets(query)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e) or "Invalid pagination parameters"), 400
+    
+    if should_stream(tickets):
+        return stream_json(
+            "tickets", [serialize_ticket(t) for t in tickets],
+            success=True, next_cursor=next_cursor, page_size=page_size
+        )
+    
     return jsonify(
         success=True,
-        tickets=[t.serialize(include_relationships=True) for t in tickets]
+        tickets=[serialize_ticket(t) for t in tickets],
+        next_cursor=next_cursor,
+        page_size=page_size
     ), 200
 
     
 
     
+#-------------------
+# EXPORT TICKETS IN A DATE RANGE
+#-------------------
+EXPORT_COLUMNS = [
+    "ticket_id", "ticket_number", "ticket_date", "ticket_location_id", "ticket_user_id",
+    "ticket_subtotal", "ticket_tax_total", "ticket_total",
+    "transaction_id", "posted_date", "transaction_location_id", "transaction_user_id",
+    "units", "transaction_subtotal", "transaction_tax_total", "transaction_total",
+    "line_item_id", "category", "payment_type", "unit_price", "taxable",
+    "taxability_source", "tax_rate", "tax_amount", "line_item_total", "is_return",
+]
+
+
+def export_rows(start_date, end_date, user_id=None, location_id=None):
+    """
+    Flat ticket/transaction/line item rows streamed from a server side cursor.
+    Plain rows, no ORM objects, so memory stays flat however long the range is.
+    """
+    stmt = (
+        select(
+            Ticket.id, Ticket.ticket_number, Ticket.ticket_date, Ticket.location_id, Ticket.user_id,
+            Ticket.subtotal, Ticket.tax_total, Ticket.total,
+            Transaction.id, Transaction.posted_date, Transaction.location_id, Transaction.user_id,
+            Transaction.units, Transaction.subtotal, Transaction.tax_total, Transaction.total,
+            LineItem.id, LineItem.category, LineItem.payment_type, LineItem.unit_price, LineItem.taxable,
+            LineItem.taxability_source, LineItem.tax_rate, LineItem.tax_amount, LineItem.total, LineItem.is_return,
+        )
+        .outerjoin(Transaction, Transaction.ticket_id == Ticket.id)
+        .outerjoin(LineItem, LineItem.transaction_id == Transaction.id)
+        .where(Ticket.ticket_date.between(start_date, end_date))
+        .order_by(Ticket.ticket_date, Ticket.ticket_number, Transaction.id, LineItem.id)
+    )
+    if user_id:
+        stmt = stmt.where(Ticket.user_id == user_id)
+    if location_id:
+        stmt = stmt.where(Ticket.location_id == location_id)
+        
+    yield_per = current_app.config.get("EXPORT_YIELD_PER", 1000)
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=yield_per))
+    for row in result:
+        row = dict(zip(EXPORT_COLUMNS, row))
+        for key in ("ticket_date", "posted_date"):
+            if row[key] is not None:
+                row[key] = row[key].isoformat()
+        for key in ("category", "payment_type", "taxability_source"):
+            if row[key] is not None:
+                row[key] = str(row[key])
+        # same percentage form as LineItem.serialize
+        row["tax_rate"] = float(row["tax_rate"]) * 100 if row["tax_rate"] else None
+        yield row
+
+
+def export_ndjson(rows):
+    """One ticket per line, transactions and line items nested like the listing endpoints"""
+    ticket = None
+    transaction = None
+    
+    for row in rows:
+        if ticket is None or ticket["id"] != row["ticket_id"]:
+            if ticket is not None:
+                yield json.dumps(ticket) + "\n"
+            ticket = {
+                "id": row["ticket_id"],
+                "ticket_number": row["ticket_number"],
+                "ticket_date": row["ticket_date"],
+                "location_id": row["ticket_location_id"],
+                "user_id": row["ticket_user_id"],
+                "subtotal": row["ticket_subtotal"],
+                "tax_total": row["ticket_tax_total"],
+                "total": row["ticket_total"],
+                "transactions": [],
+            }
+            transaction = None
+            
+        if row["transaction_id"] is None:
+            continue
+        if transaction is None or transaction["id"] != row["transaction_id"]:
+            transaction = {
+                "id": row["transaction_id"],
+                "posted_date": row["posted_date"],
+                "location_id": row["transaction_location_id"],
+                "user_id": row["transaction_user_id"],
+                "units": row["units"],
+                "subtotal": row["transaction_subtotal"],
+                "tax_total": row["transaction_tax_total"],
+                "total": row["transaction_total"],
+                "line_items": [],
+            }
+            ticket["transactions"].append(transaction)
+            
+        if row["line_item_id"] is None:
+            continue
+        transaction["line_items"].append({
+            "id": row["line_item_id"],
+            "category": row["category"],
+            "payment_type": row["payment_type"],
+            "unit_price": row["unit_price"],
+            "taxable": row["taxable"],
+            "taxability_source": row["taxability_source"],
+            "tax_rate": row["tax_rate"],
+            "tax_amount": row["tax_amount"],
+            "total": row["line_item_total"],
+            "is_return": row["is_return"],
+        })
+        
+    if ticket is not None:
+        yield json.dumps(ticket) + "\n"
+
+
+def export_csv(rows, flush_every=500):
+    """One line item per row, ticket and transaction columns repeated"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    
+    for n, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if n % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            
+    yield buffer.getvalue()
+
+
+@reader.route("/export/tickets", methods=["GET"])
+@login_required
+def export_tickets():
+    """
+    PARAMS
+    start_date: YYYY-MM-DD
+    end_date: YYYY-MM-DD
+    format: ndjson | csv
+    user_id: int (optional)
+    location_id: int (optional)
+    """
+    start_date_str = request.args.get("start_date")
+    end_date_str = request.args.get("end_date")
+    export_format = request.args.get("format", "ndjson").lower()
+    
+    if export_format not in ["ndjson", "csv"]:
+        return jsonify(success=False, message="Invalid format, use ndjson or csv"), 400
+    
+    if not start_date_str:
+        return jsonify(success=False, message="Start date is required"), 400
+    
+    try:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+        end_date = (
+            datetime.strptime(end_date_str, "%Y-%m-%d").date()
+            if end_date_str
+            else start_date
+        )
+        user_id = int(request.args["user_id"]) if request.args.get("user_id") else None
+        location_id = int(request.args["location_id"]) if request.args.get("location_id") else None
+    except ValueError:
+        return jsonify(success=False, message="Invalid date format or filter. Use YYYY-MM-DD"), 400
+    
+    if start_date > end_date:
+        return jsonify(success=False, message="Start date must be before End Date"), 400
+    
+    current_app.logger.info(
+        f"[TICKET EXPORT]: {current_user.first_name} {current_user.last_name} exported {start_date} -> {end_date} as {export_format}"
+    )
+    
+    rows = export_rows(start_date, end_date, user_id=user_id, location_id=location_id)
+    filename = f"tickets_{start_date.isoformat()}_{end_date.isoformat()}.{export_format}"
+    
+    if export_format == "csv":
+        body, mimetype = export_csv(rows), "text/csv"
+    else:
+        body, mimetype = export_ndjson(rows), "application/x-ndjson"
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+    
 #-------------------
 # GET DEDUCTIONS BY USER AND DATE RANGE
 #-------------------
@@ -176,7 +453,7 @@ def get_tickets_by_date_range():
 @reader.route("/deductions/user/<int:user_id>", methods=["GET"])
 @login_required
 def get_deductions_by_user_date_range(user_id):
-    user = db.session.get(User, user_id)
+    user = db.session.get(User, user_id, options=load_plan("user_card"))
     if not user or user.terminated:
         return jsonify(success=False, message="User not found or terminated."), 404
     
@@ -202,6 +479,7 @@ def get_deductions_by_user_date_range(user_id):
     
     deductions = (
         db.session.query(Deduction)
+        .options(*load_plan("deduction_list"))
         .filter(
             Deduction.user_id == user_id,
             Deduction.date.between(start_date, end_date)
@@ -230,6 +508,7 @@ def get_deductions_today(user_id):
 
     deductions = (
         db.session.query(Deduction)
+        .options(*load_plan("deduction_list"))
         .filter(
             Deduction.user_id == user_id,
             Deduction.date == today
@@ -250,12 +529,13 @@ def get_deductions_today(user_id):
 @reader.route("/deductions/user/<int:user_id>/all", methods=["GET"])
 @login_required
 def get_all_deductions_by_user(user_id):
-    user = db.session.get(User, user_id)
+    user = db.session.get(User, user_id, options=load_plan("user_card"))
     if not user or user.terminated:
         return jsonify(success=False, message="User not found or terminated."), 404
     
     deductions = (
         db.session.query(Deduction)
+        .options(*load_plan("deduction_list"))
         .filter(Deduction.user_id == user_id)
         .order_by(Deduction.date.asc())
         .all()
@@ -272,18 +552,6 @@ def get_all_deductions_by_user(user_id):
 @reader.route("/monthly_totals", methods=["GET"])
 @login_required
 def get_monthly_totals():
-    users = (
-        db.session.query(User)
-        .filter_by(terminated=False)
-        .options(
-            selectinload(User.transactions).selectinload(Transaction.line_items),
-            selectinload(User.deductions)
-        )
-        .all()
-    )
-    
-    
-    
     month_str = request.args.get("month")
     year_str = request.args.get("year")
     
@@ -297,20 +565,56 @@ def get_monthly_totals():
     
     department_filter = request.args.get("department")
     
-    totals = []
-    
-    for u in users:
-        if department_filter and department_filter.lower() != "all":
-            if str(u.department) != department_filter:
-                continue
-        totals.append({
-            "id": u.id,
-            "first_name": u.first_name,
-            "last_name": u.last_name,
-            "department": u.department,
-            "total": u.month_to_date_total(year, month)
-        })
-        
-    totals.sort(key=lambda x: x["total"], reverse=True)
+    start_date = date(year, month, 1)
+    end_date = date(year, month, calendar.monthrange(year, month)[1])
+    
+    # same as User.month_to_date_total, summed by the database for one month only
+    sales = (
+        select(
+            Transaction.user_id.label("user_id"),
+            func.sum(
+                case((LineItem.is_return == True, -func.coalesce(LineItem.total, 0)), else_=func.coalesce(LineItem.total, 0))
+            ).label("gross")
+        )
+        .join(LineItem, LineItem.transaction_id == Transaction.id)
+        .where(Transaction.posted_date.between(start_date, end_date))
+        .group_by(Transaction.user_id)
+        .subquery()
+    )
+    deductions = (
+        select(
+            Deduction.user_id.label("user_id"),
+            func.sum(Deduction.amount).label("deducted")
+        )
+        .where(Deduction.date.between(start_date, end_date))
+        .group_by(Deduction.user_id)
+        .subquery()
+    )
+    total = (func.coalesce(sales.c.gross, 0) - func.coalesce(deductions.c.deducted, 0)).label("total")
+    
+    stmt = (
+        select(User.id, User.first_name, User.last_name, User.department, total)
+        .outerjoin(sales, sales.c.user_id == User.id)
+        .outerjoin(deductions, deductions.c.user_id == User.id)
+        .where(User.terminated == False)
+        .order_by(total.desc(), User.id.asc())
+    )
     
-    return jsonify(success=True, totals=totals), 200
\ No newline at end of file
+    if department_filter and department_filter.lower() != "all":
+        try:
+            stmt = stmt.where(User.department == DepartmentEnum(department_filter))
+        except ValueError:
+            return jsonify(success=True, totals=[]), 200
+    
+    totals = [
+        {
+            "id": row.id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "department": row.department,
+            "total": int(row.total)
+        }
+        for row in db.session.execute(stmt)
+    ]
+    
+    return jsonify(success=True, totals=totals), 200
@@ -1,9 +1,12 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
 from app.services.financial_report_service import FinancialReportService
+from app.services.report_cache import report_cache
+from app.services.jobs import job_runner
 from datetime import datetime
 from app.extensions import db
 from app.models import User, Location
+from app.models.load_plans import load_plan
 
 reporter = Blueprint("reporter", __name__)
 
@@ -24,30 +27,35 @@ def serialize_location(l):
         "name": l.name
     }
 
-@reporter.route("/summary", methods=["GET"])
-@login_required
-def operations_report():
-    """  
-    PARAMS
-    start: YYYY-MM-DD
-    end: YYYY-MM-DD
-    
-    locations: int or [int]
-    users: int or [int]
-    type: str(report type)
+class SubjectNotFound(Exception):
+    """A single user/location the report is about doesn't exist"""
+
+
+def parse_ids(value, param):
+    """"1,2" (query string) or [1, 2] (JSON body) -> [1, 2]"""
+    if not value:
+        return []
+    try:
+        if isinstance(value, list):
+            return [int(v) for v in value]
+        return [int(v.strip()) for v in str(value).split(",")]
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {param}")
+
+
+def parse_report_params(params):
     """
-    # -------------------------
-    # Parse dates
-    # -------------------------
-    start_str = request.args.get("start")
-    end_str = request.args.get("end")
-    report_type = request.args.get("type", "operations")
-    
+    request.args or a JSON body -> report spec dict.
+    Raises ValueError with a message for the client.
+    """
+    report_type = params.get("type", "operations")
     if report_type not in VALID_REPORT_TYPES:
-        return jsonify(success=False, message="Invalid report type"), 400
+        raise ValueError("Invalid report type")
     
+    start_str = params.get("start")
+    end_str = params.get("end")
     if not start_str:
-        return jsonify(success=False, message="Start date is required."), 400
+        raise ValueError("Start date is required.")
     
     try:
         start_date = datetime.strptime(start_str, "%Y-%m-%d").date()
@@ -55,36 +63,32 @@ def operations_report():
             datetime.strptime(end_str, "%Y-%m-%d").date()
             if end_str else start_date
         )
-    except ValueError:
-        return jsonify(success=False, message="Invalid date format, use YYYY-MM-DD"), 400
-    
-    
-    # -------------------------
-    # Parse filters
-    # -------------------------
-    def parse_ids(param):
-        val = request.args.get(param)
-        if not val:
-            return []
-        try:
-            return [int(v.strip()) for v in val.split(",")]
-        except ValueError:
-            raise ValueError(f"Invalid {param}")
-        
-    locations = parse_ids("locations")
-    users = parse_ids("users")
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format, use YYYY-MM-DD")
     
+    return {
+        "report_type": report_type,
+        "start_date": start_date,
+        "end_date": end_date,
+        "locations": parse_ids(params.get("locations"), "locations"),
+        "users": parse_ids(params.get("users"), "users"),
+    }
+
+
+def report_subjects(report_type, locations, users):
+    """
+    Loads the report subject and the user/location labels for the meta block.
+    Raises SubjectNotFound when a single requested user or location doesn't exist.
+    """
     subject = None
     if report_type == "user_eod" and len(users) == 1:
-        subject = db.session.get(User, users[0])
+        subject = db.session.get(User, users[0], options=load_plan("user_card"))
         if not subject:
-            return jsonify(success=False, message="User not found"), 404
+            raise SubjectNotFound("User not found")
         
-    loc = None
     if report_type == "location" and len(locations) == 1:
-        loc = db.session.get(Location, locations[0])
-        if not loc:
-            return jsonify(success=False, message="Location not found"), 404
+        if not db.session.get(Location, locations[0]):
+            raise SubjectNotFound("Location not found")
         
     user_meta = []
     location_meta = []
@@ -93,6 +97,7 @@ def operations_report():
         user_meta = [
             serialize_user(u)
             for u in db.session.query(User)
+            .options(*load_plan("user_card"))
             .filter(User.id.in_(users))
             .all()
         ]
@@ -101,50 +106,133 @@ def operations_report():
         location_meta = [
             serialize_location(l)
             for l in db.session.query(Location)
+            .options(*load_plan("location_card"))
             .filter(Location.id.in_(locations))
             .all()
         ]
-   
     
-    # -------------------------
-    # Generate Report
-    # -------------------------  
-    try:
+    return subject, user_meta, location_meta
+
+
+def generate_report(report_type, start_date, end_date, locations, users):
+    """
+    {"meta": ..., "report": ...} for a parsed spec, from the report cache when possible.
+    Raises SubjectNotFound, or ValueError when the report fails validation.
+    """
+    subject, user_meta, location_meta = report_subjects(report_type, locations, users)
+    
+    backend = current_app.config.get("REPORT_BACKEND", "python")
+    cache_slot = report_cache.slot(report_cache.spec(report_type, start_date, end_date, locations, users, backend))
+    report = report_cache.get(cache_slot)
+    cached = report is not None
+    
+    if not cached:
         service = FinancialReportService(
             start_date=start_date,
             end_date=end_date,
             location_id=locations or None,
             user_ids=users or None,
             report_type=report_type,
-            subject=subject
+            subject=subject,
+            backend=backend
         )
         
         report = service.generate()
-        
+        report_cache.set(cache_slot, report)
+    
+    meta = {
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "locations": location_meta,
+        "users": user_meta,
+        "report_type": report_type,
+        "cached": cached
+    }
+    return {"meta": meta, "report": report}
+
+
+@reporter.route("/summary", methods=["GET"])
+@login_required
+def operations_report():
+    """  
+    PARAMS
+    start: YYYY-MM-DD
+    end: YYYY-MM-DD
+    
+    locations: int or [int]
+    users: int or [int]
+    type: str(report type)
+    """
+    try:
+        spec = parse_report_params(request.args)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    
+    try:
+        result = generate_report(**spec)
+    except SubjectNotFound as e:
+        return jsonify(success=False, message=str(e)), 404
     except ValueError as e:
         return jsonify(
             success=False,
             message=f"Report validation failed: {str(e)}",
             err=str(e)
         )
-        
-      
-    # -------------------------
-    # Meta data
-    # -------------------------  
-    meta = {
-        "start": start_date.isoformat(),
-        "end": end_date.isoformat(),
-        "locations": location_meta,
-        "users": user_meta,
-        "report_type": report_type
+    
+    return jsonify(success=True, **result)
+
+
+#-------------------
+# REPORT JOBS
+#-------------------
+# Large reports can outlast the request timeout. POST the same params as
+# /summary (as JSON) to run the report on the job pool, then poll
+# GET /jobs/<job_id>, optionally with ?wait=<seconds> to long-poll.
+# Identical specs submitted while one is still running share that job.
+@reporter.route("/jobs", methods=["POST"])
+@login_required
+def create_report_job():
+    """
+    payload example:
+    {
+        "type": "multi_location",
+        "start": "2026-01-01",
+        "end": "2026-06-30",
+        "locations": [1, 2, 3],
+        "users": []
     }
+    """
+    try:
+        spec = parse_report_params(request.get_json() or {})
+        report_subjects(spec["report_type"], spec["locations"], spec["users"])
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    except SubjectNotFound as e:
+        return jsonify(success=False, message=str(e)), 404
     
+    backend = current_app.config.get("REPORT_BACKEND", "python")
+    cache_spec = report_cache.spec(spec["report_type"], spec["start_date"], spec["end_date"], spec["locations"], spec["users"], backend)
     
-    return jsonify(
-        success=True,
-        meta=meta,
-        report=report
+    job = job_runner.submit(
+        "report",
+        lambda job: generate_report(**spec),
+        user_id=current_user.id,
+        dedupe_key=report_cache.key(cache_spec)
     )
+    return jsonify(success=True, message="Report queued", job=job.serialize()), 202
+
+
+@reporter.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+def get_report_job(job_id):
+    """?wait=<seconds> holds the request until the job finishes, up to REPORT_JOB_MAX_WAIT"""
+    try:
+        wait = min(float(request.args.get("wait", 0)), current_app.config.get("REPORT_JOB_MAX_WAIT", 30))
+    except ValueError:
+        return jsonify(success=False, message="wait must be a number of seconds"), 400
     
-    
\ No newline at end of file
+    # reports are shared between everyone who asked for the same spec
+    job = job_runner.wait(job_id, wait) if wait > 0 else job_runner.get(job_id)
+    if not job or job.kind != "report":
+        return jsonify(success=False, message="Job not found"), 404
+    return jsonify(success=True, job=job.serialize()), 200
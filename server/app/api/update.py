@@ -6,6 +6,12 @@ from datetime import datetime, timedelta, date
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
 from app.utils.tools import to_int
+from app.services.rollup_service import refresh_rollups
+from app.services.report_cache import report_cache
+from app.services.tax_rate_service import tax_rates
+from app.services.tax_recalc_service import recalculate_tax
+from app.services.jobs import job_runner
+from app.utils.principal import principals
 
 updator = Blueprint("update", __name__)
 
@@ -47,6 +53,7 @@ def update_user_info(user_id):
                     setattr(user, field, data[field])
 
         db.session.commit()
+        principals.invalidate(user.id)
         current_app.logger.info(f"[USER UPDATE] {current_user.id} updated user {user_id}")
         return jsonify(success=True, message="User info updated successfully", user=user.serialize()), 200
 
@@ -80,6 +87,7 @@ def update_user_termination(user_id):
     try:
         user.terminated = not bool(user.terminated)
         db.session.commit()
+        principals.invalidate(user.id)
 
         action = "terminated" if user.terminated else "reactivated"
         current_app.logger.info(f"[USER STATUS] {current_user.first_name} set user {user_id} as {action}")
@@ -109,6 +117,9 @@ def update_user_location(user_id):
     user.location = location
     try:
         db.session.commit()
+        principals.invalidate(user.id)
+        # location filtered reports group deductions by the user's current location
+        report_cache.clear()
         current_app.logger.info(f"{current_user.first_name} {current_user.last_name} updated their location to {location.name}")
         return jsonify(success=True, message="Location updated successfully", location=location.serialize()), 200
     except Exception as e:
@@ -164,6 +175,7 @@ def create_return(ticket_id):
                 unit_price=to_int(li["unit_price"]),
                 taxable=li.get("taxable", True),
                 taxability_source=tax_source,
+                tax_rate=tax_rates.line_item_rate(location, posted_date),
                 is_return=True
             )
         )
@@ -171,7 +183,9 @@ def create_return(ticket_id):
     
     try:
         db.session.add(transaction)
+        keys = refresh_rollups([transaction])
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         current_app.logger.info(f"[RETURN CREATED]: {current_user.first_name} {current_user.last_name} has processed a return for ticket# {ticket.ticket_number}")
         return jsonify(success=True, message="Return transaction created successfully!", transaction=transaction.serialize(include_relationships=True)), 201
     except Exception as e:
@@ -216,7 +230,9 @@ def update_line_item(line_item_id):
         line_item.is_return = bool(data["is_return"])
         
     try:
+        keys = refresh_rollups([line_item.transaction])
         db.session.commit()
+        report_cache.invalidate_sales(keys)
         return jsonify(success=True, message="Line item updated successfully!", line_item=line_item.serialize()), 200
     except Exception as e:
         db.session.rollback()
@@ -234,6 +250,9 @@ def update_deduction(deduction_id):
     deduction = db.session.get(Deduction, deduction_id)
     if not deduction:
         return jsonify(success=False, message="Deduction not found"), 404
+    
+    # old and new date both need invalidating
+    cache_keys = [(deduction.date, deduction.user.location_id, deduction.user_id)]
 
     amount = data.get("amount")
     reason = data.get("reason")
@@ -249,8 +268,11 @@ def update_deduction(deduction_id):
         except ValueError:
             return jsonify(success=False, message="Invalid date format. Use YYYY-MM-DD"), 400
 
+    cache_keys.append((deduction.date, deduction.user.location_id, deduction.user_id))
+
     try:
         db.session.commit()
+        report_cache.invalidate_deductions(cache_keys)
         return jsonify(success=True, message="Deduction updated successfully", deduction=deduction.serialize()), 200
     except Exception as e:
         db.session.rollback()
@@ -318,9 +340,71 @@ def update_location(location_id):
     
     try:
         db.session.commit()
+        tax_rates.invalidate()
         current_app.logger.info(f"[LOCATION UPDATED]: {current_user.first_name} {current_user.last_name} updated location '{location.name}'")
         return jsonify(success=True, message="Location has been updated!", new_location=location.serialize()), 200
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"[LOCATION UPDATE ERROR]: {e}")
-        return jsonify(success=False, message="Error when updating location"), 500
\ No newline at end of file
+        return jsonify(success=False, message="Error when updating location"), 500
+
+
+#-------------------
+# RECALCULATE TAX FOR A LOCATION
+#-------------------
+@updator.route("/location/<int:location_id>/recalculate_tax", methods=["POST"])
+@login_required
+def recalculate_location_tax(location_id):
+    """
+    Starts a background job re-stamping tax rates from the tax_rate history.
+    
+    payload example:
+    {
+        "start_date": "2026-01-01",
+        "end_date": "2026-01-31",   # optional, open ended includes future-dated tickets
+        "rate": 0.1075,             # optional, otherwise the rate in effect on each day
+        "dry_run": true             # optional, only report what would change
+    }
+    Poll GET /api/jobs/<job_id> for progress and the diff summary.
+    """
+    if not current_user.is_admin:
+        return jsonify(success=False, message="Unauthorized"), 403
+    
+    location = db.session.get(Location, location_id)
+    if not location:
+        return jsonify(success=False, message="Location not found."), 404
+    
+    data = request.get_json() or {}
+    try:
+        start_date = datetime.strptime(data["start_date"], "%Y-%m-%d").date()
+        end_date = datetime.strptime(data["end_date"], "%Y-%m-%d").date() if data.get("end_date") else None
+    except (KeyError, TypeError, ValueError):
+        return jsonify(success=False, message="start_date is required, dates must be YYYY-MM-DD"), 400
+    
+    rate = data.get("rate")
+    if rate is not None:
+        try:
+            rate = float(rate)
+            if rate < 0 or rate > 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            return jsonify(success=False, message="Invalid tax rate."), 400
+    
+    def run(job):
+        return recalculate_tax(
+            location.id, start_date, end_date,
+            rate=rate,
+            dry_run=bool(data.get("dry_run", False)),
+            chunk_size=current_app.config.get("TAX_RECALC_CHUNK_SIZE", 1000),
+            progress=lambda scanned, total, summary: job.update(
+                scanned=scanned, total=total, changed=summary["changed"]
+            )
+        )
+    
+    job = job_runner.submit("recalculate_tax", run, user_id=current_user.id)
+    current_app.logger.info(
+        f"[TAX RECALC]: {current_user.first_name} {current_user.last_name} started job {job.id} for "
+        f"{location.name} {start_date} -> {end_date or 'open'}"
+    )
+    return jsonify(success=True, message="Tax recalculation started", job=job.serialize()), 202
+
@@ -7,6 +7,12 @@ from .deductions import Deduction
 from .tax_rate import TaxRate
 from .transactions import Transaction
 from .location import Location
+from .daily_sales_rollup import DailySalesRollup, DailySalesRollupLock
+from .taxability_override import TaxabilityOverride
+from .serializers import compile_serializers
+
+# every model is imported, build the serializers once now
+compile_serializers(Base)
 
 
 
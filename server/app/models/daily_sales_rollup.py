@@ -0,0 +1,52 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Date, ForeignKey, UniqueConstraint, Index
+from .base import Base
+from .enums import SalesCategoryEnumSA, PaymentTypeEnumSA, SalesCategoryEnum, PaymentTypeEnum
+from datetime import date as DTdate
+
+class DailySalesRollup(Base):
+    """
+    Pre-summed line items, one row per
+    (date, location, user, category, payment type).
+    
+    Amounts are already signed for returns and `total` only includes tax
+    on taxable items, so any report can be answered by summing rows.
+    Maintained by app/services/rollup_service.py.
+    """
+    __tablename__ = "daily_sales_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "date", "location_id", "user_id", "category", "payment_type",
+            name="uq_daily_sales_rollup_key"
+        ),
+        Index("ix_daily_sales_rollup_user_date", "user_id", "date"),
+        Index("ix_daily_sales_rollup_location_date", "location_id", "date"),
+    )
+    
+    date: Mapped[DTdate] = mapped_column(Date, nullable=False)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    category: Mapped[SalesCategoryEnum] = mapped_column(SalesCategoryEnumSA, nullable=False)
+    payment_type: Mapped[PaymentTypeEnum] = mapped_column(PaymentTypeEnumSA, nullable=False)
+    
+    # Totals (in cents)
+    subtotal: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tax: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailySalesRollupLock(Base):
+    """
+    One row per rollup slice (date, location, user). refresh_rollups()
+    locks a slice's row before rebuilding it, so concurrent writers to the
+    same slice rebuild it one after the other instead of racing.
+    """
+    __tablename__ = "daily_sales_rollup_locks"
+    __table_args__ = (
+        UniqueConstraint("date", "location_id", "user_id", name="uq_daily_sales_rollup_lock_slice"),
+    )
+    
+    date: Mapped[DTdate] = mapped_column(Date, nullable=False)
+    location_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
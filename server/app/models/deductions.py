@@ -1,13 +1,17 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Date, ForeignKey
+from sqlalchemy import Integer, String, Date, ForeignKey, Index
 from .base import Base
 from datetime import date as DTdate
 
 class Deduction(Base):
     __tablename__ = "deductions"
+    __table_args__ = (
+        Index("ix_deductions_date", "date"),
+        Index("ix_deductions_user_date", "user_id", "date"),
+    )
     
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    user = relationship("User", back_populates="deductions", lazy="selectin")
+    user = relationship("User", back_populates="deductions", lazy="select")
     
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
     reason: Mapped[str] = mapped_column(String(300), nullable=False)
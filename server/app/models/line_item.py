@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Boolean, ForeignKey, Date, Numeric, String, event
+from sqlalchemy import Integer, Boolean, ForeignKey, Date, Numeric, String, Index, event
 from .base import Base
 from .enums import SalesCategoryEnumSA, PaymentTypeEnumSA, ProductCategoryEnumSA, TaxabilitySourceEnumSA, ProductCategoryEnum, SalesCategoryEnum, PaymentTypeEnum, TaxabilitySourceEnum
 from datetime import date as DTdate
@@ -7,10 +7,14 @@ from decimal import Decimal, ROUND_HALF_UP
 
 class LineItem(Base):
     __tablename__ = "line_items"
+    __table_args__ = (
+        # InnoDB creates this index for the foreign key itself
+        Index("ix_line_items_transaction_id", "transaction_id").ddl_if(dialect=("sqlite", "postgresql")),
+    )
     
     # Parent Transaction
     transaction_id: Mapped[int] = mapped_column(ForeignKey("transactions.id"), nullable=False)
-    transaction = relationship("Transaction", back_populates="line_items", lazy="selectin")
+    transaction = relationship("Transaction", back_populates="line_items", lazy="select")
     
     # Classification
     category: Mapped[SalesCategoryEnum] = mapped_column(SalesCategoryEnumSA, nullable=False)
@@ -48,33 +52,30 @@ class LineItem(Base):
         Computes tax amount and total.
         Assumes unit_price, taxable, tax_rate are already set
         """
-        unit_price = Decimal(self.unit_price or 0)
-        tax_rate = Decimal(str(self.tax_rate or 0))
+        self.tax_amount, self.total = LineItem.amounts(self.unit_price, self.tax_rate, self.taxable)
+    
+    @staticmethod
+    def amounts(unit_price, tax_rate, taxable):
+        """
+        (tax_amount, total) for a line item, without needing an instance.
+        Used by compute_total() and the bulk insert paths.
+        """
+        unit_price = Decimal(unit_price or 0)
+        tax_rate = Decimal(str(tax_rate or 0))
         
-        if self.taxable:
+        if taxable:
             raw_tax = unit_price * tax_rate
-            self.tax_amount = int(
+            tax_amount = int(
                 raw_tax.quantize(Decimal("1"), rounding=ROUND_HALF_UP)
             )
         else:
-            self.tax_amount = 0
+            tax_amount = 0
         
-        self.total = int(unit_price) + self.tax_amount        
+        return tax_amount, int(unit_price) + tax_amount
     
     
     ###
-    def serialize(self, include_relationships=False):
-        data = super().serialize(include_relationships=include_relationships)
-        
-        data["unit_price"] = self.unit_price 
-        data["tax_amount"] = self.tax_amount
-        data["total"] = self.total
-        
-        data["tax_rate"] = float(self.tax_rate) * 100 if self.tax_rate else None
-        data["is_return"] = self.is_return
-        data["payment_type"] = self.payment_type
-        data["category"] = self.category
-        
-        return data
-    
-    
\ No newline at end of file
+    # tax rate is sent as a percentage
+    _serialize_converters = {
+        "tax_rate": lambda tax_rate: float(tax_rate) * 100 if tax_rate else None,
+    }
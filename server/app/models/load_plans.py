@@ -0,0 +1,76 @@
+from sqlalchemy.orm import selectinload, joinedload, raiseload
+from .ticket import Ticket
+from .transactions import Transaction
+from .users import User
+from .location import Location
+from .deductions import Deduction
+
+
+#------------------
+# LOAD PLANS
+#------------------
+# Relationships on the models are plain lazy loads, so nothing is pulled in
+# unless a route asks for it. Read routes pick one of these named plans for
+# their query: every path listed is eager loaded (selectin for collections,
+# joined for single objects) and anything outside the plan raises instead of
+# quietly emitting another SELECT.
+#
+# Paths are dotted relationship names starting from the root model.
+LOAD_PLANS = {
+    "location_card": (Location, ()),
+    "user_card": (User, ("location",)),
+    "deduction_list": (Deduction, ()),
+    "ticket_detail": (Ticket, (
+        "location",
+        "user.location",
+        "transactions.line_items",
+        "transactions.location",
+        "transactions.user.location",
+    )),
+    "report_rows": (Transaction, ("line_items",)),
+}
+
+
+def _compile_plan(root, paths):
+    """Turn dotted relationship paths into loader options."""
+    options = [raiseload("*", sql_only=True)]
+
+    for path in paths:
+        model = root
+        chain = None
+        for key in path.split("."):
+            rel = model.__mapper__.relationships[key]
+            attr = getattr(model, key)
+
+            if chain is None:
+                chain = selectinload(attr) if rel.uselist else joinedload(attr)
+            else:
+                chain = chain.selectinload(attr) if rel.uselist else chain.joinedload(attr)
+
+            # anything hanging off this node that isn't in the plan raises
+            options.append(chain.raiseload("*", sql_only=True))
+            model = rel.mapper.class_
+
+        options.append(chain)
+
+    return tuple(options)
+
+
+_COMPILED_PLANS = {
+    name: _compile_plan(root, paths)
+    for name, (root, paths) in LOAD_PLANS.items()
+}
+
+
+def load_plan(name: str) -> tuple:
+    """
+    Returns the loader options for a named plan.
+
+    usage:
+        db.session.query(Ticket).options(*load_plan("ticket_detail"))
+        db.session.get(User, id, options=load_plan("user_card"))
+    """
+    try:
+        return _COMPILED_PLANS[name]
+    except KeyError:
+        raise ValueError(f"Unknown load plan: {name}")
@@ -15,18 +15,18 @@ class Location(Base):
     users = relationship(
         "User",
         back_populates="location",
-        lazy="selectin"
+        lazy="select"
     )
     
     transactions = relationship(
         "Transaction", 
         back_populates="location", 
-        lazy="selectin"
+        lazy="select"
     )
     
     tax_rates = relationship(
         "TaxRate",
         back_populates="location",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="select"
     )
\ No newline at end of file
@@ -0,0 +1,108 @@
+from enum import Enum
+from datetime import date, datetime
+from sqlalchemy import Enum as SAEnum, Date, DateTime, inspect
+from sqlalchemy.orm import configure_mappers
+
+#------------------
+# COMPILED SERIALIZERS
+#------------------
+# Base.serialize() used to walk __table__.columns and __mapper__.relationships
+# with getattr on every call, then re-scan every value for Enum/date. Here
+# that walk happens once per model: the column types and any per-model
+# overrides are turned into the source of one function that returns a dict
+# literal, which is exec'd and cached. Loaded column values are read from the
+# instance __dict__, skipping the attribute descriptor.
+#
+# Per-model hooks (class attributes on the model):
+#   _serialize_exclude        columns left out (password_hash always is)
+#   _serialize_converters     column -> fn(value), replaces the type based one
+#   _serialize_relationships  relationship -> fn(value), used with
+#                             include_relationships=True instead of
+#                             value.serialize() / [i.serialize() for i in value]
+
+ALWAYS_EXCLUDED = {"password_hash"}
+
+_compiled = {}
+
+
+def enum_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def isoformat(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def serialize_one(value):
+    return value.serialize() if value is not None else None
+
+
+def serialize_many(values):
+    return [i.serialize() for i in values] if values is not None else None
+
+
+def _column_converter(model, column):
+    override = model._serialize_converters.get(column.name)
+    if override is not None:
+        return override
+    if isinstance(column.type, SAEnum):
+        return enum_value
+    if isinstance(column.type, (Date, DateTime)):
+        return isoformat
+    return None
+
+
+def _read(key):
+    """
+    Loaded attributes straight from the instance dict, anything expired or
+    deferred goes through the attribute so it still loads
+    """
+    return f"(loaded[{key!r}] if {key!r} in loaded else obj.{key})"
+
+
+def _compile(model, include_relationships):
+    excluded = ALWAYS_EXCLUDED | set(model._serialize_exclude)
+    namespace = {}
+    fields = []
+
+    for column in model.__table__.columns:
+        if column.name in excluded:
+            continue
+        converter = _column_converter(model, column)
+        if converter is None:
+            fields.append(f"{column.name!r}: {_read(column.name)}")
+        else:
+            name = f"convert_{column.name}"
+            namespace[name] = converter
+            fields.append(f"{column.name!r}: {name}({_read(column.name)})")
+
+    if include_relationships:
+        for rel in inspect(model).relationships:
+            name = f"relation_{rel.key}"
+            namespace[name] = model._serialize_relationships.get(rel.key) or (
+                serialize_many if rel.uselist else serialize_one
+            )
+            fields.append(f"{rel.key!r}: {name}(obj.{rel.key})")
+
+    source = "def serialize(obj):\n    loaded = obj.__dict__\n    return {\n" + "".join(f"        {field},\n" for field in fields) + "    }\n"
+    exec(compile(source, f"<serializer {model.__name__}>", "exec"), namespace)
+    serializer = namespace["serialize"]
+    serializer.source = source
+    return serializer
+
+
+def compiled_serializer(model, include_relationships=False):
+    """The generated serialize function for a model, built on first use"""
+    key = (model, include_relationships)
+    serializer = _compiled.get(key)
+    if serializer is None:
+        serializer = _compiled[key] = _compile(model, include_relationships)
+    return serializer
+
+
+def compile_serializers(base):
+    """Build every model's serializers up front, once all models are imported"""
+    configure_mappers()
+    for mapper in base.registry.mappers:
+        for include_relationships in (False, True):
+            compiled_serializer(mapper.class_, include_relationships)
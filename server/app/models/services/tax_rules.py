@@ -28,19 +28,35 @@ SALES_CATEGORY_TAXABILITY = {
 }
 
 
-def determine_taxability(*, category, payment_type, location):
+def default_rule(category, payment_type):
     """
-    Returns:
-        (taxable: bool, source: TaxabilitySourceEnum)
+    The built-in rules: ACIMA is never taxed, otherwise the category decides.
     """
-    
     if payment_type == PaymentTypeEnum.ACIMA:
         return False, TaxabilitySourceEnum.PAYMENT_TYPE
 
     # Category default
     taxable = SALES_CATEGORY_TAXABILITY.get(category, False)
-    source = TaxabilitySourceEnum.PRODUCT_DEFAULT
+    return taxable, TaxabilitySourceEnum.PRODUCT_DEFAULT
 
 
+# every (category, payment type) resolved once, lookups are a single dict hit
+DEFAULT_TAXABILITY = {
+    (category, payment_type): default_rule(category, payment_type)
+    for category in SalesCategoryEnum
+    for payment_type in PaymentTypeEnum
+}
+
 
-    return taxable, source
+def determine_taxability(*, category, payment_type, location):
+    """
+    Default rules only, `location` is not used here.
+    Per-location overrides are applied by app/services/taxability_service.py.
+
+    Returns:
+        (taxable: bool, source: TaxabilitySourceEnum)
+    """
+    rule = DEFAULT_TAXABILITY.get((category, payment_type))
+    if rule is None:
+        return default_rule(category, payment_type)
+    return rule
@@ -1,9 +1,13 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Date, ForeignKey, Numeric
+from sqlalchemy import Date, ForeignKey, Numeric, Index
 from .base import Base
 
 class TaxRate(Base):
     __tablename__ = "tax_rate"
+    __table_args__ = (
+        # active rate lookup: location_id, effective_to IS NULL, newest effective_from
+        Index("ix_tax_rate_location_active", "location_id", "effective_to", "effective_from"),
+    )
     
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
     rate: Mapped[float] = mapped_column(Numeric(5, 4), nullable=False)
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Boolean, ForeignKey, UniqueConstraint
+from .base import Base
+from .enums import SalesCategoryEnumSA, PaymentTypeEnumSA, SalesCategoryEnum, PaymentTypeEnum
+
+class TaxabilityOverride(Base):
+    """
+    Per-location exception to the default taxability rules.
+    
+    A null category or payment type matches all of them; when several rules
+    match, the most specific one wins (category + payment type, then
+    category, then payment type). Compiled into a lookup table by
+    app/services/taxability_service.py.
+    """
+    __tablename__ = "taxability_overrides"
+    __table_args__ = (
+        UniqueConstraint("location_id", "category", "payment_type", name="uq_taxability_override_rule"),
+    )
+    
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
+    location = relationship("Location", lazy="select")
+    
+    category: Mapped[SalesCategoryEnum | None] = mapped_column(SalesCategoryEnumSA, nullable=True)
+    payment_type: Mapped[PaymentTypeEnum | None] = mapped_column(PaymentTypeEnumSA, nullable=True)
+    taxable: Mapped[bool] = mapped_column(Boolean, nullable=False)
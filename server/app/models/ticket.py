@@ -1,20 +1,25 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Date, ForeignKey, BigInteger, event
+from sqlalchemy import Integer, Date, ForeignKey, BigInteger, Index, event
 from .base import Base
 from datetime import date as DTdate
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # keyset pagination: ORDER BY ticket_date, ticket_number
+        Index("ix_tickets_date_number", "ticket_date", "ticket_number"),
+        Index("ix_tickets_user_date_number", "user_id", "ticket_date", "ticket_number"),
+    )
     
     ticket_number: Mapped[int] = mapped_column(BigInteger, nullable=False, unique=True)
     ticket_date: Mapped[DTdate] = mapped_column(Date, default=DTdate.today)
     
     # Relationships
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
-    location = relationship("Location", lazy="selectin")
+    location = relationship("Location", lazy="select")
     
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    user = relationship("User", back_populates="tickets", lazy="selectin")
+    user = relationship("User", back_populates="tickets", lazy="select")
     
     # Ticket total derived from transaction totals
     subtotal: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -26,7 +31,7 @@ class Ticket(Base):
         "Transaction",
         back_populates="ticket",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="select",
     )
     
     def compute_total(self):
@@ -34,25 +39,17 @@ class Ticket(Base):
         self.tax_total = sum(tx.tax_total for tx in self.transactions)
         self.total = sum(tx.total for tx in self.transactions)
     
-    def serialize(self, include_relationships=False):
-        data = super().serialize(include_relationships=include_relationships)
-        
-        data["subtotal"] = self.subtotal
-        data["tax_total"] = self.tax_total
-        data["total"] = self.total
-        
-        if include_relationships:
-            data["transactions"] = [t.serialize(include_relationships=include_relationships) for t in self.transactions]
-            data["user"] = {
-            "id": self.user.id,
-            "first_name": self.user.first_name,
-            "last_name": self.user.last_name,
-        }
-            data["location"] = {
-            "id": self.location.id,
-            "name": self.location.name,
-            "code": self.location.code
-        }
-        
-        return data
-    
+    # serialize(include_relationships=True): full transactions, user/location trimmed to a label
+    _serialize_relationships = {
+        "transactions": lambda transactions: [t.serialize(include_relationships=True) for t in transactions],
+        "user": lambda user: {
+            "id": user.id,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+        },
+        "location": lambda location: {
+            "id": location.id,
+            "name": location.name,
+            "code": location.code,
+        },
+    }
@@ -1,20 +1,28 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Date, ForeignKey, Numeric, event
+from sqlalchemy import Integer, Date, ForeignKey, Numeric, Index, event
 from .base import Base
 from datetime import date as DTdate
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # reports: posted_date range, optionally narrowed by user or location
+        Index("ix_transactions_posted_date", "posted_date"),
+        Index("ix_transactions_user_posted", "user_id", "posted_date"),
+        Index("ix_transactions_location_posted", "location_id", "posted_date"),
+        # InnoDB creates this index for the foreign key itself
+        Index("ix_transactions_ticket_id", "ticket_id").ddl_if(dialect=("sqlite", "postgresql")),
+    )
     
     # Relationships
     ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"), nullable=False)
-    ticket = relationship("Ticket", back_populates="transactions", lazy="selectin")
+    ticket = relationship("Ticket", back_populates="transactions", lazy="select")
     
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    user = relationship("User", back_populates="transactions", lazy="selectin")
+    user = relationship("User", back_populates="transactions", lazy="select")
     
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
-    location = relationship("Location", back_populates="transactions", lazy="selectin")
+    location = relationship("Location", back_populates="transactions", lazy="select")
     
     # Date of transaction
     posted_date: Mapped[DTdate] = mapped_column(Date, nullable=False)
@@ -30,40 +38,21 @@ class Transaction(Base):
         "LineItem",
         back_populates="transaction",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="select",
     )
     
     # Compute totals based on line items
     def compute_total(self):
-        self.units = len(self.line_items)
-        
-        self.subtotal = sum(
-            (-li.unit_price if li.is_return else li.unit_price) or 0
-            for li in self.line_items
-        )
-        
-        self.tax_total = sum(
-            (-li.tax_amount if li.is_return else li.tax_amount) or 0
-            for li in self.line_items
-        )
-        
-        self.total = sum(li.signed_total for  li in self.line_items)
-    
-    
-    def serialize(self, include_relationships=False):
-        data = super().serialize(include_relationships=include_relationships)
+        """Sums line items (returns negated) in a single pass"""
+        units = subtotal = tax_total = total = 0
+        for li in self.line_items:
+            sign = -1 if li.is_return else 1
+            units += 1
+            subtotal += sign * (li.unit_price or 0)
+            tax_total += sign * (li.tax_amount or 0)
+            total += sign * (li.total or 0)
         
-        data["units"] = self.units
-        data["subtotal"] = self.subtotal
-        data["tax_total"] = self.tax_total
-        data["total"] = self.total 
-        
-        data["posted_date"] = self.posted_date.isoformat()
-        
-        if include_relationships:
-            data["line_items"] = [li.serialize() for li in self.line_items]
-
-        
-        return data
-    
-    
+        self.units = units
+        self.subtotal = subtotal
+        self.tax_total = tax_total
+        self.total = total
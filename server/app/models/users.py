@@ -23,12 +23,12 @@ class User(Base, UserMixin):
     
     #Location
     location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
-    location = relationship("Location", back_populates="users", lazy="joined")
+    location = relationship("Location", back_populates="users", lazy="select")
     
     #Relationships
-    tickets = relationship("Ticket", back_populates="user", lazy="selectin")
-    transactions = relationship("Transaction", back_populates="user", lazy="selectin")
-    deductions = relationship("Deduction", back_populates="user", lazy="selectin")
+    tickets = relationship("Ticket", back_populates="user", lazy="select")
+    transactions = relationship("Transaction", back_populates="user", lazy="select")
+    deductions = relationship("Deduction", back_populates="user", lazy="select")
     
     
     
@@ -1,14 +1,137 @@
-from datetime import date as DTdate
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as DTdate, timedelta
+from functools import reduce
+from flask import current_app
+from sqlalchemy.pool import StaticPool
 from app.models import (
     Transaction, 
     LineItem, 
     Deduction, 
     User, 
+    DailySalesRollup,
+    Location,
     PaymentTypeEnum, 
     SalesCategoryEnum
     )
+from app.models.load_plans import load_plan
 from app.extensions import db
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func
+from app.services.report_cache import report_cache
+
+# python: load line items and sum them in the worker
+# sql: GROUP BY in the database, only aggregate rows come back
+# rollup: sum the pre-aggregated daily_sales_rollup rows
+REPORT_BACKENDS = ("python", "sql", "rollup")
+
+
+def signed_row(category, payment_type, is_return, taxable, unit_price, tax_amount, count):
+    """
+    Returns (category, payment_type, subtotal, tax, total, count) with returns
+    negated and tax only counted towards total when taxable.
+    """
+    sign = -1 if is_return else 1
+    
+    subtotal = sign * int(unit_price)
+    tax = sign * int(tax_amount)
+    total = subtotal + tax if taxable else subtotal
+    
+    return category, payment_type, subtotal, tax, total, count
+
+
+# reports that can be split into per-location partitions and merged
+FANOUT_REPORTS = ("master", "multi_location")
+
+_fanout_pool = None
+_fanout_lock = threading.Lock()
+
+
+def build_partial(rows, deduction_total):
+    """
+    Report totals for (category, payment_type, subtotal, tax, total, count)
+    rows, before deductions are applied. This is what partitions return.
+    """
+    categories = {
+        str(cat): {"subtotal": 0, "tax": 0, "total": 0}
+        for cat in SalesCategoryEnum
+    }
+    payments = {
+        str(p): {"subtotal": 0, "tax": 0, "total": 0}
+        for p in PaymentTypeEnum
+    }
+    
+    grand = {"subtotal": 0, "tax": 0, "total": 0}
+    line_item_count = 0
+    
+    #aggregate rows (one per line item, or one per group from sql/rollup)
+    for category, payment, subtotal, tax, total, count in rows:
+        subtotal, tax, total = int(subtotal), int(tax), int(total)
+        
+        category = str(category)
+        payment = str(payment)
+        
+        categories[category]["subtotal"] += subtotal
+        categories[category]["tax"] += tax
+        categories[category]["total"] += total
+        
+        payments[payment]["subtotal"] += subtotal
+        payments[payment]["tax"] += tax
+        payments[payment]["total"] += total
+        
+        grand["subtotal"] += subtotal
+        grand["tax"] += tax
+        grand["total"] += total
+        
+        line_item_count += int(count)
+    
+    return {
+        "grand": grand,
+        "categories": categories,
+        "payments": payments,
+        "deductions": int(deduction_total),
+        "line_item_count": line_item_count
+    }
+
+
+def empty_partial():
+    return build_partial([], 0)
+
+
+def merge_partials(a, b):
+    """
+    Sums two partials key by key. Associative and commutative with
+    empty_partial() as the identity, so partitions can be merged in any
+    grouping or order, whether they were computed, cached or read from the
+    rollup table. Key order follows `a`.
+    """
+    merged = {}
+    for key in list(a) + [k for k in b if k not in a]:
+        x, y = a.get(key), b.get(key)
+        if isinstance(x, dict) or isinstance(y, dict):
+            merged[key] = merge_partials(x or {}, y or {})
+        else:
+            merged[key] = (x or 0) + (y or 0)
+    return merged
+
+
+def month_ranges(start_date, end_date):
+    """Splits start..end into (start, end) pairs that don't cross a month boundary"""
+    ranges = []
+    start = start_date
+    while start <= end_date:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        end = min(end_date, next_month - timedelta(days=1))
+        ranges.append((start, end))
+        start = next_month
+    return ranges
+
+
+def _pool(workers):
+    global _fanout_pool
+    with _fanout_lock:
+        if _fanout_pool is None:
+            _fanout_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cerberus-report")
+        return _fanout_pool
 
 
 class FinancialReportService:
@@ -20,7 +143,9 @@ class FinancialReportService:
         location_id: int | list[int] = None, 
         user_ids: int | list[int] = None,
         report_type: str = "operations",
-        subject: User | None = None
+        subject: User | None = None,
+        backend: str = "python",
+        fan_out: bool | None = None
         ):
         self.start_date = start_date
         self.end_date = end_date or start_date
@@ -42,115 +167,222 @@ class FinancialReportService:
                 raise ValueError("user_id must be int or list[int]")
         else:
             self.user_ids = []
+        
+        if backend not in REPORT_BACKENDS:
+            raise ValueError(f"backend must be one of {REPORT_BACKENDS}")
             
         self.report_type = report_type
         self.subject=subject
+        self.backend = backend
+        # None: decided by REPORT_FANOUT_WORKERS
+        self.fan_out = fan_out
         
         #Data storage
         self.line_items = []
         self.deductions = []
         
+        # (category, payment_type, subtotal, tax, total, count)
+        self.rows = []
+        self.deduction_total = 0
+        
         self.report = {}
         
         
     #-------------------------
-    # Fetch data
+    # Filters
     #-------------------------
-    def fetch(self):
+    def sales_filters(self, model=Transaction):
+        """Filters for Transaction or DailySalesRollup rows"""
+        date_column = model.date if model is DailySalesRollup else model.posted_date
+        
         # Master report has no filters
-        tx_query = db.session.query(Transaction).options(selectinload(Transaction.line_items)).filter(
-            Transaction.posted_date.between(self.start_date, self.end_date)
-        )
-
-        # ---------------------
-        # Apply filters for transactions
-        # ---------------------
+        filters = [date_column.between(self.start_date, self.end_date)]
+        
         if self.report_type in ["user_eod", "multi_user"] and self.user_ids:
-            tx_query = tx_query.filter(Transaction.user_id.in_(self.user_ids))
+            filters.append(model.user_id.in_(self.user_ids))
         elif self.report_type in ["location", "multi_location"] and self.location_id:
-            if isinstance(self.location_id, list):
-                tx_query = tx_query.filter(Transaction.location_id.in_(self.location_id))
-            else:
-                tx_query = tx_query.filter(Transaction.location_id == self.location_id)
-
-        # Get all line items directly
-        self.line_items = [li for tx in tx_query.all() for li in tx.line_items]
-
-        # ---------------------
-        # Fetch deductions
-        # ---------------------
-        ded_query = db.session.query(Deduction).filter(
+            filters.append(model.location_id.in_(self.location_id))
+            
+        return filters
+    
+    def deduction_query(self, query):
+        query = query.filter(
             Deduction.date.between(self.start_date, self.end_date)
         )
 
         # User filter always takes priority
         if self.report_type in ["user_eod", "multi_user"] and self.user_ids:
-            ded_query = ded_query.filter(Deduction.user_id.in_(self.user_ids))
+            query = query.filter(Deduction.user_id.in_(self.user_ids))
 
         # Location filter (only if no user_ids)
         elif self.location_id:
-            ded_query = ded_query.join(Deduction.user)
-            if isinstance(self.location_id, list):
-                ded_query = ded_query.filter(User.location_id.in_(self.location_id))
-            else:
-                ded_query = ded_query.filter(User.location_id == self.location_id)
+            query = query.join(Deduction.user).filter(User.location_id.in_(self.location_id))
+            
+        return query
+        
+        
+    #-------------------------
+    # Fetch data
+    #-------------------------
+    def fetch(self):
+        if self.backend == "sql":
+            return self.fetch_aggregates()
+        if self.backend == "rollup":
+            return self.fetch_rollups()
+        
+        tx_query = db.session.query(Transaction).options(*load_plan("report_rows")).filter(
+            *self.sales_filters()
+        )
 
-        self.deductions = ded_query.all()
+        # Get all line items directly
+        self.line_items = [li for tx in tx_query.all() for li in tx.line_items]
+        self.rows = [
+            signed_row(li.category, li.payment_type, li.is_return, li.taxable, li.unit_price or 0, li.tax_amount or 0, 1)
+            for li in self.line_items
+        ]
 
+        # ---------------------
+        # Fetch deductions
+        # ---------------------
+        self.deductions = self.deduction_query(db.session.query(Deduction)).all()
+        self.deduction_total = sum(d.amount for d in self.deductions)
+        
+        
+    def fetch_aggregates(self):
+        """
+        Same data as fetch() but summed by the database.
+        Returns one row per (category, payment_type, is_return, taxable).
+        """
+        stmt = (
+            select(
+                LineItem.category,
+                LineItem.payment_type,
+                LineItem.is_return,
+                LineItem.taxable,
+                func.coalesce(func.sum(LineItem.unit_price), 0),
+                func.coalesce(func.sum(LineItem.tax_amount), 0),
+                func.count(LineItem.id),
+            )
+            .join(Transaction, LineItem.transaction_id == Transaction.id)
+            .where(*self.sales_filters())
+            .group_by(
+                LineItem.category,
+                LineItem.payment_type,
+                LineItem.is_return,
+                LineItem.taxable,
+            )
+        )
+        self.rows = [signed_row(*row) for row in db.session.execute(stmt)]
+        self.fetch_deduction_total()
+        
+        
+    def fetch_rollups(self):
+        """
+        Sums daily_sales_rollup rows for the range.
+        Rows need to be maintained (or rebuilt) by app/services/rollup_service.py.
+        """
+        stmt = (
+            select(
+                DailySalesRollup.category,
+                DailySalesRollup.payment_type,
+                func.coalesce(func.sum(DailySalesRollup.subtotal), 0),
+                func.coalesce(func.sum(DailySalesRollup.tax), 0),
+                func.coalesce(func.sum(DailySalesRollup.total), 0),
+                func.coalesce(func.sum(DailySalesRollup.count), 0),
+            )
+            .where(*self.sales_filters(DailySalesRollup))
+            .group_by(DailySalesRollup.category, DailySalesRollup.payment_type)
+        )
+        self.rows = [tuple(row) for row in db.session.execute(stmt)]
+        self.fetch_deduction_total()
         
         
+    def fetch_deduction_total(self):
+        ded_query = self.deduction_query(
+            db.session.query(func.coalesce(func.sum(Deduction.amount), 0))
+        )
+        self.deduction_total = ded_query.scalar()
+        
     
     #-------------------------
     # Build report
     #-------------------------
     def build(self):
-        categories = {
-            str(cat): {"subtotal": 0, "tax": 0, "total": 0}
-            for cat in SalesCategoryEnum
-        }
-        payments = {
-            str(p): {"subtotal": 0, "tax": 0, "total": 0}
-            for p in PaymentTypeEnum
-        }
-        
-        grand = {"subtotal": 0, "tax": 0, "total": 0}
-        
-        #aggregate line items
-        for li in self.line_items:
-            sign = -1 if li.is_return else 1
-            
-            subtotal = sign * (li.unit_price or 0)
-            tax = sign * (li.tax_amount or 0)
-            total = subtotal + tax if li.taxable else subtotal
-            
-            category = str(li.category)
-            payment = str(li.payment_type)
-            
-            categories[category]["subtotal"] += subtotal
-            categories[category]["tax"] += tax
-            categories[category]["total"] += total
-            
-            payments[payment]["subtotal"] += subtotal
-            payments[payment]["tax"] += tax
-            payments[payment]["total"] += total
-            
-            grand["subtotal"] += subtotal
-            grand["tax"] += tax
-            grand["total"] += total
+        self.report = build_partial(self.rows, self.deduction_total)
+        return self.report
+    
+    
+    #-------------------------
+    # Partitioned build
+    #-------------------------
+    def should_fan_out(self):
+        if self.report_type not in FANOUT_REPORTS:
+            return False
+        if self.fan_out is not None:
+            return self.fan_out
+        return current_app.config.get("REPORT_FANOUT_WORKERS", 4) > 1
+    
+    def partitions(self):
+        """(location_id, start, end) for every partition of the report"""
+        if self.location_id:
+            location_ids = list(self.location_id)
+        else:
+            location_ids = db.session.scalars(select(Location.id).order_by(Location.id)).all()
         
+        if current_app.config.get("REPORT_FANOUT_BY_MONTH", True):
+            ranges = month_ranges(self.start_date, self.end_date)
+        else:
+            ranges = [(self.start_date, self.end_date)]
         
-        #store report
-        self.report = {
-            "grand": grand,
-            "categories": categories,
-            "payments": payments,
-            "deductions": sum(d.amount for d in self.deductions),
-            "line_item_count": len(self.line_items)
-        }
+        return [(location_id, start, end) for location_id in location_ids for start, end in ranges]
+    
+    def compute_partition(self, location_id, start_date, end_date):
+        """
+        Partial report for one location and date range. Sales are split by
+        the transaction's location and deductions by the user's location, the
+        same way a location report filters them. Closed ranges are cached.
+        """
+        slot = report_cache.slot(report_cache.spec("location_partial", start_date, end_date, [location_id], [], self.backend))
+        partial = report_cache.get(slot)
+        if partial is None:
+            service = FinancialReportService(
+                start_date=start_date,
+                end_date=end_date,
+                location_id=[location_id],
+                report_type="location",
+                backend=self.backend,
+                fan_out=False
+            )
+            service.fetch()
+            partial = service.build()
+            report_cache.set(slot, partial)
+        return partial
+    
+    def build_partitioned(self):
+        """
+        build() for master/multi_location reports: every partition is
+        computed on the fan-out pool (each worker uses its own session and
+        connection) and the partials are merged.
+        """
+        parts = self.partitions()
+        workers = current_app.config.get("REPORT_FANOUT_WORKERS", 4)
         
+        # a single shared connection (in-memory sqlite) can't be used from several threads
+        if workers <= 1 or len(parts) <= 1 or isinstance(db.engine.pool, StaticPool):
+            partials = [self.compute_partition(*part) for part in parts]
+        else:
+            app = current_app._get_current_object()
+            
+            def run(part):
+                with app.app_context():
+                    return self.compute_partition(*part)
+            
+            partials = list(_pool(workers).map(run, parts))
         
+        self.report = reduce(merge_partials, partials, empty_partial())
         return self.report
     
+    
     #-------------------------
     # Apply Deductions
     #-------------------------
@@ -206,8 +438,11 @@ class FinancialReportService:
     # Public API
     #-------------------------
     def generate(self):
-        self.fetch()
-        self.build()
+        if self.should_fan_out():
+            self.build_partitioned()
+        else:
+            self.fetch()
+            self.build()
         print("Before Deductions: ", self.report["payments"]["cash"]["total"], self.report["grand"]["total"])
         self.validate()
         self.apply_deductions()
@@ -0,0 +1,313 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from redis.exceptions import RedisError
+from app.utils.redis_store import redis_store
+
+# how long to stop trying redis after it fails
+REDIS_RETRY_SECONDS = 30
+
+# how often wait() re-reads a job another worker process is running
+POLL_INTERVAL = 0.25
+
+FINISHED = ("done", "failed")
+
+
+class JobRunner:
+    """
+    Runs long tasks on a small thread pool outside the request.
+
+    submit() returns immediately with a job record; the task runs in its own
+    app context (so it gets its own db session) and can report progress
+    through job.update(). The most recent JOB_HISTORY records are kept in
+    this process.
+
+    Records are also written to the app's redis (redis_store, for
+    JOB_RESULT_TTL seconds) so any worker process can answer a poll, and a
+    dedupe_key lets identical submissions share the job that is already
+    queued or running. Without redis both only work within one process.
+
+    A job dies with the worker process running it (a gunicorn recycle or a
+    crash), so the owning process re-stores its unfinished records every
+    JOB_HEARTBEAT_INTERVAL seconds, which also renews their TTL. A queued
+    or running record that hasn't been refreshed for JOB_STALE_AFTER
+    seconds is reported as failed, and its dedupe key is taken over.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._executor = None
+        self._redis_down_until = 0
+
+    def _pool(self, app):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("JOB_WORKERS", 2),
+                    thread_name_prefix="cerberus-job"
+                )
+                threading.Thread(
+                    target=self._heartbeat, args=(app,), name="cerberus-job-heartbeat", daemon=True
+                ).start()
+            return self._executor
+
+    def _heartbeat(self, app):
+        """Keeps this process's unfinished job records fresh, see JOB_STALE_AFTER"""
+        interval = app.config.get("JOB_HEARTBEAT_INTERVAL", 10)
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                live = [job for job in self._jobs.values() if job.status not in FINISHED]
+            if live:
+                with app.app_context():
+                    for job in live:
+                        self._store(job, heartbeat=True)
+
+    #-------------------------
+    # Redis
+    #-------------------------
+    def _redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        return redis_store.client
+
+    def _redis_failed(self, e):
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        current_app.logger.warning(f"[JOBS]: redis unavailable, job records are local to this worker: {e}")
+
+    @staticmethod
+    def _key(suffix):
+        return f"{current_app.config.get('SESSION_KEY_PREFIX', 'cerberus:')}job:{suffix}"
+
+    def _store(self, job, heartbeat=False):
+        client = self._redis()
+        if client is None:
+            return
+        # one writer at a time, so a heartbeat can't overwrite the finished record
+        with job.store_lock:
+            if heartbeat and job.status in FINISHED:
+                return
+            if job.status not in FINISHED:
+                job.heartbeat_at = time.time()
+            try:
+                client.set(self._key(job.id), json.dumps(job.record()), ex=current_app.config.get("JOB_RESULT_TTL", 3600))
+            except RedisError as e:
+                self._redis_failed(e)
+
+    def _load(self, job_id):
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            record = client.get(self._key(job_id))
+        except RedisError as e:
+            self._redis_failed(e)
+            return None
+        if not record:
+            return None
+
+        job = Job.from_record(json.loads(record))
+        stale_after = current_app.config.get("JOB_STALE_AFTER", 60)
+        if job.status not in FINISHED and time.time() - job.heartbeat_at > stale_after:
+            current_app.logger.warning(f"[JOBS]: {job.kind} {job.id} lost, {job.worker} stopped sending heartbeats")
+            job.fail(f"The worker running this job stopped ({job.worker})")
+            self._store(job)
+        return job
+
+    #-------------------------
+    # De-duplication
+    #-------------------------
+    def _claim(self, dedupe_key, job):
+        """Registers job under dedupe_key, or returns the unfinished job that already has it"""
+        with self._lock:
+            existing = self._active.get(dedupe_key)
+            if existing is not None and existing.status not in FINISHED:
+                return existing
+            self._active[dedupe_key] = job
+
+        client = self._redis()
+        if client is not None:
+            key = self._key(f"dedupe:{dedupe_key}")
+            ttl = current_app.config.get("JOB_DEDUPE_TTL", 900)
+            try:
+                if not client.set(key, job.id, nx=True, ex=ttl):
+                    owner = client.get(key)
+                    other = self.get(owner.decode() if isinstance(owner, bytes) else owner) if owner else None
+                    if other is not None and other.status not in FINISHED:
+                        with self._lock:
+                            self._active.pop(dedupe_key, None)
+                        return other
+                    client.set(key, job.id, ex=ttl)
+            except RedisError as e:
+                self._redis_failed(e)
+        return None
+
+    def _release(self, job):
+        with self._lock:
+            if self._active.get(job.dedupe_key) is job:
+                del self._active[job.dedupe_key]
+
+        client = self._redis()
+        if client is not None:
+            try:
+                key = self._key(f"dedupe:{job.dedupe_key}")
+                owner = client.get(key)
+                if owner in (job.id, job.id.encode()):
+                    client.delete(key)
+            except RedisError as e:
+                self._redis_failed(e)
+
+    #-------------------------
+    # Jobs
+    #-------------------------
+    def submit(self, kind, task, *args, user_id=None, dedupe_key=None, **kwargs):
+        """
+        Queue task(job, *args, **kwargs), returns the Job.
+        With a dedupe_key an unfinished job with the same key is returned instead.
+        """
+        app = current_app._get_current_object()
+        job = Job(kind, user_id, dedupe_key=dedupe_key)
+
+        if dedupe_key is not None:
+            existing = self._claim(dedupe_key, job)
+            if existing is not None:
+                return existing
+
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > app.config.get("JOB_HISTORY", 100):
+                self._jobs.popitem(last=False)
+        self._store(job)
+
+        def run():
+            with app.app_context():
+                job.start()
+                self._store(job)
+                try:
+                    job.finish(task(job, *args, **kwargs))
+                except Exception as e:
+                    app.logger.error(f"[JOB ERROR]: {job.kind} {job.id} failed: {e}\n{traceback.format_exc()}")
+                    job.fail(str(e))
+                self._store(job)
+                if dedupe_key is not None:
+                    self._release(job)
+
+        job.on_update = self._store
+        self._pool(app).submit(run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def wait(self, job_id, timeout):
+        """
+        get(), but blocks up to timeout seconds for the job to finish.
+        Returns None for an unknown job.
+        """
+        job = self.get(job_id)
+        deadline = time.monotonic() + timeout
+        while job is not None and job.status not in FINISHED:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if job.local:
+                job.wait(remaining)
+            else:
+                # running in another worker process
+                time.sleep(min(POLL_INTERVAL, remaining))
+            job = self.get(job_id)
+        return job
+
+
+class Job:
+    def __init__(self, kind, user_id=None, dedupe_key=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.user_id = user_id
+        self.dedupe_key = dedupe_key
+        self.status = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # the process running the job and when it last said so, see JobRunner._heartbeat()
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_at = self.created_at
+        # records loaded from redis belong to another process and never change
+        self.local = True
+        self.on_update = None
+        self.store_lock = threading.Lock()
+        self._finished = threading.Event()
+
+    @classmethod
+    def from_record(cls, record):
+        job = cls(record["kind"], record["user_id"], record.get("dedupe_key"))
+        for field in ("id", "status", "progress", "result", "error", "created_at", "started_at", "finished_at"):
+            setattr(job, field, record[field])
+        job.worker = record.get("worker", "unknown")
+        job.heartbeat_at = record.get("heartbeat_at", job.created_at)
+        job.local = False
+        return job
+
+    def start(self):
+        self.status = "running"
+        self.started_at = time.time()
+
+    def update(self, **progress):
+        self.progress = {**self.progress, **progress}
+        if self.on_update is not None:
+            self.on_update(self)
+
+    def finish(self, result):
+        self.result = result
+        self.status = "done"
+        self.finished_at = time.time()
+        self._finished.set()
+
+    def fail(self, error):
+        self.error = error
+        self.status = "failed"
+        self.finished_at = time.time()
+        self._finished.set()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def record(self):
+        """serialize() plus what another process needs to rebuild the job"""
+        return {
+            **self.serialize(),
+            "user_id": self.user_id,
+            "dedupe_key": self.dedupe_key,
+            "worker": self.worker,
+            "heartbeat_at": self.heartbeat_at,
+        }
+
+
+job_runner = JobRunner()
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+from app.extensions import bcrypt
+
+
+class PasswordsBusy(Exception):
+    """bcrypt didn't get to a login within PASSWORD_QUEUE_TIMEOUT"""
+
+
+class PasswordService:
+    """
+    bcrypt hashing and checking at the BCRYPT_LOG_ROUNDS cost.
+
+    Hashes run on a small pool of PASSWORD_HASH_WORKERS threads per process.
+    bcrypt releases the GIL, so with threaded workers the rest of the
+    process keeps serving requests during a login burst, and at most that
+    many cores go to bcrypt at once. Logins queue behind each other and give
+    up with PasswordsBusy after PASSWORD_QUEUE_TIMEOUT seconds.
+
+    Hashes made at another cost still verify; callers rehash them at login
+    with needs_rehash()/hash() so the stored cost follows the policy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self, app):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("PASSWORD_HASH_WORKERS", 2),
+                    thread_name_prefix="cerberus-bcrypt"
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        app = current_app._get_current_object()
+        future = self._pool(app).submit(fn, *args)
+        try:
+            return future.result(timeout=app.config.get("PASSWORD_QUEUE_TIMEOUT", 10))
+        except FutureTimeout:
+            future.cancel()
+            raise PasswordsBusy()
+
+    @staticmethod
+    def policy_rounds():
+        return current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+
+    @staticmethod
+    def rounds(pw_hash):
+        """Cost a stored hash was made with ("$2b$12$..." -> 12), None if it isn't bcrypt"""
+        try:
+            return int(pw_hash.split("$")[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password, self.policy_rounds()).decode("utf-8")
+
+    def verify(self, pw_hash, password):
+        return self._run(bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        return self.rounds(pw_hash) != self.policy_rounds()
+
+
+passwords = PasswordService()
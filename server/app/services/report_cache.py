@@ -0,0 +1,282 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date as DTdate, timedelta
+from flask import current_app
+from redis.exceptions import RedisError
+from app.utils.redis_store import redis_store
+
+USER_REPORTS = ["user_eod", "multi_user"]
+# location_partial: one partition of a fanned out report, see FinancialReportService.build_partitioned()
+LOCATION_REPORTS = ["location", "multi_location", "location_partial"]
+
+# how long to stop trying redis after it fails
+REDIS_RETRY_SECONDS = 30
+# generations outlive the entries built from them by this much, so a report
+# that was being computed when its generation was bumped expires first
+GENERATION_TTL_MARGIN = 3600
+# in-process generations kept while redis is down, see _bump_local()
+LOCAL_GENERATIONS_MAX = 100_000
+
+
+class ReportCache:
+    """
+    Caches generated /reports/summary payloads for closed days.
+
+    Entries live in the app's redis (redis_store) and fall back to an
+    in-process LRU when redis is unreachable or REDIS_URL is empty. Ranges
+    that include today are never cached, so only the current day gets
+    recomputed.
+
+    Invalidation is by generation: every (scope, day) a report reads, a
+    location, a user, or all sales, has a generation, and the cache key of a
+    report includes the generations of its days and filters. Writes call
+    invalidate_sales()/invalidate_deductions() with the (date, location_id,
+    user_id) keys they touched, which bumps those generations, so the stale
+    entries are never looked up again and expire on REPORT_CACHE_TTL.
+
+    Generations are read by slot() before the report is computed, so a write
+    that commits while a report is being built leaves that report under a
+    key nobody reads.
+
+    The in-process fallback only sees this process's writes, so its entries
+    are kept for REPORT_CACHE_LOCAL_TTL seconds. Writes made while redis was
+    down never reached its generations, so the first call that finds redis
+    back bumps the epoch and drops everything cached there before the outage.
+
+    usage:
+        slot = report_cache.slot(spec)
+        report = report_cache.get(slot)
+        if report is None:
+            report = build()
+            report_cache.set(slot, report)
+    """
+
+    def __init__(self):
+        self._lru = OrderedDict()
+        self._generations = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._redis_down_until = 0
+        self._missed_writes = False
+
+    #-------------------------
+    # Config
+    #-------------------------
+    @property
+    def enabled(self):
+        return current_app.config.get("REPORT_CACHE_ENABLED", True)
+
+    @property
+    def prefix(self):
+        return current_app.config.get("SESSION_KEY_PREFIX", "cerberus:") + "report:"
+
+    @property
+    def ttl(self):
+        return current_app.config.get("REPORT_CACHE_TTL", 86400)
+
+    def _redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        client = redis_store.client
+        if client is not None and self._missed_writes:
+            try:
+                self._bump_redis(client, [f"{self.prefix}gen:epoch"], None)
+                self._missed_writes = False
+                current_app.logger.info("[REPORT CACHE]: redis is back, dropped entries cached before the outage")
+            except RedisError as e:
+                self._redis_failed(e)
+                return None
+        return client
+
+    def _redis_failed(self, e):
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        self._missed_writes = True
+        current_app.logger.warning(f"[REPORT CACHE]: redis unavailable, using in-process cache: {e}")
+
+    #-------------------------
+    # Keys
+    #-------------------------
+    @staticmethod
+    def spec(report_type, start_date, end_date, locations, users, backend):
+        return {
+            "type": report_type,
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "locations": list(locations or []),
+            "users": list(users or []),
+            "backend": backend,
+        }
+
+    def key(self, spec):
+        """Identifies the report itself, whatever its generations"""
+        digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{self.prefix}{digest}"
+
+    def cacheable(self, spec):
+        return self.enabled and DTdate.fromisoformat(spec["end"]) < DTdate.today()
+
+    #-------------------------
+    # Generations
+    #-------------------------
+    @staticmethod
+    def _read_scopes(spec):
+        """
+        Mirrors the filters in FinancialReportService: user reports filter on
+        user, location reports on location, everything else sees every sale.
+        Deductions are filtered by the user's location whenever locations are set.
+        """
+        if spec["type"] in USER_REPORTS and spec["users"]:
+            return [f"user:{user_id}" for user_id in spec["users"]]
+        locations = [f"location:{location_id}" for location_id in spec["locations"]]
+        if locations and spec["type"] in LOCATION_REPORTS:
+            return locations
+        if locations:
+            return ["sales"] + locations
+        return ["all"]
+
+    @staticmethod
+    def _write_scopes(location_id, user_id, deductions):
+        scopes = ["all", f"location:{location_id}", f"user:{user_id}"]
+        return scopes if deductions else scopes + ["sales"]
+
+    def _generation_key(self, scope, day):
+        return f"{self.prefix}gen:{scope}:{day}"
+
+    def _read_keys(self, spec):
+        start, end = DTdate.fromisoformat(spec["start"]), DTdate.fromisoformat(spec["end"])
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        scopes = self._read_scopes(spec)
+        # the epoch is bumped by clear()
+        return [f"{self.prefix}gen:epoch"] + [self._generation_key(scope, day) for day in days for scope in scopes]
+
+    def _read_generations(self, keys):
+        client = self._redis()
+        if client is not None:
+            try:
+                return [int(generation or 0) for generation in client.mget(keys)]
+            except RedisError as e:
+                self._redis_failed(e)
+
+        with self._lock:
+            return [self._generations.get(key, 0) for key in keys]
+
+    def _bump_redis(self, client, keys, ttl):
+        # a fresh number from one counter, never a reused one: a generation
+        # that expired and came back must not revive entries built before
+        generation = client.incr(f"{self.prefix}gen:seq")
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, generation, ex=ttl)
+        pipe.execute()
+
+    def _bump(self, keys, ttl):
+        client = self._redis()
+        if client is not None:
+            try:
+                self._bump_redis(client, keys, ttl)
+            except RedisError as e:
+                self._redis_failed(e)
+
+        # always bump local generations too, entries may have been written while redis was down
+        self._bump_local(keys)
+
+    def _bump_local(self, keys):
+        with self._lock:
+            if len(self._generations) + len(keys) > LOCAL_GENERATIONS_MAX:
+                # dropping the entries with them keeps an old generation from matching again
+                self._generations.clear()
+                self._lru.clear()
+            self._generation += 1
+            for key in keys:
+                self._generations[key] = self._generation
+
+    #-------------------------
+    # Read / write
+    #-------------------------
+    def slot(self, spec):
+        """
+        Cache key for spec at its current generations, or None when the
+        range isn't cacheable. Take it before computing the report.
+        """
+        if not self.cacheable(spec):
+            return None
+        generations = ",".join(str(generation) for generation in self._read_generations(self._read_keys(spec)))
+        body = f"{json.dumps(spec, sort_keys=True)}|{generations}"
+        return f"{self.prefix}{hashlib.sha1(body.encode('utf-8')).hexdigest()}"
+
+    def get(self, slot):
+        if slot is None:
+            return None
+
+        client = self._redis()
+        if client is not None:
+            try:
+                payload = client.get(slot)
+                return json.loads(payload) if payload else None
+            except RedisError as e:
+                self._redis_failed(e)
+
+        with self._lock:
+            entry = self._lru.get(slot)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if time.monotonic() >= expires:
+                del self._lru[slot]
+                return None
+            self._lru.move_to_end(slot)
+            return json.loads(payload)
+
+    def set(self, slot, report):
+        if slot is None:
+            return
+        payload = json.dumps(report)
+
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(slot, payload, ex=self.ttl)
+                return
+            except RedisError as e:
+                self._redis_failed(e)
+
+        local_ttl = current_app.config.get("REPORT_CACHE_LOCAL_TTL", 30)
+        if local_ttl <= 0:
+            return
+        with self._lock:
+            self._lru[slot] = (time.monotonic() + local_ttl, payload)
+            self._lru.move_to_end(slot)
+            while len(self._lru) > current_app.config.get("REPORT_CACHE_MAX_ENTRIES", 256):
+                self._lru.popitem(last=False)
+
+    #-------------------------
+    # Invalidation
+    #-------------------------
+    def _invalidate(self, keys, deductions):
+        generation_keys = sorted({
+            self._generation_key(scope, day.isoformat())
+            for day, location_id, user_id in keys
+            for scope in self._write_scopes(location_id, user_id, deductions)
+        })
+        if generation_keys:
+            self._bump(generation_keys, self.ttl + GENERATION_TTL_MARGIN)
+
+    def invalidate_sales(self, keys):
+        """keys: (date, location_id, user_id) of written transactions/line items"""
+        self._invalidate(keys, deductions=False)
+
+    def invalidate_deductions(self, keys):
+        """keys: (date, user's location_id, user_id) of written deductions"""
+        self._invalidate(keys, deductions=True)
+
+    def clear(self):
+        """Invalidates every entry, e.g. when a user moves location"""
+        self._bump([f"{self.prefix}gen:epoch"], None)
+        with self._lock:
+            self._lru.clear()
+
+
+report_cache = ReportCache()
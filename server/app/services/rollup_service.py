@@ -0,0 +1,158 @@
+from datetime import date as DTdate
+from sqlalchemy import select, insert, delete, func, case, and_, or_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.models import Transaction, LineItem, DailySalesRollup, DailySalesRollupLock
+from app.extensions import db
+
+
+ROLLUP_COLUMNS = [
+    "date", "location_id", "user_id", "category", "payment_type",
+    "subtotal", "tax", "total", "count",
+]
+
+
+def rollup_key(transaction: Transaction):
+    """The daily_sales_rollup slice a transaction contributes to."""
+    return (transaction.posted_date, transaction.location_id, transaction.user_id)
+
+
+def _rollup_select():
+    """
+    Line items summed per (date, location, user, category, payment type),
+    signed the same way FinancialReportService.build() signs them.
+    """
+    signed_price = case((LineItem.is_return == True, -LineItem.unit_price), else_=LineItem.unit_price)
+    signed_tax = case((LineItem.is_return == True, -LineItem.tax_amount), else_=LineItem.tax_amount)
+    line_total = signed_price + case((LineItem.taxable == True, signed_tax), else_=0)
+
+    group = (
+        Transaction.posted_date,
+        Transaction.location_id,
+        Transaction.user_id,
+        LineItem.category,
+        LineItem.payment_type,
+    )
+
+    return (
+        select(
+            *group,
+            func.coalesce(func.sum(signed_price), 0),
+            func.coalesce(func.sum(signed_tax), 0),
+            func.coalesce(func.sum(line_total), 0),
+            func.count(LineItem.id),
+        )
+        .join(Transaction, LineItem.transaction_id == Transaction.id)
+        .group_by(*group)
+    )
+
+
+#-------------------------
+# Incremental maintenance
+#-------------------------
+def lock_rollup_slices(keys):
+    """
+    Lock the daily_sales_rollup_locks row of each (date, location_id, user_id)
+    slice until commit, creating it if needed. Slices are locked in sorted
+    order so two writers can't each hold one the other is waiting for.
+    """
+    rows = [
+        {"date": day, "location_id": location_id, "user_id": user_id}
+        for day, location_id, user_id in sorted(keys)
+    ]
+    if not rows:
+        return
+
+    # an upsert locks the row whether it was there or not, which a SELECT ... FOR UPDATE
+    # of a missing row doesn't
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(DailySalesRollupLock).values(rows)
+        stmt = stmt.on_duplicate_key_update(date=stmt.inserted.date)
+    elif dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(DailySalesRollupLock).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["date", "location_id", "user_id"],
+            set_={"date": stmt.excluded.date}
+        )
+    else:
+        raise NotImplementedError(f"No rollup slice locking for {dialect}")
+    db.session.execute(stmt)
+
+
+def refresh_rollups(items):
+    """
+    Recompute the rollup rows touched by the given transactions.
+
+    `items` are Transaction objects or (date, location_id, user_id) keys.
+    Call after changing tickets/transactions/line items and before commit so
+    the rollup is written in the same transaction as the change. Deleted
+    transactions can be passed as long as they were loaded before the delete.
+
+    Each slice is locked first (lock_rollup_slices()), so a concurrent write
+    to the same slice waits for this one to commit and then rebuilds from
+    rows that include it. That needs the rebuild's INSERT ... SELECT to read
+    what is committed now rather than a snapshot from the start of the
+    transaction, which is why MySQL runs at READ COMMITTED (PoolMonitor).
+    
+    Returns the set of keys that were refreshed.
+    """
+    # new transactions only get their foreign keys once flushed
+    db.session.flush()
+
+    keys = {
+        rollup_key(item) if isinstance(item, Transaction) else tuple(item)
+        for item in items
+    }
+    keys = {k for k in keys if all(part is not None for part in k)}
+    if not keys:
+        return keys
+    lock_rollup_slices(keys)
+
+    rollup_match = or_(*(
+        and_(
+            DailySalesRollup.date == day,
+            DailySalesRollup.location_id == location_id,
+            DailySalesRollup.user_id == user_id,
+        )
+        for day, location_id, user_id in keys
+    ))
+    transaction_match = or_(*(
+        and_(
+            Transaction.posted_date == day,
+            Transaction.location_id == location_id,
+            Transaction.user_id == user_id,
+        )
+        for day, location_id, user_id in keys
+    ))
+
+    db.session.execute(delete(DailySalesRollup).where(rollup_match))
+    db.session.execute(
+        insert(DailySalesRollup).from_select(
+            ROLLUP_COLUMNS,
+            _rollup_select().where(transaction_match)
+        )
+    )
+    return keys
+
+
+#-------------------------
+# Backfill
+#-------------------------
+def rebuild_rollups(start_date: DTdate = None, end_date: DTdate = None):
+    """
+    Rebuild rollup rows from line items, for a date range or everything.
+    Returns the number of rollup rows written.
+    """
+    delete_stmt = delete(DailySalesRollup)
+    source = _rollup_select()
+
+    if start_date:
+        delete_stmt = delete_stmt.where(DailySalesRollup.date >= start_date)
+        source = source.where(Transaction.posted_date >= start_date)
+    if end_date:
+        delete_stmt = delete_stmt.where(DailySalesRollup.date <= end_date)
+        source = source.where(Transaction.posted_date <= end_date)
+
+    db.session.execute(delete_stmt)
+    result = db.session.execute(insert(DailySalesRollup).from_select(ROLLUP_COLUMNS, source))
+    return result.rowcount
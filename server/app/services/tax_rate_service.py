@@ -0,0 +1,82 @@
+from bisect import bisect_right
+from app.models import TaxRate
+from app.extensions import db
+from app.utils.reloading_cache import ReloadingCache
+
+
+def load_tax_rate_index(engine):
+    """location_id -> ([effective_from, ...], [(effective_to, rate), ...])"""
+    # own connection so loading never autoflushes the caller's half-built objects
+    with engine.connect() as conn:
+        rows = conn.execute(
+            db.select(TaxRate.location_id, TaxRate.effective_from, TaxRate.effective_to, TaxRate.rate)
+            .order_by(TaxRate.location_id, TaxRate.effective_from, TaxRate.id)
+        ).all()
+
+    index = {}
+    for location_id, effective_from, effective_to, rate in rows:
+        starts, intervals = index.setdefault(location_id, ([], []))
+        starts.append(effective_from)
+        intervals.append((effective_to, rate))
+    return index
+
+
+class TaxRateResolver:
+    """
+    Effective-dated tax rates from the tax_rate history table.
+
+    All TaxRate rows are loaded in one query into a per-location list sorted
+    by effective_from, so rate_for() is a bisect with no query. Rows that
+    start on the same day are ordered by id, the newest one wins.
+
+    Call invalidate() after committing a new TaxRate. It bumps a version in
+    redis so other worker processes reload on their next request
+    (TAX_RATE_CACHE_TTL only applies while redis is down).
+    """
+
+    def __init__(self):
+        self._index = ReloadingCache(load_tax_rate_index, "TAX_RATE_CACHE_TTL", version_key="tax_rates")
+
+    def invalidate(self):
+        self._index.invalidate()
+
+    #-------------------------
+    # Lookups
+    #-------------------------
+    def _interval(self, location_id, day):
+        """(effective_to, rate) of the TaxRate row covering day, or None"""
+        entry = self._index.get().get(location_id)
+        if entry is None:
+            return None
+
+        starts, intervals = entry
+        i = bisect_right(starts, day) - 1
+        if i < 0:
+            return None
+
+        effective_to, rate = intervals[i]
+        if effective_to is not None and day > effective_to:
+            return None
+        return effective_to, rate
+
+    def rate_for(self, location_id, day, default=None):
+        """
+        The rate in effect at a location on a date, or `default` when no
+        TaxRate row covers that date.
+        """
+        interval = self._interval(location_id, day)
+        return default if interval is None else interval[1]
+
+    def line_item_rate(self, location, day):
+        """
+        Rate to stamp on a new line item. The open-ended (current) rate is
+        read from the location row loaded for this request rather than the
+        index, so a rate change is never missed while the index is stale.
+        """
+        interval = self._interval(location.id, day)
+        if interval is None or interval[0] is None:
+            return location.current_tax_rate or 0
+        return interval[1] or 0
+
+
+tax_rates = TaxRateResolver()
@@ -0,0 +1,154 @@
+from collections import Counter
+from decimal import Decimal
+from sqlalchemy import select, update, func, case
+from app.models import Ticket, Transaction, LineItem
+from app.extensions import db
+from app.services.rollup_service import refresh_rollups
+from app.services.report_cache import report_cache
+from app.services.tax_rate_service import tax_rates
+from app.utils.totals import batch_amounts
+
+# how many sample changes to keep in the summary
+SAMPLE_SIZE = 20
+
+
+def _signed(column):
+    return case((LineItem.is_return == True, -column), else_=column)
+
+
+def _update_parent_totals(transaction_ids, ticket_ids):
+    """Set-based UPDATEs re-summing tax/total for the given transactions and tickets"""
+    line_items = select(LineItem).where(LineItem.transaction_id == Transaction.id)
+    db.session.execute(
+        update(Transaction)
+        .where(Transaction.id.in_(transaction_ids))
+        .values(
+            tax_total=line_items.with_only_columns(func.coalesce(func.sum(_signed(LineItem.tax_amount)), 0)).scalar_subquery(),
+            total=line_items.with_only_columns(func.coalesce(func.sum(_signed(LineItem.total)), 0)).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    transactions = select(Transaction).where(Transaction.ticket_id == Ticket.id)
+    db.session.execute(
+        update(Ticket)
+        .where(Ticket.id.in_(ticket_ids))
+        .values(
+            tax_total=transactions.with_only_columns(func.coalesce(func.sum(Transaction.tax_total), 0)).scalar_subquery(),
+            total=transactions.with_only_columns(func.coalesce(func.sum(Transaction.total), 0)).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recalculate_tax(location_id, start_date, end_date=None, rate=None, dry_run=False, chunk_size=1000, progress=None):
+    """
+    Re-stamp the tax rate on a location's line items posted from start_date
+    (to end_date, or open ended so future-dated tickets are included) and
+    recompute tax_amount/total, then the transaction and ticket totals.
+
+    The rate comes from the tax_rate history for each posted date unless
+    `rate` is given. Line items are streamed by id in chunks and every chunk
+    is committed on its own, so locks are only held for one chunk at a time.
+    Rollups and cached reports for the touched days are refreshed per chunk.
+
+    progress(scanned, total, summary) is called after each chunk.
+    Returns a summary of what changed (or would change, with dry_run).
+    """
+    if rate is not None:
+        rate = Decimal(str(rate))
+
+    filters = [Transaction.location_id == location_id, Transaction.posted_date >= start_date]
+    if end_date:
+        filters.append(Transaction.posted_date <= end_date)
+
+    total_items = db.session.execute(
+        select(func.count(LineItem.id)).join(LineItem.transaction).where(*filters)
+    ).scalar()
+
+    summary = {
+        "location_id": location_id,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat() if end_date else None,
+        "dry_run": dry_run,
+        "line_items": total_items,
+        "scanned": 0,
+        "changed": 0,
+        "transactions": 0,
+        "tickets": 0,
+        "tax_before": 0,
+        "tax_after": 0,
+        "rates": Counter(),
+        "samples": [],
+    }
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(
+                LineItem.id, LineItem.transaction_id, LineItem.unit_price, LineItem.taxable,
+                LineItem.tax_rate, LineItem.tax_amount, LineItem.total, LineItem.is_return,
+                Transaction.ticket_id, Transaction.posted_date, Transaction.user_id,
+            )
+            .join(LineItem.transaction)
+            .where(*filters, LineItem.id > last_id)
+            .order_by(LineItem.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        new_rates = [
+            rate if rate is not None else tax_rates.rate_for(location_id, row.posted_date, default=row.tax_rate) or 0
+            for row in rows
+        ]
+        new_tax, new_totals = batch_amounts(
+            [row.unit_price for row in rows], new_rates, [row.taxable for row in rows]
+        )
+
+        changes = []
+        for row, new_rate, tax, total in zip(rows, new_rates, new_tax, new_totals):
+            if (row.tax_rate, row.tax_amount, row.total) == (new_rate, tax, total):
+                continue
+            sign = -1 if row.is_return else 1
+            summary["tax_before"] += sign * (row.tax_amount or 0)
+            summary["tax_after"] += sign * tax
+            summary["rates"][f"{row.tax_rate} -> {new_rate}"] += 1
+            if len(summary["samples"]) < SAMPLE_SIZE:
+                summary["samples"].append({
+                    "line_item_id": row.id,
+                    "posted_date": row.posted_date.isoformat(),
+                    "tax_rate": [str(row.tax_rate), str(new_rate)],
+                    "tax_amount": [row.tax_amount, tax],
+                    "total": [row.total, total],
+                })
+            changes.append((row, new_rate, tax, total))
+
+        summary["scanned"] += len(rows)
+        summary["changed"] += len(changes)
+
+        if changes and not dry_run:
+            db.session.execute(update(LineItem), [
+                {"id": row.id, "tax_rate": new_rate, "tax_amount": tax, "total": total}
+                for row, new_rate, tax, total in changes
+            ])
+            transaction_ids = {row.transaction_id for row, *_ in changes}
+            ticket_ids = {row.ticket_id for row, *_ in changes}
+            _update_parent_totals(transaction_ids, ticket_ids)
+            keys = refresh_rollups({(row.posted_date, location_id, row.user_id) for row, *_ in changes})
+            db.session.commit()
+            report_cache.invalidate_sales(keys)
+
+            summary["transactions"] += len(transaction_ids)
+            summary["tickets"] += len(ticket_ids)
+        else:
+            # end the read transaction between chunks
+            db.session.rollback()
+
+        if progress:
+            progress(summary["scanned"], total_items, summary)
+
+    summary["tax_delta"] = summary["tax_after"] - summary["tax_before"]
+    summary["rates"] = dict(summary["rates"])
+    return summary
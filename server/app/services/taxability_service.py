@@ -0,0 +1,85 @@
+from app.models import TaxabilityOverride, SalesCategoryEnum, PaymentTypeEnum, TaxabilitySourceEnum
+from app.models.services.tax_rules import DEFAULT_TAXABILITY, determine_taxability
+from app.extensions import db
+from app.utils.reloading_cache import ReloadingCache
+
+
+def _specificity(override):
+    return (override.category is not None) * 2 + (override.payment_type is not None)
+
+
+def compile_tables(overrides):
+    """
+    location_id -> {(category, payment_type): (taxable, source)}
+
+    Each location with overrides gets a full copy of DEFAULT_TAXABILITY with
+    its rules applied least specific first, so the most specific one wins.
+    """
+    by_location = {}
+    for override in overrides:
+        by_location.setdefault(override.location_id, []).append(override)
+
+    tables = {}
+    for location_id, rules in by_location.items():
+        table = dict(DEFAULT_TAXABILITY)
+        for rule in sorted(rules, key=_specificity):
+            categories = [rule.category] if rule.category else list(SalesCategoryEnum)
+            payment_types = [rule.payment_type] if rule.payment_type else list(PaymentTypeEnum)
+            for category in categories:
+                for payment_type in payment_types:
+                    table[(category, payment_type)] = (rule.taxable, TaxabilitySourceEnum.LOCATION_OVERRIDE)
+        tables[location_id] = table
+    return tables
+
+
+def load_taxability_tables(engine):
+    # own connection so loading never autoflushes the caller's half-built objects
+    with engine.connect() as conn:
+        overrides = conn.execute(
+            db.select(
+                TaxabilityOverride.location_id,
+                TaxabilityOverride.category,
+                TaxabilityOverride.payment_type,
+                TaxabilityOverride.taxable,
+            ).order_by(TaxabilityOverride.id)
+        ).all()
+    return compile_tables(overrides)
+
+
+class TaxabilityRules:
+    """
+    Compiled taxability lookup: (category, payment_type, location) ->
+    (taxable, source) in one dict lookup.
+
+    Locations without overrides share DEFAULT_TAXABILITY. Overrides come from
+    the taxability_overrides table; call invalidate() after changing them.
+    It bumps a version in redis so other workers reload on their next request
+    (TAXABILITY_CACHE_TTL only applies while redis is down).
+    """
+
+    def __init__(self):
+        self._tables = ReloadingCache(load_taxability_tables, "TAXABILITY_CACHE_TTL", version_key="taxability")
+
+    def invalidate(self):
+        self._tables.invalidate()
+
+    def table_for(self, location_id):
+        """The compiled {(category, payment_type): (taxable, source)} for a location, don't mutate it"""
+        return self._tables.get().get(location_id, DEFAULT_TAXABILITY)
+
+    def resolve(self, category, payment_type, location_id=None):
+        rule = self.table_for(location_id).get((category, payment_type))
+        if rule is None:
+            return determine_taxability(category=category, payment_type=payment_type, location=None)
+        return rule
+
+    def resolve_many(self, pairs, location_id=None):
+        """Batch mode for whole tickets: [(category, payment_type), ...] -> [(taxable, source), ...]"""
+        table = self.table_for(location_id)
+        return [
+            table.get(pair) or determine_taxability(category=pair[0], payment_type=pair[1], location=None)
+            for pair in pairs
+        ]
+
+
+taxability_rules = TaxabilityRules()
@@ -0,0 +1,145 @@
+from enum import Enum
+from datetime import date, datetime
+from sqlalchemy import select
+from app.models import Ticket, Transaction, LineItem, User, Location
+from app.extensions import db
+
+#------------------
+# TICKET DETAIL FAST PATH
+#------------------
+# Builds the same response as ticket.serialize(include_relationships=True)
+# under the "ticket_detail" load plan, but from two column-only SELECTs and
+# plain dicts, no ORM objects are created:
+#   1. the ticket with its location and user
+#   2. every transaction with its line items, location, user and the user's
+#      location, one row per line item
+# benchmarks/ticket_detail.py checks the output matches and times both.
+
+tickets = Ticket.__table__
+transactions = Transaction.__table__
+line_items = LineItem.__table__
+users = User.__table__
+locations = Location.__table__
+ticket_location = locations.alias("ticket_location")
+tx_location = locations.alias("tx_location")
+user_location = locations.alias("user_location")
+
+def _plain(value):
+    """Same conversion Base.serialize() does"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _fields(prefix, names):
+    """(key, label) pairs, labels are built once instead of per row"""
+    return tuple((name, f"{prefix}{name}") for name in names)
+
+
+def _labeled(table, fields):
+    return [table.c[name].label(label) for name, label in fields]
+
+
+def _pick(row, fields):
+    return {name: _plain(row[label]) for name, label in fields}
+
+
+TICKET_FIELDS = _fields("t_", tickets.c.keys())
+TICKET_LOCATION_FIELDS = _fields("tl_", ("id", "name", "code"))
+TICKET_USER_FIELDS = _fields("tu_", ("id", "first_name", "last_name"))
+TRANSACTION_FIELDS = _fields("tx_", transactions.c.keys())
+LINE_ITEM_FIELDS = _fields("li_", line_items.c.keys())
+TX_LOCATION_FIELDS = _fields("xl_", locations.c.keys())
+USER_FIELDS = _fields("u_", ("id", "first_name", "last_name", "email", "terminated", "department", "is_admin", "location_id"))
+USER_LOCATION_FIELDS = _fields("ul_", locations.c.keys())
+
+TICKET_QUERY = (
+    select(
+        *_labeled(tickets, TICKET_FIELDS),
+        *_labeled(ticket_location, TICKET_LOCATION_FIELDS),
+        *_labeled(users, TICKET_USER_FIELDS),
+    )
+    .join(ticket_location, ticket_location.c.id == tickets.c.location_id)
+    .join(users, users.c.id == tickets.c.user_id)
+)
+
+TRANSACTION_QUERY = (
+    select(
+        *_labeled(transactions, TRANSACTION_FIELDS),
+        *_labeled(line_items, LINE_ITEM_FIELDS),
+        *_labeled(tx_location, TX_LOCATION_FIELDS),
+        *_labeled(users, USER_FIELDS),
+        *_labeled(user_location, USER_LOCATION_FIELDS),
+    )
+    .outerjoin(line_items, line_items.c.transaction_id == transactions.c.id)
+    .join(tx_location, tx_location.c.id == transactions.c.location_id)
+    .join(users, users.c.id == transactions.c.user_id)
+    .outerjoin(user_location, user_location.c.id == users.c.location_id)
+    .order_by(transactions.c.id, line_items.c.id)
+)
+
+
+def _line_item(row):
+    data = _pick(row, LINE_ITEM_FIELDS)
+    tax_rate = row["li_tax_rate"]
+    data["tax_rate"] = float(tax_rate) * 100 if tax_rate else None
+    return data
+
+
+def _user(row):
+    data = _pick(row, USER_FIELDS)
+    data["department"] = str(row["u_department"])
+    data["location"] = _pick(row, USER_LOCATION_FIELDS) if row["ul_id"] is not None else None
+    return data
+
+
+def fetch_ticket_detail(ticket_number):
+    """
+    Ticket detail dict for a ticket number, or None if it doesn't exist.
+    Always two queries.
+    """
+    ticket_row = db.session.execute(
+        TICKET_QUERY.where(tickets.c.ticket_number == ticket_number)
+    ).mappings().first()
+    if ticket_row is None:
+        return None
+
+    ticket = _pick(ticket_row, TICKET_FIELDS)
+    data = {
+        **ticket,
+        "location": _pick(ticket_row, TICKET_LOCATION_FIELDS),
+        "user": _pick(ticket_row, TICKET_USER_FIELDS),
+        "transactions": [],
+    }
+
+    rows = db.session.execute(
+        TRANSACTION_QUERY.where(transactions.c.ticket_id == ticket["id"])
+    ).mappings()
+
+    # users and locations repeat on every row, build each one once
+    user_cache = {}
+    location_cache = {}
+    current = None
+    for row in rows:
+        if current is None or current["id"] != row["tx_id"]:
+            current = _pick(row, TRANSACTION_FIELDS)
+
+            user_id = row["u_id"]
+            if user_id not in user_cache:
+                user_cache[user_id] = _user(row)
+            location_id = row["xl_id"]
+            if location_id not in location_cache:
+                location_cache[location_id] = _pick(row, TX_LOCATION_FIELDS)
+
+            current["ticket"] = ticket
+            current["user"] = user_cache[user_id]
+            current["location"] = location_cache[location_id]
+            current["line_items"] = []
+            data["transactions"].append(current)
+
+        if row["li_id"] is not None:
+            current["line_items"].append(_line_item(row))
+
+    return data
@@ -0,0 +1,124 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from app.logger import setup_logger
+
+logger = setup_logger("cerberus")
+
+# options StaticPool (in-memory sqlite) doesn't take
+POOL_SIZING_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+# InnoDB's default, REPEATABLE READ, has INSERT ... SELECT take next-key locks
+# on the rows it reads, see refresh_rollups()
+MYSQL_ISOLATION_LEVEL = "READ COMMITTED"
+
+
+class MonitoredQueuePool(QueuePool):
+    """
+    QueuePool that counts checkouts and times the ones that found every
+    connection in use, pool_size + max_overflow all checked out, and had to
+    wait for one to come back. Waits over DB_POOL_SLOW_CHECKOUT_MS are logged,
+    as is every checkout that gives up after pool_timeout.
+
+    Counters start over when the pool is recreated (engine.dispose()).
+    """
+
+    slow_checkout_ms = 100
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.exhausted = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def _do_get(self):
+        exhausted = self._max_overflow > -1 and self.checkedin() == 0 and self.overflow() >= self._max_overflow
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            logger.error(
+                f"[DB POOL]: no connection after {self._timeout}s, {self.checkedout()} checked out "
+                f"(pool_size {self.size()} + max_overflow {self._max_overflow})"
+            )
+            raise
+        finally:
+            waited = (time.perf_counter() - started) * 1000
+            with self._stats_lock:
+                self.checkouts += 1
+                if exhausted:
+                    self.exhausted += 1
+                    self.wait_ms_total += waited
+                    self.wait_ms_max = max(self.wait_ms_max, waited)
+            if exhausted and waited >= self.slow_checkout_ms:
+                logger.warning(
+                    f"[DB POOL]: waited {waited:.1f}ms for a connection, pool exhausted "
+                    f"(pool_size {self.size()} + max_overflow {self._max_overflow})"
+                )
+
+
+class PoolMonitor:
+    """
+    Sets up SQLALCHEMY_ENGINE_OPTIONS before the engines are created: pools
+    become MonitoredQueuePool, and the sizing options are dropped for
+    in-memory sqlite, where Flask-SQLAlchemy uses a StaticPool. MySQL
+    connections default to READ COMMITTED (DB_ISOLATION_LEVEL).
+    Must be initialised before db.init_app().
+    """
+
+    def init_app(self, app):
+        app.config.setdefault("DB_POOL_SLOW_CHECKOUT_MS", 100)
+        MonitoredQueuePool.slow_checkout_ms = app.config["DB_POOL_SLOW_CHECKOUT_MS"]
+
+        options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+        uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+        if uri and self._in_memory_sqlite(uri):
+            options = {k: v for k, v in options.items() if k not in POOL_SIZING_OPTIONS}
+        elif uri:
+            options.setdefault("poolclass", MonitoredQueuePool)
+        if uri and make_url(uri).get_backend_name() in ("mysql", "mariadb"):
+            options.setdefault("isolation_level", app.config.get("DB_ISOLATION_LEVEL") or MYSQL_ISOLATION_LEVEL)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    @staticmethod
+    def _in_memory_sqlite(uri):
+        url = make_url(uri)
+        return url.get_backend_name() == "sqlite" and (
+            url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+        )
+
+    @staticmethod
+    def snapshot(engine):
+        """Current usage and wait counters for one engine's pool"""
+        pool = engine.pool
+        stats = {"pool": type(pool).__name__, "status": pool.status()}
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout_s": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        if isinstance(pool, MonitoredQueuePool):
+            with pool._stats_lock:
+                stats.update({
+                    "checkouts": pool.checkouts,
+                    "exhausted_waits": pool.exhausted,
+                    "timeouts": pool.timeouts,
+                    "wait_ms_total": round(pool.wait_ms_total, 2),
+                    "wait_ms_avg": round(pool.wait_ms_total / pool.exhausted, 2) if pool.exhausted else 0,
+                    "wait_ms_max": round(pool.wait_ms_max, 2),
+                })
+        return stats
+
+
+pool_monitor = PoolMonitor()
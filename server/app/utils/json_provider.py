@@ -0,0 +1,82 @@
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed.
+
+    Output matches DefaultJSONProvider: keys sorted, str-Enums as their
+    value, Decimal tax rates as strings and date/datetime through the same
+    default() (HTTP dates), so responses don't change with the backend.
+    orjson doesn't escape non-ASCII, which is still valid JSON.
+
+    Calls with keyword arguments orjson has no equivalent for (custom
+    default, cls, ...) go to the stdlib encoder.
+    """
+
+    # kwargs Flask itself passes that orjson can honour
+    _ORJSON_KWARGS = {"indent", "separators"}
+
+    def _options(self, indent=None):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or not kwargs.keys() <= self._ORJSON_KWARGS:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(kwargs.get("indent"))).decode()
+        except TypeError:
+            # ints past 64 bits and other edge cases orjson rejects
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+#-------------------------
+# Streaming
+#-------------------------
+def stream_json(key, items, chunk_size=100, **envelope):
+    """
+    Streamed response for a payload with one large array:
+    {**envelope, key: items}
+
+    Items are encoded chunk_size at a time while the response is being sent,
+    so the full body is never built as one string. Items must already be
+    serialized, the db session is gone by the time the body is written.
+    The array key comes after the envelope keys instead of in sorted order,
+    and encode time isn't in Server-Timing since the headers go out first.
+    """
+    provider = current_app.json
+
+    def generate():
+        head = provider.dumps(envelope, separators=(",", ":"))[:-1]
+        yield f'{head}{"," if envelope else ""}{provider.dumps(key)}:['
+        for i in range(0, len(items), chunk_size):
+            chunk = ",".join(provider.dumps(item, separators=(",", ":")) for item in items[i:i + chunk_size])
+            yield chunk if i == 0 else f",{chunk}"
+        yield "]}\n"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=provider.mimetype)
+
+
+def json_provider_class(name):
+    """JSON_PROVIDER config value -> provider class"""
+    providers = {"orjson": OrjsonProvider, "json": DefaultJSONProvider}
+    try:
+        return providers[name]
+    except KeyError:
+        raise ValueError(f"Unknown JSON_PROVIDER: {name}, expected one of {', '.join(providers)}")
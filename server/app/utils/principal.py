@@ -0,0 +1,92 @@
+import threading
+import time
+from dataclasses import dataclass
+from flask import current_app, g
+from flask_login import UserMixin
+from sqlalchemy import select
+from app.extensions import db
+from app.models import User, DepartmentEnum
+from app.models.load_plans import load_plan
+
+PRINCIPAL_COLUMNS = (
+    User.id, User.first_name, User.last_name, User.email,
+    User.department, User.is_admin, User.location_id, User.terminated,
+)
+
+
+@dataclass(frozen=True, eq=False)
+class Principal(UserMixin):
+    """
+    What Flask-Login's current_user is on every authenticated request: the
+    handful of user fields routes check, loaded without the ORM.
+
+    Routes that need the real User (relationships, writes, serialize())
+    call hydrate(), which loads it once per request.
+    """
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    department: DepartmentEnum
+    is_admin: bool
+    location_id: int
+    terminated: bool
+
+    def hydrate(self):
+        """The full ORM User, loaded on first use within the request"""
+        user = g.get("_current_user_model")
+        if user is None or user.id != self.id:
+            user = db.session.get(User, self.id, options=load_plan("user_card"))
+            g._current_user_model = user
+        return user
+
+    def serialize(self):
+        return self.hydrate().serialize()
+
+
+class PrincipalCache:
+    """
+    Principals by user id for the user_loader, kept for PRINCIPAL_CACHE_TTL
+    seconds. A miss is one column-only SELECT.
+
+    Routes that change a user's fields call invalidate(user_id) after
+    committing. The cache is per process, so other workers see the change
+    once their entry expires; keep the TTL short.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def load(self, user_id):
+        user_id = int(user_id)
+        engine = db.engine
+        ttl = current_app.config.get("PRINCIPAL_CACHE_TTL", 30)
+
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            cached_engine, expires, principal = entry
+            if cached_engine is engine and time.monotonic() < expires:
+                return principal
+
+        row = db.session.execute(select(*PRINCIPAL_COLUMNS).where(User.id == user_id)).first()
+        if row is None:
+            self.invalidate(user_id)
+            return None
+
+        principal = Principal(*row)
+        if ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (engine, time.monotonic() + ttl, principal)
+        return principal
+
+    def invalidate(self, user_id=None):
+        """Drop one user's principal, or every principal"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+
+
+principals = PrincipalCache()
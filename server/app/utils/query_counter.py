@@ -0,0 +1,34 @@
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """
+    Counts SQL statements sent to an engine while the block is active.
+
+    usage:
+        with QueryCounter(db.engine) as counter:
+            client.get("/api/read/users")
+        counter.count -> 2
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def reset(self):
+        self.count = 0
+        self.statements = []
+
+    def __enter__(self):
+        self.reset()
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
@@ -0,0 +1,240 @@
+import json
+import secrets
+from datetime import datetime, timezone
+from flask import current_app, g, session as current_session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SecureCookieSession, SecureCookieSessionInterface
+from itsdangerous import Signer, BadSignature
+from redis.exceptions import RedisError
+from app.utils.redis_store import redis_store
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+
+class CompactSessionSerializer:
+    """
+    Flask's tagged session format (tuples, bytes, datetimes... survive a
+    round trip) written as minified JSON bytes, with orjson when installed.
+    """
+
+    def __init__(self):
+        self._tagger = TaggedJSONSerializer()
+
+    def dumps(self, value):
+        tagged = self._tagger.tag(value)
+        if orjson is not None:
+            return orjson.dumps(tagged)
+        return json.dumps(tagged, separators=(",", ":")).encode()
+
+    def loads(self, data):
+        return self._untag(orjson.loads(data) if orjson is not None else json.loads(data))
+
+    def _untag(self, value):
+        # innermost first, same order as json's object_hook
+        if isinstance(value, dict):
+            return self._tagger.untag({k: self._untag(v) for k, v in value.items()})
+        if isinstance(value, list):
+            return [self._untag(v) for v in value]
+        return value
+
+
+class RedisSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, new=False):
+        super().__init__(initial)
+        self.sid = sid
+        self.new = new
+        # who the session belonged to when it was loaded, see save_session()
+        # (dict.get so reading it doesn't mark the session accessed)
+        self.loaded_user_id = dict.get(self, "_user_id")
+
+
+class RedisSessionInterface(SessionInterface):
+    """
+    Server-side sessions: the cookie only carries a random session id
+    (signed when SESSION_USE_SIGNER is on) and the data lives in redis under
+    SESSION_KEY_PREFIX + "session:" + id.
+
+    Per request that's one GET when the browser sends a cookie, plus one
+    SET when the session changed or an EXPIRE to slide a permanent
+    session's lifetime. Empty sessions are never stored, so anonymous
+    requests cost nothing. If redis is down the request is treated as
+    logged out and the cookie is left alone.
+    """
+
+    serializer = CompactSessionSerializer()
+    session_class = RedisSession
+    salt = "cerberus-session"
+
+    #-------------------------
+    # Ids
+    #-------------------------
+    @staticmethod
+    def _new_sid():
+        return secrets.token_urlsafe(32)
+
+    def _signer(self, app):
+        if not app.config.get("SESSION_USE_SIGNER", True):
+            return None
+        return Signer(app.secret_key, salt=self.salt)
+
+    def _cookie_value(self, app, sid):
+        signer = self._signer(app)
+        return signer.sign(sid).decode() if signer else sid
+
+    def _sid_from_cookie(self, app, value):
+        signer = self._signer(app)
+        if signer is None:
+            return value
+        try:
+            return signer.unsign(value).decode()
+        except BadSignature:
+            return None
+
+    @staticmethod
+    def _key(app, sid):
+        return f"{app.config.get('SESSION_KEY_PREFIX', 'cerberus:')}session:{sid}"
+
+    @staticmethod
+    def _client(app):
+        client = redis_store.client
+        if client is None:
+            raise RuntimeError("SESSION_TYPE=redis needs REDIS_URL")
+        return client
+
+    @staticmethod
+    def _permanent(app, session):
+        return session.permanent or app.config.get("SESSION_PERMANENT", True)
+
+    def store(self, app, session):
+        """
+        Writes a changed session to redis, False (and g._session_store_failed)
+        if redis refused it. A login into an existing session gets a fresh id
+        first so a planted cookie can't follow it.
+        """
+        client = self._client(app)
+        try:
+            if not session.new and session.get("_user_id") != session.loaded_user_id:
+                client.delete(self._key(app, session.sid))
+                session.sid = self._new_sid()
+                session.new = True
+            client.set(
+                self._key(app, session.sid),
+                self.serializer.dumps(dict(session)),
+                ex=int(app.permanent_session_lifetime.total_seconds())
+            )
+        except RedisError as e:
+            app.logger.error(f"[SESSION]: could not save session: {e}")
+            g._session_store_failed = True
+            return False
+        session.loaded_user_id = session.get("_user_id")
+        return True
+
+    #-------------------------
+    # SessionInterface
+    #-------------------------
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+
+        value = request.cookies.get(self.get_cookie_name(app))
+        sid = self._sid_from_cookie(app, value) if value else None
+        if sid is None:
+            return self.session_class(sid=self._new_sid(), new=True)
+
+        try:
+            data = self._client(app).get(self._key(app, sid))
+        except RedisError as e:
+            app.logger.error(f"[SESSION]: could not load session: {e}")
+            return self.session_class(sid=self._new_sid(), new=True)
+
+        if data is None:
+            # expired or logged out elsewhere
+            return self.session_class(sid=self._new_sid(), new=True)
+        try:
+            return self.session_class(self.serializer.loads(data), sid=sid)
+        except ValueError:
+            app.logger.error(f"[SESSION]: discarding unreadable session {sid[:8]}")
+            return self.session_class(sid=self._new_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        partitioned = self.get_cookie_partitioned(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        client = self._client(app)
+        if not session:
+            if session.modified and not session.new:
+                try:
+                    client.delete(self._key(app, session.sid))
+                except RedisError as e:
+                    app.logger.error(f"[SESSION]: could not delete session: {e}")
+                response.delete_cookie(
+                    name, domain=domain, path=path, secure=secure,
+                    samesite=samesite, httponly=httponly, partitioned=partitioned
+                )
+            return
+
+        # redis already refused this session during the request
+        if g.get("_session_store_failed"):
+            return
+
+        permanent = self._permanent(app, session)
+        if not (session.modified or (permanent and app.config["SESSION_REFRESH_EACH_REQUEST"])):
+            return
+
+        lifetime = app.permanent_session_lifetime
+        if session.modified or session.new:
+            if not self.store(app, session):
+                return
+        else:
+            try:
+                if not client.expire(self._key(app, session.sid), int(lifetime.total_seconds())):
+                    # gone since open_session (logged out in another tab)
+                    return
+            except RedisError as e:
+                app.logger.error(f"[SESSION]: could not refresh session: {e}")
+                return
+
+        response.set_cookie(
+            name,
+            self._cookie_value(app, session.sid),
+            expires=datetime.now(timezone.utc) + lifetime if permanent else None,
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            samesite=samesite,
+            partitioned=partitioned,
+        )
+
+
+def persist_session():
+    """
+    Saves the current session now rather than after the response is built,
+    for routes that report success only once the session is stored (login).
+    Returns False when it couldn't be stored; signed cookie sessions always
+    succeed.
+    """
+    interface = current_app.session_interface
+    if not isinstance(interface, RedisSessionInterface):
+        return True
+    return interface.store(current_app._get_current_object(), current_session._get_current_object())
+
+
+def session_interface_class(name):
+    """SESSION_TYPE config value -> session interface class"""
+    interfaces = {"redis": RedisSessionInterface, "cookie": SecureCookieSessionInterface}
+    try:
+        return interfaces[name]
+    except KeyError:
+        raise ValueError(f"Unknown SESSION_TYPE: {name}, expected one of {', '.join(interfaces)}")
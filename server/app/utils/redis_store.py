@@ -0,0 +1,70 @@
+import threading
+from flask import current_app
+import redis
+
+try:
+    import fakeredis
+except ImportError:  # optional, only needed for REDIS_URL=memory://
+    fakeredis = None
+
+# REDIS_URL for a process-local stand-in, for tests and benchmarks
+MEMORY_URL = "memory://"
+
+
+class RedisStore:
+    """
+    The app's redis client, shared by sessions, the report cache and jobs.
+
+    The client isn't built until something first asks for it, so importing
+    config or running CLI scripts never touches redis. All users share one
+    connection pool per app (REDIS_MAX_CONNECTIONS, blocking for up to
+    REDIS_POOL_TIMEOUT seconds when they are all checked out). redis-py
+    resets the pool in a forked worker, so a client created before the fork
+    is safe to keep using.
+
+    REDIS_URL=memory:// uses fakeredis instead of a server, and an empty
+    REDIS_URL turns redis off (client is None).
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("REDIS_URL", "redis://localhost:6379")
+        app.config.setdefault("REDIS_MAX_CONNECTIONS", 20)
+        app.config.setdefault("REDIS_POOL_TIMEOUT", 5)
+        app.config.setdefault("REDIS_SOCKET_TIMEOUT", 2)
+        app.extensions["redis"] = None
+
+    @property
+    def client(self):
+        app = current_app._get_current_object()
+        client = app.extensions.get("redis")
+        if client is None and app.config.get("REDIS_URL"):
+            with self._lock:
+                client = app.extensions.get("redis")
+                if client is None:
+                    client = app.extensions["redis"] = self._connect(app.config)
+        return client
+
+    @staticmethod
+    def _connect(config):
+        url = config["REDIS_URL"]
+        if url == MEMORY_URL:
+            if fakeredis is None:
+                raise RuntimeError("REDIS_URL=memory:// needs the fakeredis package")
+            return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+        pool = redis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=config["REDIS_MAX_CONNECTIONS"],
+            timeout=config["REDIS_POOL_TIMEOUT"],
+            socket_timeout=config["REDIS_SOCKET_TIMEOUT"],
+            socket_connect_timeout=config["REDIS_SOCKET_TIMEOUT"],
+        )
+        return redis.Redis(connection_pool=pool)
+
+
+redis_store = RedisStore()
@@ -0,0 +1,113 @@
+import threading
+import time
+from flask import current_app, g, has_request_context
+from redis.exceptions import RedisError
+from app.extensions import db
+from app.utils.redis_store import redis_store
+
+# how long to stop trying redis after it fails
+REDIS_RETRY_SECONDS = 30
+
+
+class ReloadingCache:
+    """
+    A value built from the database once and shared by every request.
+
+    `loader(engine)` builds the value; it is rebuilt after invalidate(), when
+    the app's engine changes, or when another process has invalidated it.
+
+    With a `version_key`, invalidate() also bumps a counter in redis and
+    every process compares it (once per request) with the version its copy
+    was built at, so a change made in one gunicorn worker reaches the others
+    on their next request. The `ttl_key` config setting is only a backstop
+    for when redis is unreachable.
+
+    usage:
+        rates = ReloadingCache(load_rates, "TAX_RATE_CACHE_TTL", version_key="tax_rates")
+        rates.get()
+    """
+
+    def __init__(self, loader, ttl_key, default_ttl=300, version_key=None):
+        self.loader = loader
+        self.ttl_key = ttl_key
+        self.default_ttl = default_ttl
+        self.version_key = version_key
+        self._lock = threading.Lock()
+        self._value = None
+        self._engine = None
+        self._loaded_at = 0
+        self._version = None
+        self._redis_down_until = 0
+
+    #-------------------------
+    # Versions
+    #-------------------------
+    def _redis(self):
+        if self.version_key is None or time.monotonic() < self._redis_down_until:
+            return None
+        return redis_store.client
+
+    def _redis_failed(self, e):
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        current_app.logger.warning(f"[RELOADING CACHE]: redis unavailable, {self.version_key} reloads on its TTL: {e}")
+
+    def _key(self):
+        return f"{current_app.config.get('SESSION_KEY_PREFIX', 'cerberus:')}version:{self.version_key}"
+
+    def _current_version(self):
+        """The shared version, read once per request; None without redis"""
+        client = self._redis()
+        if client is None:
+            return None
+
+        checked = g.setdefault("_cache_versions", {}) if has_request_context() else {}
+        if self.version_key in checked:
+            return checked[self.version_key]
+        try:
+            version = client.get(self._key())
+        except RedisError as e:
+            self._redis_failed(e)
+            return None
+        checked[self.version_key] = version = int(version or 0)
+        return version
+
+    #-------------------------
+    # Cache
+    #-------------------------
+    def _usable(self, engine, version):
+        if self._value is None or self._engine is not engine:
+            return False
+        if version is not None and self._version is not None:
+            return version == self._version
+        ttl = current_app.config.get(self.ttl_key, self.default_ttl)
+        return time.monotonic() - self._loaded_at < ttl
+
+    def get(self):
+        engine = db.engine
+        # read before loading, a bump during the load means the next get() reloads
+        version = self._current_version()
+        value = self._value
+        if self._usable(engine, version):
+            return value
+
+        with self._lock:
+            if not self._usable(engine, version):
+                self._value = self.loader(engine)
+                self._engine = engine
+                self._loaded_at = time.monotonic()
+                self._version = version
+            return self._value
+
+    def invalidate(self):
+        """Drop this process's copy and, with a version_key, every other process's"""
+        with self._lock:
+            self._value = None
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.incr(self._key())
+        except RedisError as e:
+            self._redis_failed(e)
+        if has_request_context():
+            g.get("_cache_versions", {}).pop(self.version_key, None)
@@ -0,0 +1,230 @@
+import threading
+from bisect import bisect_left
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+from flask import g, request, current_app, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# upper bounds in ms, the last bucket catches everything slower
+HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class TimedJSONMixin:
+    """Adds encode time to the request's stats, goes in front of any JSON provider"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            RequestStats.add_serialize_time(time.perf_counter() - started)
+
+
+class TimedJSONProvider(TimedJSONMixin, DefaultJSONProvider):
+    pass
+
+
+@lru_cache(maxsize=None)
+def timed_provider(provider_class):
+    """provider_class with TimedJSONMixin in front, one class per provider"""
+    if issubclass(provider_class, TimedJSONMixin):
+        return provider_class
+    if provider_class is DefaultJSONProvider:
+        return TimedJSONProvider
+    return type(f"Timed{provider_class.__name__}", (TimedJSONMixin, provider_class), {})
+
+
+class RequestStats:
+    """
+    Per-request SQL and timing instrumentation.
+
+    For every request records the statement count, total DB time, slowest
+    statement, JSON encode time and response size. The numbers go out as a
+    Server-Timing header, slow requests are logged, and a rolling window of
+    samples per route backs the /api/debug/stats endpoint.
+
+    Windows are per process, each gunicorn worker keeps its own.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._totals = defaultdict(int)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("REQUEST_STATS_ENABLED", True)
+        app.config.setdefault("REQUEST_STATS_WINDOW", 1000)
+        app.config.setdefault("REQUEST_STATS_SLOW_MS", 500)
+        app.config.setdefault("SERVER_TIMING_HEADER", True)
+        if not app.config["REQUEST_STATS_ENABLED"]:
+            return
+
+        self.window = app.config["REQUEST_STATS_WINDOW"]
+        self.slow_ms = app.config["REQUEST_STATS_SLOW_MS"]
+        self.server_timing = app.config["SERVER_TIMING_HEADER"]
+
+        if not isinstance(app.json, TimedJSONMixin):
+            app.json = timed_provider(type(app.json))(app)
+
+        # listening on the Engine class covers every engine, once per process
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions["request_stats"] = self
+
+    #-------------------------
+    # Per request
+    #-------------------------
+    @staticmethod
+    def current():
+        if not has_request_context():
+            return None
+        return g.get("_request_stats")
+
+    @classmethod
+    def add_serialize_time(cls, seconds):
+        stats = cls.current()
+        if stats is not None:
+            stats["serialize"] += seconds
+
+    def _start(self):
+        g._request_stats = {
+            "started": time.perf_counter(),
+            "sql_count": 0,
+            "sql_time": 0.0,
+            "slowest_time": 0.0,
+            "slowest": None,
+            "serialize": 0.0,
+        }
+
+    def _finish(self, response):
+        stats = g.pop("_request_stats", None)
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats["started"]) * 1000
+        db_ms = stats["sql_time"] * 1000
+        serialize_ms = stats["serialize"] * 1000
+        # streamed responses don't know their size up front
+        size = None if response.is_streamed else response.calculate_content_length()
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+
+        if self.server_timing:
+            response.headers["Server-Timing"] = ", ".join([
+                f'db;dur={db_ms:.2f};desc="{stats["sql_count"]} queries"',
+                f"serialize;dur={serialize_ms:.2f}",
+                f"total;dur={total_ms:.2f}",
+            ])
+
+        self._record(route, response.status_code, total_ms, db_ms, serialize_ms, stats["sql_count"], size)
+
+        if total_ms >= self.slow_ms:
+            slowest = " ".join((stats["slowest"] or "").split())[:300]
+            current_app.logger.warning(
+                f"[SLOW REQUEST]: {route} {response.status_code} {total_ms:.1f}ms, "
+                f"{stats['sql_count']} queries in {db_ms:.1f}ms, serialize {serialize_ms:.1f}ms, "
+                f"{size if size is not None else 'streamed'} bytes, "
+                f"slowest query {stats['slowest_time'] * 1000:.1f}ms: {slowest}"
+            )
+        else:
+            current_app.logger.debug(
+                f"[REQUEST]: {route} {response.status_code} {total_ms:.1f}ms, "
+                f"{stats['sql_count']} queries in {db_ms:.1f}ms"
+            )
+        return response
+
+    #-------------------------
+    # Rolling windows
+    #-------------------------
+    def _record(self, route, status, total_ms, db_ms, serialize_ms, sql_count, size):
+        with self._lock:
+            samples = self._routes.get(route)
+            if samples is None:
+                samples = self._routes[route] = deque(maxlen=self.window)
+            samples.append((total_ms, db_ms, serialize_ms, sql_count, size or 0, status >= 500))
+            self._totals[route] += 1
+
+    def snapshot(self):
+        """Summary of the current window for every route, slowest p95 first"""
+        with self._lock:
+            routes = {route: list(samples) for route, samples in self._routes.items()}
+            totals = dict(self._totals)
+
+        summary = []
+        for route, samples in routes.items():
+            latencies = sorted(s[0] for s in samples)
+            counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+            for ms in latencies:
+                counts[bisect_left(HISTOGRAM_BUCKETS, ms)] += 1
+            # le=None is the overflow bucket
+            histogram = [
+                {"le": bound, "count": count}
+                for bound, count in zip(HISTOGRAM_BUCKETS + [None], counts)
+            ]
+
+            n = len(samples)
+            summary.append({
+                "route": route,
+                "requests": totals[route],
+                "window": n,
+                "errors": sum(1 for s in samples if s[5]),
+                "p50_ms": round(_percentile(latencies, 50), 2),
+                "p95_ms": round(_percentile(latencies, 95), 2),
+                "p99_ms": round(_percentile(latencies, 99), 2),
+                "max_ms": round(latencies[-1], 2),
+                "avg_db_ms": round(sum(s[1] for s in samples) / n, 2),
+                "avg_serialize_ms": round(sum(s[2] for s in samples) / n, 2),
+                "avg_queries": round(sum(s[3] for s in samples) / n, 2),
+                "max_queries": max(s[3] for s in samples),
+                "avg_bytes": round(sum(s[4] for s in samples) / n),
+                "histogram_ms": histogram,
+            })
+
+        summary.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._totals.clear()
+
+
+#-------------------------
+# Engine listeners
+#-------------------------
+# the start time lives on the statement's execution context, which is thrown
+# away with the statement even when it fails and after_cursor_execute never runs
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and RequestStats.current() is not None:
+        context._request_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = RequestStats.current()
+    started = getattr(context, "_request_stats_started", None)
+    if stats is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats["sql_count"] += 1
+    stats["sql_time"] += elapsed
+    if elapsed > stats["slowest_time"]:
+        stats["slowest_time"] = elapsed
+        stats["slowest"] = statement
+
+
+request_stats = RequestStats()
@@ -1,4 +1,6 @@
+import base64
 from decimal import Decimal, ROUND_HALF_UP
+from app.utils.totals import compute_totals
 
 def to_int(value):
     """Safely convert any incoming value to int. Fallback = 0."""
@@ -22,14 +24,25 @@ def to_cents(value):
         return 0
     
 def finalize_ticket(ticket):
-    for tx in ticket.transactions:
-        for li in tx.line_items:
-            li.compute_total()
-        tx.compute_total()
-    ticket.compute_total()
+    compute_totals(tickets=[ticket])
     
 
 def finalize_transaction(transaction):
-    for li in transaction.line_items:
-        li.compute_total()
-    transaction.compute_total()
\ No newline at end of file
+    compute_totals(transactions=[transaction])
+
+def encode_cursor(*values):
+    """
+    Opaque keyset cursor for paginated listings.
+    encode_cursor(date(2026, 1, 2), 12345) -> "MjAyNi0wMS0wMnwxMjM0NQ"
+    """
+    raw = "|".join(v.isoformat() if hasattr(v, "isoformat") else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns the raw string parts of a cursor, raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
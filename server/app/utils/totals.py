@@ -0,0 +1,153 @@
+"""
+Batch totals engine.
+
+Computes line item tax/totals for many rows at once in integer cents. Tax
+rates are stored as Numeric(5, 4), so every rate is a whole number of basis
+points and price * rate_bp / 10000 rounded half-up is exactly what
+LineItem.amounts() gets from Decimal.quantize(ROUND_HALF_UP).
+
+NumPy is used for large batches when it is installed, otherwise plain ints.
+Both paths give identical results; benchmarks/totals_equivalence.py checks
+them against the Decimal path.
+"""
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from app.models.line_item import LineItem
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+
+RATE_SCALE = 10_000
+HALF = RATE_SCALE // 2
+
+# below this the array setup costs more than it saves
+NUMPY_MIN_ITEMS = 256
+
+
+@lru_cache(maxsize=1024)
+def rate_to_bp(rate):
+    """
+    Tax rate -> basis points, 0.1075 -> 1075.
+    Returns None if the rate has more than 4 decimal places.
+    Cached, a batch only ever has a handful of distinct rates.
+    """
+    try:
+        scaled = Decimal(str(rate or 0)) * RATE_SCALE
+    except InvalidOperation:
+        return None
+    if scaled != scaled.to_integral_value():
+        return None
+    return int(scaled)
+
+
+#-------------------------
+# Line items
+#-------------------------
+def _amounts_int(unit_prices, rates_bp, taxable):
+    tax_amounts = []
+    totals = []
+    for price, bp, is_taxable in zip(unit_prices, rates_bp, taxable):
+        tax = 0
+        if is_taxable:
+            product = price * bp
+            magnitude = (abs(product) + HALF) // RATE_SCALE
+            tax = magnitude if product >= 0 else -magnitude
+        tax_amounts.append(tax)
+        totals.append(price + tax)
+    return tax_amounts, totals
+
+
+def _amounts_numpy(unit_prices, rates_bp, taxable):
+    prices = np.asarray(unit_prices, dtype=np.int64)
+    product = prices * np.asarray(rates_bp, dtype=np.int64)
+    magnitude = (np.abs(product) + HALF) // RATE_SCALE
+    tax = np.where(np.asarray(taxable, dtype=bool), np.sign(product) * magnitude, 0)
+    return tax.tolist(), (prices + tax).tolist()
+
+
+def line_item_amounts(unit_prices, rates_bp, taxable):
+    """
+    Vectorized LineItem.amounts(): parallel sequences of integer cents,
+    basis points and taxable flags -> (tax_amounts, totals) as lists of int.
+    """
+    unit_prices = [int(p or 0) for p in unit_prices]
+    if np is not None and len(unit_prices) >= NUMPY_MIN_ITEMS:
+        return _amounts_numpy(unit_prices, rates_bp, taxable)
+    return _amounts_int(unit_prices, rates_bp, taxable)
+
+
+def batch_amounts(unit_prices, tax_rates, taxable):
+    """
+    line_item_amounts() for raw tax rates. Rates finer than a basis point
+    can't be done in integers, those rows go through LineItem.amounts().
+    """
+    unit_prices = list(unit_prices)
+    tax_rates = list(tax_rates)
+    taxable = list(taxable)
+    rates_bp = [rate_to_bp(rate) for rate in tax_rates]
+
+    exact = [i for i, bp in enumerate(rates_bp) if bp is not None]
+    if len(exact) == len(rates_bp):
+        return line_item_amounts(unit_prices, rates_bp, taxable)
+
+    tax_amounts = [0] * len(unit_prices)
+    totals = [0] * len(unit_prices)
+    exact_tax, exact_totals = line_item_amounts(
+        [unit_prices[i] for i in exact],
+        [rates_bp[i] for i in exact],
+        [taxable[i] for i in exact],
+    )
+    for i, tax, total in zip(exact, exact_tax, exact_totals):
+        tax_amounts[i], totals[i] = tax, total
+    for i, bp in enumerate(rates_bp):
+        if bp is None:
+            tax_amounts[i], totals[i] = LineItem.amounts(unit_prices[i], tax_rates[i], taxable[i])
+    return tax_amounts, totals
+
+
+def compute_line_items(line_items):
+    """Batch LineItem.compute_total(), writes tax_amount and total back"""
+    line_items = list(line_items)
+    tax_amounts, totals = batch_amounts(
+        [li.unit_price for li in line_items],
+        [li.tax_rate for li in line_items],
+        [li.taxable for li in line_items],
+    )
+    for li, tax, total in zip(line_items, tax_amounts, totals):
+        li.tax_amount = tax
+        li.total = total
+
+
+def compute_line_item_rows(rows):
+    """Same as compute_line_items() for insert-ready dicts"""
+    rows = list(rows)
+    tax_amounts, totals = batch_amounts(
+        [row["unit_price"] for row in rows],
+        [row["tax_rate"] for row in rows],
+        [row["taxable"] for row in rows],
+    )
+    for row, tax, total in zip(rows, tax_amounts, totals):
+        row["tax_amount"] = tax
+        row["total"] = total
+
+
+#-------------------------
+# Transactions / tickets
+#-------------------------
+def compute_totals(tickets=(), transactions=()):
+    """
+    Batch finalize_ticket()/finalize_transaction(): computes every line item
+    in one pass, then rolls the sums up into transactions and tickets.
+    """
+    tickets = list(tickets)
+    transactions = list(transactions) + [tx for ticket in tickets for tx in ticket.transactions]
+
+    compute_line_items(li for tx in transactions for li in tx.line_items)
+
+    for tx in transactions:
+        tx.compute_total()
+
+    for ticket in tickets:
+        ticket.compute_total()
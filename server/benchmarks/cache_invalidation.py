@@ -0,0 +1,150 @@
+"""
+Check that writes reach cached reports (app/services/report_cache.py).
+
+For each cache backend, caches closed-range /reports/summary reports,
+writes a back-dated ticket and then a back-dated deduction through the
+API, and checks that the next request for each affected report is
+recomputed and differs from what was cached. Runs against:
+
+- redis (fakeredis unless BENCH_REDIS_URL is set)
+- redis with an outage: the write happens while redis is marked down, and
+  the reports must still change once redis is back
+- no redis (REDIS_URL empty): the in-process fallback, including another
+  worker's copy expiring after REPORT_CACHE_LOCAL_TTL
+
+run from server/:
+    python -m benchmarks.cache_invalidation
+"""
+import sys
+import time
+from datetime import date, timedelta
+from redis.exceptions import RedisError
+from app.services.report_cache import ReportCache, report_cache
+from benchmarks.fixtures import BenchConfig, build_app, seed_small, seed_random, login
+
+LOCAL_TTL = 1
+YESTERDAY = date.today() - timedelta(days=1)
+START = YESTERDAY - timedelta(days=10)
+
+# the admin is user 1 at location 1, the writes below are theirs
+REPORTS = {
+    "master": f"/api/reports/summary?start={START}&end={YESTERDAY}&type=master",
+    "location 1": f"/api/reports/summary?start={START}&end={YESTERDAY}&type=location&locations=1",
+    "user_eod 1": f"/api/reports/summary?start={YESTERDAY}&type=user_eod&users=1",
+}
+
+
+def make_config(redis_url):
+    return type("CacheCheckConfig", (BenchConfig,), {
+        "REDIS_URL": redis_url,
+        "SESSION_TYPE": "redis" if redis_url else "cookie",
+        "REPORT_CACHE_ENABLED": True,
+        "REPORT_CACHE_LOCAL_TTL": LOCAL_TTL,
+    })
+
+
+class Checker:
+    def __init__(self, backend, redis_url):
+        self.backend = backend
+        self.app = build_app(make_config(redis_url))
+        self.app.logger.setLevel("WARNING")
+        seed_small(self.app)
+        seed_random(self.app, tickets=200)
+        self.client = login(self.app.test_client())
+        self.ticket_number = 900_000
+        self.failures = 0
+
+    def check(self, name, ok):
+        print(f"{self.backend:<14}{name:<52}{'ok' if ok else 'FAIL'}")
+        self.failures += not ok
+
+    def summary(self, url):
+        body = self.client.get(url).get_json()
+        return body["report"], body["meta"]["cached"]
+
+    def warm(self):
+        """Caches every report -> {name: cached report}"""
+        reports = {}
+        for name, url in REPORTS.items():
+            self.summary(url)
+            reports[name], cached = self.summary(url)
+            self.check(f"{name} served from cache", cached)
+        return reports
+
+    def expect_changed(self, write, before):
+        for name, url in REPORTS.items():
+            report, cached = self.summary(url)
+            self.check(f"{name} changes after {write}", not cached and report != before[name])
+
+    def write_ticket(self):
+        self.ticket_number += 1
+        response = self.client.post("/api/create/ticket", json={
+            "ticket_number": self.ticket_number,
+            "date": YESTERDAY.isoformat(),
+            "location_id": 1,
+            "user_id": 1,
+            "line_items": [{"category": "new_appliance", "payment_type": "card", "unit_price": 123_456}],
+        })
+        self.check("ticket written", response.status_code == 201)
+
+    def write_deduction(self):
+        response = self.client.post("/api/create/deduction", json={
+            "amount": 4_321, "reason": "cache check", "date": YESTERDAY.isoformat()
+        })
+        self.check("deduction written", response.status_code == 201)
+
+    def writes(self):
+        before = self.warm()
+        self.write_ticket()
+        self.expect_changed("a ticket", before)
+
+        before = self.warm()
+        self.write_deduction()
+        self.expect_changed("a deduction", before)
+
+    def outage(self):
+        before = self.warm()
+        with self.app.test_request_context():
+            report_cache._redis_failed(RedisError("simulated outage"))
+        self.write_ticket()
+        # redis is back
+        report_cache._redis_down_until = 0
+        self.expect_changed("a ticket during an outage", before)
+
+    def other_worker(self):
+        """A second process's fallback cache doesn't see the write, its entry has to expire"""
+        other = ReportCache()
+        spec = report_cache.spec("location", START, YESTERDAY, [1], [], self.app.config["REPORT_BACKEND"])
+        with self.app.test_request_context():
+            other.set(other.slot(spec), {"stale": True})
+        self.write_ticket()
+        with self.app.test_request_context():
+            self.check("other worker serves its copy within the TTL", other.get(other.slot(spec)) is not None)
+            time.sleep(LOCAL_TTL + 0.1)
+            self.check("other worker's copy expires after the TTL", other.get(other.slot(spec)) is None)
+
+
+def run():
+    backends = {"redis": BenchConfig.REDIS_URL, "none": ""}
+    if not BenchConfig.REDIS_URL:
+        print("fakeredis is not installed and BENCH_REDIS_URL is unset, checking the no-redis path only")
+        del backends["redis"]
+
+    failures = 0
+    for backend, redis_url in backends.items():
+        # fresh state per backend, the cache is a module singleton
+        report_cache.__init__()
+        checker = Checker(backend, redis_url)
+        checker.writes()
+        if redis_url:
+            checker.outage()
+        else:
+            checker.other_worker()
+        failures += checker.failures
+
+    print(f"\n{failures} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,144 @@
+"""
+EXPLAIN the hot query paths and check they use the expected indexes.
+
+Builds each query from the same filters the app uses, runs EXPLAIN against a
+seeded database and fails if none of the expected indexes shows up in the plan.
+Works on SQLite (default, in memory) and MySQL:
+
+run from server/:
+    python -m benchmarks.explain_hot_queries
+    BENCH_DATABASE_URI=mysql+pymysql://user:pw@127.0.0.1/cerberus_bench python -m benchmarks.explain_hot_queries
+"""
+import sys
+from datetime import date, timedelta
+from sqlalchemy import select, func, tuple_
+from app.extensions import db
+from app.models import Transaction, LineItem, Deduction, Ticket, TaxRate, DailySalesRollup
+from app.services.financial_report_service import FinancialReportService
+from benchmarks.fixtures import build_app, seed_small, seed_random
+
+TODAY = date.today()
+MONTH_AGO = TODAY - timedelta(days=30)
+
+
+def report(report_type, **filters):
+    return FinancialReportService(start_date=MONTH_AGO, end_date=TODAY, report_type=report_type, **filters)
+
+
+def hot_queries():
+    """name -> (statement, acceptable index names)"""
+    master = report("master")
+    by_user = report("user_eod", user_ids=[1])
+    by_location = report("location", location_id=[2])
+
+    return {
+        "report rows (master)": (
+            select(Transaction.id).where(*master.sales_filters()),
+            ["ix_transactions_posted_date"],
+        ),
+        "report rows (user)": (
+            select(Transaction.id).where(*by_user.sales_filters()),
+            ["ix_transactions_user_posted"],
+        ),
+        "report rows (location)": (
+            select(Transaction.id).where(*by_location.sales_filters()),
+            ["ix_transactions_location_posted"],
+        ),
+        "report line items (selectin)": (
+            select(LineItem.id, LineItem.unit_price).where(LineItem.transaction_id.in_([1, 2, 3])),
+            # sqlite only, MySQL uses its foreign key index (named after the column)
+            ["ix_line_items_transaction_id", ": transaction_id", "line_items_ibfk"],
+        ),
+        "report deductions (range)": (
+            master.deduction_query(db.session.query(Deduction.amount)).statement,
+            ["ix_deductions_date"],
+        ),
+        "report deductions (user)": (
+            by_user.deduction_query(db.session.query(Deduction.amount)).statement,
+            ["ix_deductions_user_date"],
+        ),
+        "rollup rows (user)": (
+            select(DailySalesRollup.total).where(*by_user.sales_filters(DailySalesRollup)),
+            ["ix_daily_sales_rollup_user_date"],
+        ),
+        "rollup rows (location)": (
+            select(DailySalesRollup.total).where(*by_location.sales_filters(DailySalesRollup)),
+            ["ix_daily_sales_rollup_location_date"],
+        ),
+        "ticket page": (
+            select(Ticket.id)
+            .where(Ticket.ticket_date.between(MONTH_AGO, TODAY))
+            .where(tuple_(Ticket.ticket_date, Ticket.ticket_number) > tuple_(MONTH_AGO, 1000))
+            .order_by(Ticket.ticket_date, Ticket.ticket_number)
+            .limit(101),
+            ["ix_tickets_date_number"],
+        ),
+        "ticket page (user)": (
+            select(Ticket.id)
+            .where(Ticket.user_id == 1, Ticket.ticket_date.between(MONTH_AGO, TODAY))
+            .order_by(Ticket.ticket_date, Ticket.ticket_number)
+            .limit(101),
+            ["ix_tickets_user_date_number"],
+        ),
+        "ticket transactions (selectin)": (
+            select(Transaction.id).where(Transaction.ticket_id.in_([1, 2, 3])),
+            ["ix_transactions_ticket_id", ": ticket_id", "transactions_ibfk"],
+        ),
+        "monthly totals": (
+            select(Transaction.user_id, func.count(LineItem.id))
+            .join(LineItem, LineItem.transaction_id == Transaction.id)
+            .where(Transaction.posted_date.between(MONTH_AGO, TODAY))
+            .group_by(Transaction.user_id),
+            ["ix_transactions_posted_date", "ix_transactions_user_posted"],
+        ),
+        "active tax rate": (
+            select(TaxRate.rate)
+            .where(TaxRate.location_id == 1, TaxRate.effective_to.is_(None))
+            .order_by(TaxRate.effective_from.desc())
+            .limit(1),
+            ["ix_tax_rate_location_active"],
+        ),
+    }
+
+
+def explain(connection, stmt):
+    """Returns the plan as a single lowercase string"""
+    sql = str(stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        return " | ".join(str(row[-1]) for row in rows).lower()
+    rows = connection.exec_driver_sql(f"EXPLAIN {sql}").mappings().fetchall()
+    return " | ".join(f"{row.get('table')}: {row.get('key')}" for row in rows).lower()
+
+
+def run():
+    app = build_app()
+    seed_small(app)
+    seed_random(app, tickets=2000, days=60)
+
+    failures = 0
+    with app.app_context():
+        from app.services.rollup_service import rebuild_rollups
+        rebuild_rollups()
+        db.session.commit()
+
+        # give the planner real statistics
+        with db.engine.connect() as connection:
+            if connection.dialect.name == "sqlite":
+                connection.exec_driver_sql("ANALYZE")
+
+            for name, (stmt, indexes) in hot_queries().items():
+                plan = explain(connection, stmt)
+                ok = any(index.lower() in plan for index in indexes)
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {name:<32} {plan}")
+
+    if failures:
+        print(f"\n{failures} hot query plan(s) missed their index")
+        return 1
+    print("\nAll hot queries use their indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
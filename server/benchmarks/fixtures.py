@@ -0,0 +1,149 @@
+import os
+import random
+from datetime import date, timedelta
+from config import Config
+from app import create_app
+from app.extensions import db
+from app.services.password_service import passwords
+from app.models import Location, TaxRate, User, Ticket, Transaction, LineItem, Deduction, DepartmentEnum, SalesCategoryEnum, PaymentTypeEnum
+from app.models.base import Base
+from app.models.services.tax_rules import determine_taxability
+from app.utils.tools import finalize_ticket
+from app.utils.redis_store import MEMORY_URL, fakeredis
+
+BENCH_PASSWORD = "benchmark"
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get("BENCH_DATABASE_URI", "sqlite://")
+    DEBUG = False
+    TESTING = False
+    PROPAGATE_EXCEPTIONS = False
+    # fakeredis unless pointed at a real server; without fakeredis there is no
+    # redis at all, which also switches sessions to signed cookies
+    REDIS_URL = os.environ.get("BENCH_REDIS_URL", MEMORY_URL if fakeredis is not None else "")
+
+
+def build_app(config_class=BenchConfig):
+    """Create the app against an empty schema"""
+    app = create_app(config_class)
+    with app.app_context():
+        Base.metadata.drop_all(bind=db.engine)
+        Base.metadata.create_all(bind=db.engine)
+    return app
+
+
+def seed_small(app, days=3, tickets_per_day=4):
+    """
+    Two locations, two users and a handful of tickets per day ending today.
+    Enough rows for every relationship in a load plan to be exercised.
+    """
+    with app.app_context():
+        lake_charles = Location(name="Lake Charles", code="lake_charles", current_tax_rate=0.1075)
+        jennings = Location(name="Jennings", code="jennings", current_tax_rate=0.1050)
+        db.session.add_all([lake_charles, jennings])
+        db.session.flush()
+
+        db.session.add_all([
+            TaxRate(location_id=lake_charles.id, rate=0.1075, effective_from=date(2020, 1, 1)),
+            TaxRate(location_id=jennings.id, rate=0.1050, effective_from=date(2020, 1, 1)),
+        ])
+
+        pw_hash = passwords.hash(BENCH_PASSWORD)
+        admin = User(
+            first_name="Bench", last_name="Admin", email="admin@bench.local",
+            password_hash=pw_hash, department=DepartmentEnum.SALES,
+            is_admin=True, location_id=lake_charles.id
+        )
+        clerk = User(
+            first_name="Bench", last_name="Clerk", email="clerk@bench.local",
+            password_hash=pw_hash, department=DepartmentEnum.SERVICE,
+            location_id=jennings.id
+        )
+        db.session.add_all([admin, clerk])
+        db.session.flush()
+
+        categories = list(SalesCategoryEnum)
+        payments = list(PaymentTypeEnum)
+        today = date.today()
+        ticket_number = 1000
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            for i in range(tickets_per_day):
+                user = admin if i % 2 == 0 else clerk
+                location = lake_charles if i % 2 == 0 else jennings
+                ticket = Ticket(ticket_number=ticket_number, ticket_date=day, location=location, user=user)
+                transaction = Transaction(user=user, location=location, posted_date=day)
+                for n in range(3):
+                    category = categories[(ticket_number + n) % len(categories)]
+                    payment_type = payments[(ticket_number + n) % len(payments)]
+                    taxable, source = determine_taxability(category=category, payment_type=payment_type, location=location)
+                    transaction.line_items.append(LineItem(
+                        category=category,
+                        payment_type=payment_type,
+                        unit_price=2500 * (n + 1) + ticket_number,
+                        taxable=taxable,
+                        taxability_source=source,
+                        tax_rate=location.current_tax_rate,
+                        is_return=(ticket_number + n) % 7 == 0
+                    ))
+                ticket.transactions.append(transaction)
+                finalize_ticket(ticket)
+                db.session.add(ticket)
+                ticket_number += 1
+
+        db.session.commit()
+
+
+def seed_random(app, tickets=300, days=30, seed=1):
+    """
+    Random tickets, returns and deductions over the last `days` days,
+    spread across whatever users and locations already exist.
+    """
+    rng = random.Random(seed)
+    with app.app_context():
+        users = db.session.query(User).all()
+        locations = db.session.query(Location).all()
+        start_number = (db.session.query(db.func.max(Ticket.ticket_number)).scalar() or 0) + 1
+        today = date.today()
+
+        for ticket_number in range(start_number, start_number + tickets):
+            day = today - timedelta(days=rng.randrange(days))
+            user = rng.choice(users)
+            location = rng.choice(locations)
+            ticket = Ticket(ticket_number=ticket_number, ticket_date=day, location=location, user=user)
+            for _ in range(rng.randint(1, 2)):
+                transaction = Transaction(user=user, location=location, posted_date=day)
+                for _ in range(rng.randint(1, 5)):
+                    category = rng.choice(list(SalesCategoryEnum))
+                    payment_type = rng.choice(list(PaymentTypeEnum))
+                    taxable, source = determine_taxability(category=category, payment_type=payment_type, location=location)
+                    transaction.line_items.append(LineItem(
+                        category=category,
+                        payment_type=payment_type,
+                        unit_price=rng.randint(1, 250_000),
+                        taxable=taxable,
+                        taxability_source=source,
+                        tax_rate=location.current_tax_rate,
+                        is_return=rng.random() < 0.1
+                    ))
+                ticket.transactions.append(transaction)
+            finalize_ticket(ticket)
+            db.session.add(ticket)
+
+        for _ in range(tickets // 10):
+            db.session.add(Deduction(
+                user_id=rng.choice(users).id,
+                amount=rng.randint(100, 20_000),
+                reason="benchmark",
+                date=today - timedelta(days=rng.randrange(days))
+            ))
+
+        db.session.commit()
+
+
+def login(client, email="admin@bench.local", password=BENCH_PASSWORD):
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise RuntimeError(f"Benchmark login failed: {response.get_json()}")
+    return client
@@ -0,0 +1,105 @@
+"""
+JSON providers on the largest API payloads.
+
+Seeds the same data into one app per configuration (stdlib json, orjson,
+orjson with streamed ticket pages), checks every configuration returns the
+same JSON as the stdlib provider and reports encode time (from the
+Server-Timing header), total request time and body size for a 500 ticket
+page of /api/read/tickets and a month of /api/reports/summary.
+
+run from server/:
+    python -m benchmarks.json_encoding
+    python -m benchmarks.json_encoding --tickets 5000 --iterations 50
+"""
+import argparse
+import contextlib
+import io
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from benchmarks.fixtures import BenchConfig, build_app, seed_small, seed_random, login
+
+TODAY = date.today()
+MONTH_AGO = TODAY - timedelta(days=29)
+
+PAYLOADS = {
+    "tickets page": f"/api/read/tickets?start_date={MONTH_AGO}&end_date={TODAY}&limit=500",
+    "summary (master)": f"/api/reports/summary?start={MONTH_AGO}&end={TODAY}&type=master",
+}
+
+CONFIGS = {
+    "json": {"JSON_PROVIDER": "json"},
+    "orjson": {"JSON_PROVIDER": "orjson"},
+    "orjson streamed": {"JSON_PROVIDER": "orjson", "JSON_STREAM_MIN_ITEMS": 1},
+}
+
+
+def make_config(overrides):
+    return type("JSONBenchConfig", (BenchConfig,), {"REPORT_CACHE_ENABLED": False, **overrides})
+
+
+def serialize_ms(response):
+    match = re.search(r"serialize;dur=([\d.]+)", response.headers.get("Server-Timing", ""))
+    return float(match.group(1)) if match else None
+
+
+def measure(client, url, iterations, warmup):
+    totals, encodes = [], []
+    body = None
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        # FinancialReportService prints its deduction totals
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.get(url)
+            streamed = "Content-Length" not in response.headers
+            body = response.get_data()
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+        if i >= warmup:
+            totals.append(elapsed)
+            encodes.append(serialize_ms(response))
+    return body, totals, encodes, streamed
+
+
+def run(args):
+    baseline = {}
+    mismatches = 0
+    print(f"{'payload':<20}{'provider':<18}{'encode ms':>10}{'total ms':>10}{'KiB':>8}")
+    for name, overrides in CONFIGS.items():
+        app = build_app(make_config(overrides))
+        seed_small(app)
+        seed_random(app, tickets=args.tickets, seed=args.seed)
+        client = login(app.test_client())
+
+        for payload, url in PAYLOADS.items():
+            body, totals, encodes, streamed = measure(client, url, args.iterations, args.warmup)
+            parsed = json.loads(body)
+            if payload not in baseline:
+                baseline[payload] = parsed
+            elif parsed != baseline[payload]:
+                mismatches += 1
+                print(f"MISMATCH {payload} with {name}")
+
+            # streamed bodies are encoded after Server-Timing is sent
+            encode = "-" if streamed or None in encodes else f"{statistics.median(encodes):.2f}"
+            print(f"{payload:<20}{name:<18}{encode:>10}{statistics.median(totals):>10.2f}{len(body) / 1024:>8.0f}")
+
+    print(f"\n{mismatches} mismatch(es)")
+    return 1 if mismatches else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON providers on large payloads")
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
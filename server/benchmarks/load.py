@@ -0,0 +1,196 @@
+"""
+Load benchmark for the API.
+
+Seeds a database with benchmarks.seed.seed_volume(), then drives the Flask
+test client against the hot endpoints and records p50/p95/p99 latency, SQL
+statements per request and peak RSS. Results are written as JSON with sorted
+keys so two runs can be diffed between commits.
+
+run from server/:
+    python -m benchmarks.load
+    python -m benchmarks.load --line-items 2000000 --years 3 --users 400 --output before.json
+    BENCH_DATABASE_URI=mysql+pymysql://user:pw@127.0.0.1/cerberus_bench python -m benchmarks.load
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from app.extensions import db
+from app.models import User
+from app.utils.query_counter import QueryCounter
+from benchmarks.fixtures import build_app, login, BENCH_PASSWORD
+from benchmarks.seed import seed_volume
+
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scenarios(admin_email, user_id, location_id):
+    """name -> (method, url or callable(i) -> (url, json body))"""
+    month_start = TODAY.replace(day=1)
+    ticket_number = iter(range(50_000_000, 60_000_000))
+
+    def new_ticket(i):
+        return "/api/create/ticket", {
+            "ticket_number": next(ticket_number),
+            "date": TODAY.isoformat(),
+            "location_id": location_id,
+            "user_id": user_id,
+            "line_items": [
+                {"category": "new_appliance", "payment_type": "card", "unit_price": 64_999, "is_return": False},
+                {"category": "delivery", "payment_type": "card", "unit_price": 7_500, "is_return": False},
+            ],
+        }
+
+    return {
+        "login": ("POST", lambda i: ("/api/auth/login", {"email": admin_email, "password": BENCH_PASSWORD})),
+        "reports/summary master today": ("GET", f"/api/reports/summary?start={TODAY}&type=master"),
+        "reports/summary master month": ("GET", f"/api/reports/summary?start={month_start}&end={TODAY}&type=master"),
+        "reports/summary master 90d closed": ("GET", f"/api/reports/summary?start={YESTERDAY - timedelta(days=89)}&end={YESTERDAY}&type=master"),
+        "reports/summary user_eod": ("GET", f"/api/reports/summary?start={TODAY}&type=user_eod&users={user_id}"),
+        "reports/summary location month": ("GET", f"/api/reports/summary?start={month_start}&end={TODAY}&type=location&locations={location_id}"),
+        "read/tickets 7d page": ("GET", f"/api/read/tickets?start_date={TODAY - timedelta(days=7)}&end_date={TODAY}"),
+        "read/tickets/user 30d page": ("GET", f"/api/read/tickets/user/{user_id}?start_date={TODAY - timedelta(days=30)}&end_date={TODAY}"),
+        "read/monthly_totals": ("GET", "/api/read/monthly_totals"),
+        "create/ticket": ("POST", new_ticket),
+    }
+
+
+def measure(client, engine, method, target, iterations, warmup):
+    latencies = []
+    statements = []
+    errors = 0
+    with QueryCounter(engine) as counter:
+        for i in range(warmup + iterations):
+            if callable(target):
+                url, body = target(i)
+            else:
+                url, body = target, None
+
+            counter.reset()
+            started = time.perf_counter()
+            response = client.open(url, method=method, json=body)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            if i < warmup:
+                continue
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append(elapsed)
+            statements.append(counter.count)
+
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3),
+        "sql_statements": max(statements),
+        "rss_mb": peak_rss_mb(),
+    }
+
+
+def run(args):
+    app = build_app()
+    # quiet the request logging, it dominates the timings otherwise
+    app.logger.setLevel("WARNING")
+
+    print(f"Seeding {args.line_items:,} line items over {args.years} year(s)...")
+    started = time.perf_counter()
+    counts = seed_volume(
+        app,
+        locations=args.locations,
+        users=args.users,
+        line_items=args.line_items,
+        years=args.years,
+        seed=args.seed,
+    )
+    seed_seconds = round(time.perf_counter() - started, 1)
+
+    with app.app_context():
+        engine = db.engine
+        admin = db.session.query(User).filter_by(is_admin=True).first()
+        clerk = db.session.query(User).filter_by(is_admin=False).first()
+        admin_email, user_id, location_id = admin.email, clerk.id, clerk.location_id
+        dialect = engine.dialect.name
+
+    client = login(app.test_client(), email=admin_email)
+    selected = scenarios(admin_email, user_id, location_id)
+    if args.only:
+        selected = {name: spec for name, spec in selected.items() if any(o in name for o in args.only)}
+
+    results = {}
+    for name, (method, target) in selected.items():
+        # login is bcrypt bound, a few samples are enough
+        iterations = min(args.iterations, 20) if name == "login" else args.iterations
+        results[name] = measure(client, engine, method, target, iterations, args.warmup)
+        r = results[name]
+        print(
+            f"{name:<36} p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  "
+            f"p99 {r['p99_ms']:>9.2f}ms  sql {r['sql_statements']:>3}  err {r['errors']}"
+        )
+
+    output = {
+        "meta": {
+            "git": git_revision(),
+            "run_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "database": dialect,
+            "seed": args.seed,
+            "seed_seconds": seed_seconds,
+            "rows": counts,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "endpoints": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\nPeak RSS {output['peak_rss_mb']} MB, results written to {args.output}")
+
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a database and load test the API")
+    parser.add_argument("--locations", type=int, default=3)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--line-items", type=int, default=200_000)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="only run scenarios whose name contains one of these")
+    parser.add_argument("--output", default="benchmark_results.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -0,0 +1,113 @@
+"""
+Login throughput per bcrypt cost.
+
+For each BCRYPT_LOG_ROUNDS value seeds a user hashed at that cost and
+reports:
+    hash ms        one password check
+    serial/s       full POST /api/auth/login requests, one at a time
+    pooled/s       password checks from --threads concurrent callers going
+                   through the PASSWORD_HASH_WORKERS pool, i.e. the ceiling
+                   one worker process can sustain in a login burst
+
+Then checks rehash-on-login: a hash made at the first cost is replaced by
+one at the last cost after a login under that policy.
+
+run from server/:
+    python -m benchmarks.logins
+    python -m benchmarks.logins --costs 10 11 12 13 --workers 4 --threads 16
+"""
+import argparse
+import sys
+import threading
+import time
+from app.extensions import db
+from app.models import User
+from app.services.password_service import passwords
+from benchmarks.fixtures import BENCH_PASSWORD, BenchConfig, build_app, seed_small, login
+
+
+def make_config(cost, workers):
+    return type("LoginBenchConfig", (BenchConfig,), {"BCRYPT_LOG_ROUNDS": cost, "PASSWORD_HASH_WORKERS": workers})
+
+
+def stored_hash(app, email="admin@bench.local"):
+    with app.app_context():
+        return db.session.query(User.password_hash).filter_by(email=email).scalar()
+
+
+def serial_logins(app, count):
+    client = app.test_client()
+    started = time.perf_counter()
+    for _ in range(count):
+        login(client)
+    return count / (time.perf_counter() - started)
+
+
+def pooled_checks(app, pw_hash, count, threads):
+    per_thread = max(1, count // threads)
+    failures = []
+
+    def caller():
+        with app.app_context():
+            for _ in range(per_thread):
+                if not passwords.verify(pw_hash, BENCH_PASSWORD):
+                    failures.append(1)
+
+    workers = [threading.Thread(target=caller) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    if failures:
+        raise RuntimeError(f"{len(failures)} password check(s) failed")
+    return per_thread * threads / elapsed
+
+
+def check_rehash(old_cost, new_cost, workers):
+    app = build_app(make_config(old_cost, workers))
+    seed_small(app)
+    before = passwords.rounds(stored_hash(app))
+    app.config["BCRYPT_LOG_ROUNDS"] = new_cost
+    login(app.test_client())
+    after = passwords.rounds(stored_hash(app))
+    # a second login must not rehash again
+    unchanged = stored_hash(app)
+    login(app.test_client())
+    ok = before == old_cost and after == new_cost and stored_hash(app) == unchanged
+    print(f"\nrehash on login {old_cost} -> {new_cost}: stored cost {before} -> {after} {'ok' if ok else 'FAILED'}")
+    return ok
+
+
+def run(args):
+    print(f"{'cost':<6}{'hash ms':>10}{'serial/s':>10}{'pooled/s':>10}")
+    for cost in args.costs:
+        app = build_app(make_config(cost, args.workers))
+        seed_small(app)
+        pw_hash = stored_hash(app)
+
+        with app.app_context():
+            started = time.perf_counter()
+            passwords.verify(pw_hash, BENCH_PASSWORD)
+            check_ms = (time.perf_counter() - started) * 1000
+        # a login is roughly one check, so budget ~2s per measurement
+        count = max(args.threads, int(2000 / max(check_ms, 1)))
+
+        serial = serial_logins(app, max(1, count // 4))
+        pooled = pooled_checks(app, pw_hash, count, args.threads)
+        print(f"{cost:<6}{check_ms:>10.1f}{serial:>10.1f}{pooled:>10.1f}")
+
+    return 0 if check_rehash(args.costs[0], args.costs[-1], args.workers) else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Login throughput per bcrypt cost")
+    parser.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12])
+    parser.add_argument("--workers", type=int, default=2, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent callers for the pooled measurement")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -0,0 +1,109 @@
+"""
+Connection pool pressure, for sizing DB_POOL_SIZE/DB_MAX_OVERFLOW.
+
+Seeds a file database, then sends --requests ticket page requests from
+--threads threads through one app whose pool has --pool-size connections
+and --max-overflow overflow. With more threads than connections the
+checkouts queue up; prints what /api/debug/pool reports afterwards
+(exhausted waits, average and max wait) next to the request latencies.
+
+run from server/:
+    python -m benchmarks.pool_pressure
+    python -m benchmarks.pool_pressure --threads 16 --pool-size 4 --max-overflow 2
+    BENCH_DATABASE_URI=mysql+pymysql://user:pw@127.0.0.1/cerberus_bench python -m benchmarks.pool_pressure
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from app.extensions import db
+from benchmarks.fixtures import BenchConfig, build_app, seed_small, seed_random, login
+from benchmarks.load import percentile
+
+TODAY = date.today()
+URL = f"/api/read/tickets?start_date={TODAY - timedelta(days=7)}&end_date={TODAY}"
+
+
+def make_config(args):
+    # in-memory sqlite is a single shared connection, there is no pool to exhaust
+    uri = os.environ.get("BENCH_DATABASE_URI", "sqlite://")
+    if uri == "sqlite://":
+        uri = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'cerberus_pool_pressure.db')}"
+    return type("PoolBenchConfig", (BenchConfig,), {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "SQLALCHEMY_ENGINE_OPTIONS": {
+            **BenchConfig.SQLALCHEMY_ENGINE_OPTIONS,
+            "pool_size": args.pool_size,
+            "max_overflow": args.max_overflow,
+        },
+        "DB_POOL_SLOW_CHECKOUT_MS": args.slow_ms,
+    })
+
+
+def run(args):
+    app = build_app(make_config(args))
+    app.logger.setLevel("WARNING")
+    seed_small(app)
+    seed_random(app, tickets=args.tickets)
+    admin = login(app.test_client())
+    # fresh pool, so seeding doesn't count
+    with app.app_context():
+        db.engine.dispose()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    per_thread = max(1, args.requests // args.threads)
+
+    # share the admin's session, a bcrypt login per thread would swamp the timings
+    cookie_name = app.config["SESSION_COOKIE_NAME"]
+    session_cookie = admin.get_cookie(cookie_name).value
+
+    def worker():
+        client = app.test_client()
+        client.set_cookie(cookie_name, session_cookie)
+        own, failed = [], 0
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            response = client.get(URL)
+            own.append((time.perf_counter() - started) * 1000)
+            failed += response.status_code != 200
+        with lock:
+            latencies.extend(own)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    pools = admin.get("/api/debug/pool").get_json()["pools"]
+    total = per_thread * args.threads
+    print(f"{args.threads} threads, pool_size {args.pool_size} + max_overflow {args.max_overflow}")
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:.1f}/s), errors {sum(errors)}")
+    print(f"latency p50 {percentile(latencies, 50):.1f}ms  p95 {percentile(latencies, 95):.1f}ms  p99 {percentile(latencies, 99):.1f}ms")
+    for bind, stats in pools.items():
+        print(f"\npool {bind}:")
+        for key, value in stats.items():
+            print(f"  {key:<16}{value}")
+    return 1 if sum(errors) else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure connection pool waits under concurrent requests")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--slow-ms", type=int, default=100, help="DB_POOL_SLOW_CHECKOUT_MS")
+    parser.add_argument("--tickets", type=int, default=1000)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
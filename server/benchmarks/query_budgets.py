@@ -0,0 +1,77 @@
+"""
+SQL statement budgets per endpoint.
+
+Seeds a throwaway database, hits every read endpoint with a logged in client
+and counts the statements each request sends. Exits non-zero when an endpoint
+goes over budget, which usually means a load plan in app/models/load_plans.py
+regressed or a serializer started walking a relationship outside its plan.
+
+run from server/:
+    python -m benchmarks.query_budgets
+"""
+import sys
+from datetime import date, timedelta
+from app.extensions import db
+from app.utils.query_counter import QueryCounter
+from app.services.financial_report_service import month_ranges
+from benchmarks.fixtures import build_app, seed_small, login
+
+TODAY = date.today()
+WEEK_AGO = TODAY - timedelta(days=7)
+
+# endpoint -> max statements. The user_loader principal is cached after the
+# first request, hydrate_user pays for it and then loads the full User.
+QUERY_BUDGETS = {
+    "/api/auth/hydrate_user": 2,
+    "/api/read/locations": 1,
+    "/api/read/location/1": 1,
+    "/api/read/users": 1,
+    "/api/read/user/2": 1,
+    "/api/read/ticket/1000": 2,
+    f"/api/read/tickets?start_date={WEEK_AGO}&end_date={TODAY}": 3,
+    f"/api/read/tickets/user/2?start_date={WEEK_AGO}&end_date={TODAY}": 4,
+    f"/api/read/deductions/user/1?start_date={WEEK_AGO}&end_date={TODAY}": 2,
+    "/api/read/deductions/user/1/today": 1,
+    "/api/read/deductions/user/1/all": 2,
+    "/api/read/monthly_totals": 1,
+    # fanned out: location list + 3 statements per location per month
+    f"/api/reports/summary?start={WEEK_AGO}&end={TODAY}&type=master": 1 + 3 * 2 * len(month_ranges(WEEK_AGO, TODAY)),
+    f"/api/reports/summary?start={TODAY}&type=user_eod&users=1": 5,
+    f"/api/reports/summary?start={TODAY}&type=location&locations=2": 5,
+}
+
+
+def run():
+    app = build_app()
+    seed_small(app)
+    client = login(app.test_client())
+
+    with app.app_context():
+        engine = db.engine
+
+    failures = []
+    with QueryCounter(engine) as counter:
+        for url, budget in QUERY_BUDGETS.items():
+            counter.reset()
+            response = client.get(url)
+            status = "ok"
+            if response.status_code != 200:
+                status = f"HTTP {response.status_code}"
+                failures.append(url)
+            elif counter.count > budget:
+                status = "OVER BUDGET"
+                failures.append(url)
+            print(f"{counter.count:>3} / {budget:<3} {status:<12} {url}")
+            if status != "ok":
+                for statement in counter.statements:
+                    print("      " + " ".join(statement.split())[:160])
+
+    if failures:
+        print(f"\n{len(failures)} endpoint(s) failed their query budget")
+        return 1
+    print("\nAll endpoints within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,123 @@
+"""
+Checks that every FinancialReportService backend produces the same report.
+
+Seeds random tickets, returns and deductions, backfills the rollup table and
+then writes more tickets through the API so the rollup also has to be kept up
+to date incrementally. Each report type is generated with a spread of date
+ranges and filters on every backend and compared byte for byte against the
+python backend. Reports that can fan out are also generated partitioned,
+on every backend.
+
+run from server/:
+    python -m benchmarks.report_equivalence
+"""
+import json
+import sys
+from datetime import date, timedelta
+from app.extensions import db
+from app.models import Ticket, Transaction, LineItem
+from app.services.financial_report_service import FinancialReportService, REPORT_BACKENDS, FANOUT_REPORTS
+from app.services.rollup_service import rebuild_rollups
+from benchmarks.fixtures import build_app, seed_small, seed_random, login
+
+TODAY = date.today()
+
+RANGES = [
+    (TODAY, TODAY),
+    (TODAY - timedelta(days=6), TODAY),
+    (TODAY - timedelta(days=29), TODAY),
+    (TODAY + timedelta(days=1), TODAY + timedelta(days=5)),  # nothing posted
+]
+
+FILTERS = [
+    ("operations", {}),
+    ("master", {}),
+    ("user_eod", {"user_ids": [1]}),
+    ("multi_user", {"user_ids": [1, 2]}),
+    ("location", {"location_id": [2]}),
+    ("multi_location", {"location_id": [1, 2]}),
+]
+
+
+def generate(backend, report_type, start, end, filters, fan_out=False):
+    service = FinancialReportService(
+        start_date=start,
+        end_date=end,
+        report_type=report_type,
+        backend=backend,
+        fan_out=fan_out,
+        **filters
+    )
+    return json.dumps(service.generate()).encode("utf-8")
+
+
+def write_through_api(app):
+    """Create, amend and delete sales through the endpoints after the backfill"""
+    client = login(app.test_client())
+    for n in range(5):
+        response = client.post("/api/create/ticket", json={
+            "ticket_number": 900_000 + n,
+            "date": (TODAY - timedelta(days=n)).isoformat(),
+            "location_id": 1 + n % 2,
+            "user_id": 2 - n % 2,
+            "line_items": [
+                {"category": "new_appliance", "payment_type": "card", "unit_price": 45_000 + n, "is_return": False},
+                {"category": "delivery", "payment_type": "cash", "unit_price": 5_000, "is_return": n == 3},
+                {"category": "extended_warranty", "payment_type": "acima", "unit_price": 9_999, "is_return": False},
+            ]
+        })
+        assert response.status_code == 201, response.get_json()
+
+    with app.app_context():
+        ticket_id = db.session.query(Ticket.id).filter_by(ticket_number=900_000).scalar()
+        transaction_id, line_item_id = db.session.query(Transaction.id, LineItem.id)\
+            .join(LineItem.transaction).filter(Transaction.ticket_id != ticket_id)\
+            .order_by(Transaction.id.desc()).first()
+        other_transaction_id = db.session.query(Transaction.id)\
+            .filter(Transaction.id != transaction_id, Transaction.ticket_id != ticket_id).first()[0]
+
+    response = client.post(f"/api/create/transaction/{ticket_id}", json={
+        "posted_date": TODAY.isoformat(), "location_id": 2, "user_id": 1,
+        "line_items": [{"category": "parts", "payment_type": "check", "unit_price": 1_234, "is_return": True}]
+    })
+    assert response.status_code == 201, response.get_json()
+    assert client.delete(f"/api/delete/line_item/{line_item_id}").status_code == 200
+    assert client.delete(f"/api/delete/transaction/{other_transaction_id}").status_code == 200
+    assert client.delete(f"/api/delete/ticket/{ticket_id}").status_code == 200
+
+
+def run():
+    app = build_app()
+    seed_small(app)
+    seed_random(app, tickets=500)
+    with app.app_context():
+        rebuild_rollups()
+        db.session.commit()
+    write_through_api(app)
+
+    mismatches = 0
+    checked = 0
+    with app.app_context():
+        for start, end in RANGES:
+            for report_type, filters in FILTERS:
+                expected = generate("python", report_type, start, end, filters)
+                runs = [(backend, False) for backend in REPORT_BACKENDS if backend != "python"]
+                if report_type in FANOUT_REPORTS:
+                    runs += [(backend, True) for backend in REPORT_BACKENDS]
+                for backend, fan_out in runs:
+                    actual = generate(backend, report_type, start, end, filters, fan_out)
+                    checked += 1
+                    if actual != expected:
+                        label = f"{backend}{' fan-out' if fan_out else ''}"
+                        mismatches += 1
+                        print(f"MISMATCH {label} {report_type} {start}..{end} {filters}")
+                        print(f"  python:  {expected[:300]}")
+                        print(f"  {label}: {actual[:300]}")
+                db.session.remove()
+
+    print(f"{checked} report(s) compared, {mismatches} mismatch(es)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
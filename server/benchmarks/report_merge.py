@@ -0,0 +1,98 @@
+"""
+Property check for the partial report merge used by fanned out reports
+(merge_partials() in app/services/financial_report_service.py).
+
+Builds random partials from random sales rows and checks that merging is
+associative and commutative with empty_partial() as the identity, and that
+splitting rows into any number of partitions and merging them in any
+grouping gives exactly build_partial() over all rows, key order included.
+
+run from server/:
+    python -m benchmarks.report_merge
+    python -m benchmarks.report_merge --cases 5000 --seed 7
+"""
+import argparse
+import json
+import random
+import sys
+from functools import reduce
+from app.models import SalesCategoryEnum, PaymentTypeEnum
+from app.services.financial_report_service import build_partial, empty_partial, merge_partials, signed_row
+
+CATEGORIES = list(SalesCategoryEnum)
+PAYMENTS = list(PaymentTypeEnum)
+
+
+def random_rows(rng, count):
+    return [
+        signed_row(
+            rng.choice(CATEGORIES), rng.choice(PAYMENTS), rng.random() < 0.1, rng.random() < 0.7,
+            rng.randint(0, 250_000), rng.randint(0, 30_000), rng.randint(1, 3)
+        )
+        for _ in range(count)
+    ]
+
+
+def random_partial(rng):
+    return build_partial(random_rows(rng, rng.randint(0, 20)), rng.randint(0, 50_000))
+
+
+def same(a, b):
+    """Equal including key order, which is what ends up in the JSON"""
+    return json.dumps(a) == json.dumps(b)
+
+
+def random_grouping(rng, partials):
+    """Merges partials pairwise in a random tree shape"""
+    items = list(partials)
+    while len(items) > 1:
+        i = rng.randrange(len(items) - 1)
+        items[i:i + 2] = [merge_partials(items[i], items[i + 1])]
+    return items[0] if items else empty_partial()
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    failures = {"associative": 0, "commutative": 0, "identity": 0, "partitioned": 0}
+
+    for _ in range(args.cases):
+        a, b, c = random_partial(rng), random_partial(rng), random_partial(rng)
+        if not same(merge_partials(a, merge_partials(b, c)), merge_partials(merge_partials(a, b), c)):
+            failures["associative"] += 1
+        # commutative up to key order, every partial has the same keys
+        if merge_partials(a, b) != merge_partials(b, a):
+            failures["commutative"] += 1
+        if not (same(merge_partials(empty_partial(), a), a) and same(merge_partials(a, empty_partial()), a)):
+            failures["identity"] += 1
+
+        rows = random_rows(rng, rng.randint(0, 200))
+        deductions = [rng.randint(0, 10_000) for _ in range(rng.randint(1, 6))]
+        expected = build_partial(rows, sum(deductions))
+
+        # split rows and deductions into random partitions, merge in a random order and grouping
+        parts = len(deductions)
+        buckets = [[] for _ in range(parts)]
+        for row in rows:
+            buckets[rng.randrange(parts)].append(row)
+        partials = [build_partial(bucket, deduction) for bucket, deduction in zip(buckets, deductions)]
+        rng.shuffle(partials)
+        folded = reduce(merge_partials, partials, empty_partial())
+        if not (same(folded, expected) and same(random_grouping(rng, partials), expected)):
+            failures["partitioned"] += 1
+
+    for name, count in failures.items():
+        print(f"{name:<14}{count} failure(s)")
+    total = sum(failures.values())
+    print(f"\n{args.cases:,} case(s), {total} failure(s)")
+    return 1 if total else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check that partial report merging is associative")
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
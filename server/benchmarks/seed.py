@@ -0,0 +1,222 @@
+"""
+Bulk seeder for load benchmarks.
+
+Writes realistic volumes straight through Core inserts with explicit ids so
+millions of line items can be generated without building ORM objects. Totals
+are computed with the same rounding as LineItem/Transaction/Ticket.compute_total
+and the rollup table is rebuilt at the end.
+
+    seed_volume(app, locations=3, users=200, line_items=1_000_000, years=2)
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import insert, func
+from app.extensions import db
+from app.services.password_service import passwords
+from app.models import (
+    Location, TaxRate, User, Ticket, Transaction, LineItem, Deduction,
+    DepartmentEnum, SalesCategoryEnum, PaymentTypeEnum,
+)
+from app.models.services.tax_rules import determine_taxability
+from app.services.rollup_service import rebuild_rollups
+from benchmarks.fixtures import BENCH_PASSWORD
+
+BATCH_SIZE = 5000
+
+# rough shape of a store's sales: mostly appliances, some service work
+CATEGORY_WEIGHTS = {
+    SalesCategoryEnum.NEW_APPLIANCE: 30,
+    SalesCategoryEnum.USED_APPLIANCE: 20,
+    SalesCategoryEnum.EXTENDED_WARRANTY: 8,
+    SalesCategoryEnum.DIAGNOSTIC_FEE: 6,
+    SalesCategoryEnum.IN_SHOP_REPAIR: 6,
+    SalesCategoryEnum.LABOR: 10,
+    SalesCategoryEnum.PARTS: 10,
+    SalesCategoryEnum.DELIVERY: 7,
+    SalesCategoryEnum.EBAY_SALE: 3,
+}
+
+PAYMENT_WEIGHTS = {
+    PaymentTypeEnum.CASH: 20,
+    PaymentTypeEnum.CHECK: 3,
+    PaymentTypeEnum.CARD: 50,
+    PaymentTypeEnum.EBAY_PAYMENT: 3,
+    PaymentTypeEnum.STRIPE_PAYMENT: 5,
+    PaymentTypeEnum.ACIMA: 8,
+    PaymentTypeEnum.TOWER_LOAN: 6,
+    PaymentTypeEnum.SNAP: 5,
+}
+
+# cents, per category
+PRICE_RANGES = {
+    SalesCategoryEnum.NEW_APPLIANCE: (39_900, 349_900),
+    SalesCategoryEnum.USED_APPLIANCE: (9_900, 89_900),
+    SalesCategoryEnum.EXTENDED_WARRANTY: (4_900, 29_900),
+    SalesCategoryEnum.DIAGNOSTIC_FEE: (4_900, 9_900),
+    SalesCategoryEnum.IN_SHOP_REPAIR: (7_500, 45_000),
+    SalesCategoryEnum.LABOR: (5_000, 35_000),
+    SalesCategoryEnum.PARTS: (500, 25_000),
+    SalesCategoryEnum.DELIVERY: (2_500, 9_900),
+    SalesCategoryEnum.EBAY_SALE: (1_000, 60_000),
+}
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _flush_rows(batches):
+    # parents first so foreign keys are satisfied on MySQL
+    for model in (Ticket, Transaction, LineItem):
+        rows = batches[model]
+        if rows:
+            db.session.execute(insert(model), rows)
+            rows.clear()
+
+
+def seed_volume(app, locations=3, users=200, line_items=100_000, years=1, seed=1, log=print):
+    """
+    Seed `locations` stores with `users` employees and about `line_items`
+    line items spread over the last `years` years. Returns row counts.
+    """
+    rng = random.Random(seed)
+    categories, category_weights = zip(*CATEGORY_WEIGHTS.items())
+    payments, payment_weights = zip(*PAYMENT_WEIGHTS.items())
+    today = date.today()
+    days = max(1, int(365 * years))
+
+    with app.app_context():
+        #-------------------------
+        # Locations, tax rates, users
+        #-------------------------
+        store_rows = []
+        for n in range(locations):
+            rate = Decimal("0.1000") + Decimal(n % 8) * Decimal("0.0025")
+            store = Location(name=f"Bench Store {n + 1}", code=f"bench_{n + 1}", current_tax_rate=rate)
+            db.session.add(store)
+            store_rows.append(store)
+        db.session.flush()
+        for store in store_rows:
+            db.session.add(TaxRate(location_id=store.id, rate=store.current_tax_rate, effective_from=today - timedelta(days=days)))
+
+        # hashing once keeps seeding fast, every user logs in with BENCH_PASSWORD
+        pw_hash = passwords.hash(BENCH_PASSWORD)
+        departments = list(DepartmentEnum)
+        staff = []
+        for n in range(users):
+            staff.append(User(
+                first_name="Load",
+                last_name=f"User{n + 1}",
+                email=f"load{n + 1}@bench.local",
+                password_hash=pw_hash,
+                department=departments[n % len(departments)],
+                is_admin=n == 0,
+                location_id=store_rows[n % locations].id,
+            ))
+        db.session.add_all(staff)
+        db.session.flush()
+
+        taxability = {
+            (category, payment): determine_taxability(category=category, payment_type=payment, location=None)
+            for category in categories for payment in payments
+        }
+        store_by_id = {store.id: store for store in store_rows}
+        tax_rates = {store.id: Decimal(str(store.current_tax_rate)) for store in store_rows}
+        staff = [(user.id, user.location_id) for user in staff]
+        db.session.commit()
+
+        #-------------------------
+        # Tickets, transactions, line items
+        #-------------------------
+        ticket_id = _next_id(Ticket)
+        transaction_id = _next_id(Transaction)
+        line_item_id = _next_id(LineItem)
+        ticket_number = (db.session.query(func.max(Ticket.ticket_number)).scalar() or 0) + 1
+
+        batches = {Ticket: [], Transaction: [], LineItem: []}
+        written = 0
+        counts = {"tickets": 0, "transactions": 0, "line_items": 0}
+
+        while written < line_items:
+            user_id, location_id = rng.choice(staff)
+            day = today - timedelta(days=rng.randrange(days))
+            rate = tax_rates[location_id]
+            ticket = {
+                "id": ticket_id, "ticket_number": ticket_number, "ticket_date": day,
+                "location_id": location_id, "user_id": user_id,
+                "subtotal": 0, "tax_total": 0, "total": 0,
+            }
+
+            for _ in range(1 if rng.random() < 0.85 else 2):
+                transaction = {
+                    "id": transaction_id, "ticket_id": ticket_id, "user_id": user_id,
+                    "location_id": location_id, "posted_date": day,
+                    "units": 0, "subtotal": 0, "tax_total": 0, "total": 0,
+                }
+                for _ in range(rng.choices((1, 2, 3, 4, 5), weights=(40, 30, 15, 10, 5))[0]):
+                    category = rng.choices(categories, weights=category_weights)[0]
+                    payment = rng.choices(payments, weights=payment_weights)[0]
+                    taxable, source = taxability[(category, payment)]
+                    unit_price = rng.randint(*PRICE_RANGES[category])
+                    tax_amount = int((Decimal(unit_price) * rate).quantize(Decimal("1"), rounding=ROUND_HALF_UP)) if taxable else 0
+                    is_return = rng.random() < 0.04
+                    sign = -1 if is_return else 1
+
+                    batches[LineItem].append({
+                        "id": line_item_id, "transaction_id": transaction_id,
+                        "category": category, "payment_type": payment,
+                        "unit_price": unit_price, "taxable": taxable,
+                        "taxability_source": source, "tax_rate": rate,
+                        "tax_amount": tax_amount, "total": unit_price + tax_amount,
+                        "is_return": is_return,
+                    })
+                    transaction["units"] += 1
+                    transaction["subtotal"] += sign * unit_price
+                    transaction["tax_total"] += sign * tax_amount
+                    transaction["total"] += sign * (unit_price + tax_amount)
+                    line_item_id += 1
+                    written += 1
+
+                for field in ("subtotal", "tax_total", "total"):
+                    ticket[field] += transaction[field]
+                batches[Transaction].append(transaction)
+                transaction_id += 1
+                counts["transactions"] += 1
+
+            batches[Ticket].append(ticket)
+            ticket_id += 1
+            ticket_number += 1
+            counts["tickets"] += 1
+
+            if len(batches[LineItem]) >= BATCH_SIZE:
+                _flush_rows(batches)
+                if written % (BATCH_SIZE * 20) < BATCH_SIZE:
+                    db.session.commit()
+                    log(f"  {written:,} / {line_items:,} line items")
+
+        _flush_rows(batches)
+        counts["line_items"] = written
+
+        #-------------------------
+        # Deductions
+        #-------------------------
+        deductions = [
+            {
+                "user_id": rng.choice(staff)[0],
+                "amount": rng.randint(500, 40_000),
+                "reason": "benchmark",
+                "date": today - timedelta(days=rng.randrange(days)),
+            }
+            for _ in range(max(1, counts["tickets"] // 20))
+        ]
+        for start in range(0, len(deductions), BATCH_SIZE):
+            db.session.execute(insert(Deduction), deductions[start:start + BATCH_SIZE])
+        counts["deductions"] = len(deductions)
+
+        counts["rollup_rows"] = rebuild_rollups()
+        db.session.commit()
+
+        counts["locations"] = len(store_by_id)
+        counts["users"] = len(staff)
+        return counts
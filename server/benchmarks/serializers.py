@@ -0,0 +1,191 @@
+"""
+Compiled serializers (app/models/serializers.py) vs the reflective
+Base.serialize() and model overrides they replaced.
+
+Builds tickets in memory (no database) totalling --line-items line items,
+checks both implementations give the same JSON and times them on the flat
+line item list and on whole tickets with relationships.
+
+run from server/:
+    python -m benchmarks.serializers
+    python -m benchmarks.serializers --line-items 500000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from app.models import Ticket, Transaction, LineItem, User, Location, DepartmentEnum, SalesCategoryEnum, PaymentTypeEnum, TaxabilitySourceEnum
+
+TRANSACTIONS_PER_TICKET = 5
+LINE_ITEMS_PER_TRANSACTION = 10
+
+
+#-------------------------
+# The reflective implementation
+#-------------------------
+def legacy_base(obj, include_relationships=False):
+    data = {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+    data.pop("password_hash", None)
+    if include_relationships:
+        for rel in obj.__mapper__.relationships:
+            value = getattr(obj, rel.key)
+            if value is None:
+                data[rel.key] = None
+            elif rel.uselist:
+                data[rel.key] = [legacy(i) for i in value]
+            else:
+                data[rel.key] = legacy(value)
+    for key, value in data.items():
+        if isinstance(value, Enum):
+            data[key] = value.value
+        elif isinstance(value, (date, datetime)):
+            data[key] = value.isoformat()
+    return data
+
+
+def legacy_ticket(ticket, include_relationships=False):
+    data = legacy_base(ticket, include_relationships)
+    data["subtotal"] = ticket.subtotal
+    data["tax_total"] = ticket.tax_total
+    data["total"] = ticket.total
+    if include_relationships:
+        data["transactions"] = [legacy_transaction(t, include_relationships) for t in ticket.transactions]
+        data["user"] = {"id": ticket.user.id, "first_name": ticket.user.first_name, "last_name": ticket.user.last_name}
+        data["location"] = {"id": ticket.location.id, "name": ticket.location.name, "code": ticket.location.code}
+    return data
+
+
+def legacy_transaction(tx, include_relationships=False):
+    data = legacy_base(tx, include_relationships)
+    data["units"] = tx.units
+    data["subtotal"] = tx.subtotal
+    data["tax_total"] = tx.tax_total
+    data["total"] = tx.total
+    data["posted_date"] = tx.posted_date.isoformat()
+    if include_relationships:
+        data["line_items"] = [legacy_line_item(li) for li in tx.line_items]
+    return data
+
+
+def legacy_line_item(li, include_relationships=False):
+    data = legacy_base(li, include_relationships)
+    data["unit_price"] = li.unit_price
+    data["tax_amount"] = li.tax_amount
+    data["total"] = li.total
+    data["tax_rate"] = float(li.tax_rate) * 100 if li.tax_rate else None
+    data["is_return"] = li.is_return
+    data["payment_type"] = li.payment_type
+    data["category"] = li.category
+    return data
+
+
+def legacy_user(user):
+    return {
+        "id": user.id,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "terminated": user.terminated,
+        "department": str(user.department),
+        "is_admin": user.is_admin,
+        "location_id": user.location_id,
+        "location": legacy_base(user.location) if user.location else None,
+    }
+
+
+LEGACY = {Ticket: legacy_ticket, Transaction: legacy_transaction, LineItem: legacy_line_item, User: legacy_user}
+
+
+def legacy(obj):
+    return LEGACY.get(type(obj), legacy_base)(obj)
+
+
+#-------------------------
+# Fixtures
+#-------------------------
+def build_tickets(line_items):
+    location = Location(id=1, name="Lake Charles", code="lake_charles", current_tax_rate=Decimal("0.1075"))
+    user = User(
+        id=1, first_name="Bench", last_name="Admin", email="admin@bench.local", password_hash="x",
+        terminated=False, department=DepartmentEnum.SALES, is_admin=True, location_id=1, location=location
+    )
+    categories = list(SalesCategoryEnum)
+    payments = list(PaymentTypeEnum)
+
+    tickets = []
+    ids = {"ticket": 0, "transaction": 0, "line_item": 0}
+    start = date.today() - timedelta(days=30)
+    while ids["line_item"] < line_items:
+        ids["ticket"] += 1
+        day = start + timedelta(days=ids["ticket"] % 30)
+        ticket = Ticket(id=ids["ticket"], ticket_number=1000 + ids["ticket"], ticket_date=day, location_id=1, user_id=1, location=location, user=user)
+        for _ in range(TRANSACTIONS_PER_TICKET):
+            ids["transaction"] += 1
+            tx = Transaction(id=ids["transaction"], ticket_id=ticket.id, location_id=1, user_id=1, location=location, user=user, posted_date=day)
+            for i in range(LINE_ITEMS_PER_TRANSACTION):
+                ids["line_item"] += 1
+                tx.line_items.append(LineItem(
+                    id=ids["line_item"], transaction_id=tx.id,
+                    category=categories[i % len(categories)], payment_type=payments[i % len(payments)],
+                    unit_price=1000 + i, taxable=i % 3 != 0, taxability_source=TaxabilitySourceEnum.PRODUCT_DEFAULT,
+                    tax_rate=Decimal("0.1075") if i % 4 else None, tax_amount=107, total=1107, is_return=i == 0,
+                ))
+            tx.compute_total()
+            ticket.transactions.append(tx)
+        ticket.compute_total()
+        tickets.append(ticket)
+    return tickets
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def to_json(data):
+    return json.dumps(data, default=str, sort_keys=True)
+
+
+def run(args):
+    tickets = build_tickets(args.line_items)
+    line_items = [li for ticket in tickets for tx in ticket.transactions for li in tx.line_items]
+    print(f"{len(tickets):,} tickets, {len(line_items):,} line items\n")
+
+    cases = {
+        "line items": (
+            lambda: [legacy_line_item(li) for li in line_items],
+            lambda: [li.serialize() for li in line_items],
+        ),
+        "tickets + relationships": (
+            lambda: [legacy_ticket(t, include_relationships=True) for t in tickets],
+            lambda: [t.serialize(include_relationships=True) for t in tickets],
+        ),
+    }
+
+    mismatches = 0
+    print(f"{'case':<26}{'reflective ms':>15}{'compiled ms':>13}{'speedup':>9}")
+    for name, (old, new) in cases.items():
+        expected, old_ms = min((timed(old) for _ in range(args.repeat)), key=lambda r: r[1])
+        actual, new_ms = min((timed(new) for _ in range(args.repeat)), key=lambda r: r[1])
+        if to_json(expected) != to_json(actual):
+            mismatches += 1
+            print(f"MISMATCH {name}")
+        print(f"{name:<26}{old_ms:>15.1f}{new_ms:>13.1f}{old_ms / new_ms:>8.1f}x")
+
+    print(f"\n{mismatches} mismatch(es)")
+    return 1 if mismatches else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the compiled and reflective serializers")
+    parser.add_argument("--line-items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -0,0 +1,89 @@
+"""
+Per-request session cost, signed cookie sessions vs the redis session store.
+
+Logs in once per backend, then times the session interface directly:
+open_session() + save_session() for the logged in cookie, with the session
+left alone (what most requests do: a read plus the sliding expiry) and with
+a write. Also reports the cookie size and the bytes stored in redis.
+
+The redis backend uses fakeredis when it is installed, which shows the serialization
+and bookkeeping cost but no network round trips. Point --redis-url at a
+real server to include those.
+
+run from server/:
+    python -m benchmarks.sessions
+    python -m benchmarks.sessions --redis-url redis://localhost:6379/15 --iterations 5000
+"""
+import argparse
+import statistics
+import sys
+import time
+from app.utils.redis_store import MEMORY_URL, fakeredis, redis_store
+from benchmarks.fixtures import BenchConfig, build_app, seed_small, login
+
+
+def make_config(session_type, redis_url):
+    return type("SessionBenchConfig", (BenchConfig,), {"SESSION_TYPE": session_type, "REDIS_URL": redis_url})
+
+
+def session_cost(app, cookie, write, iterations, warmup):
+    """median microseconds for one open_session + save_session"""
+    interface = app.session_interface
+    name = app.config["SESSION_COOKIE_NAME"]
+    timings = []
+    with app.test_request_context(headers={"Cookie": f"{name}={cookie}"}) as ctx:
+        for i in range(warmup + iterations):
+            started = time.perf_counter()
+            session = interface.open_session(app, ctx.request)
+            if write:
+                session["bench"] = i
+            interface.save_session(app, session, app.response_class())
+            elapsed = (time.perf_counter() - started) * 1_000_000
+            if i >= warmup:
+                timings.append(elapsed)
+    return statistics.median(timings)
+
+
+def stored_bytes(app):
+    with app.app_context():
+        client = redis_store.client
+        keys = client.keys(f"{app.config['SESSION_KEY_PREFIX']}session:*")
+        return len(client.get(keys[0])) if keys else None
+
+
+def run(args):
+    backends = {"cookie": make_config("cookie", "")}
+    if fakeredis is not None:
+        backends["redis (fakeredis)"] = make_config("redis", MEMORY_URL)
+    elif not args.redis_url:
+        print("fakeredis is not installed, pass --redis-url to measure redis sessions")
+    if args.redis_url:
+        backends["redis (server)"] = make_config("redis", args.redis_url)
+
+    print(f"{'backend':<20}{'read us':>10}{'write us':>10}{'cookie B':>10}{'stored B':>10}")
+    for name, config in backends.items():
+        app = build_app(config)
+        seed_small(app)
+        client = login(app.test_client())
+        cookie = client.get_cookie(app.config["SESSION_COOKIE_NAME"])
+        if cookie is None:
+            print(f"{name:<20}login did not set a session cookie")
+            return 1
+
+        read = session_cost(app, cookie.value, False, args.iterations, args.warmup)
+        write = session_cost(app, cookie.value, True, args.iterations, args.warmup)
+        stored = stored_bytes(app) if config.SESSION_TYPE == "redis" else None
+        print(f"{name:<20}{read:>10.1f}{write:>10.1f}{len(cookie.value):>10}{stored if stored is not None else '-':>10}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-request session cost across session backends")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--redis-url", help="also measure against a real redis server (keys are written under the session prefix)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
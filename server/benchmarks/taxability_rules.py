@@ -0,0 +1,98 @@
+"""
+Check the compiled taxability rules (app/services/taxability_service.py).
+
+Precedence: compiles overrides for one location in every order and checks
+that a category + payment type rule beats a category-only rule, which beats
+a payment-type-only rule, which beats DEFAULT_TAXABILITY, and that other
+locations keep the defaults.
+
+Reload: two TaxabilityRules instances stand in for two gunicorn workers
+sharing redis. After an override is added through the API in one, the other
+has to resolve with it on its next request. Needs redis (fakeredis by default).
+
+run from server/:
+    python -m benchmarks.taxability_rules
+"""
+import sys
+from collections import namedtuple
+from itertools import permutations
+from app.models import SalesCategoryEnum, PaymentTypeEnum, TaxabilitySourceEnum
+from app.models.services.tax_rules import DEFAULT_TAXABILITY
+from app.services.taxability_service import TaxabilityRules, compile_tables
+from benchmarks.fixtures import BenchConfig, build_app, seed_small, login
+
+Override = namedtuple("Override", "location_id category payment_type taxable")
+
+CATEGORY = SalesCategoryEnum.DELIVERY
+PAYMENT = PaymentTypeEnum.SNAP
+OTHER_CATEGORY = SalesCategoryEnum.LABOR
+OTHER_PAYMENT = PaymentTypeEnum.CASH
+
+
+def check(name, ok):
+    print(f"{name:<60}{'ok' if ok else 'FAIL'}")
+    return not ok
+
+
+def precedence():
+    default = DEFAULT_TAXABILITY[(OTHER_CATEGORY, OTHER_PAYMENT)][0]
+    # each rule disagrees with the one below it, so the winner is visible
+    payment_only = Override(1, None, PAYMENT, not default)
+    category_only = Override(1, CATEGORY, None, default)
+    both = Override(1, CATEGORY, PAYMENT, not default)
+    override = TaxabilitySourceEnum.LOCATION_OVERRIDE
+
+    expected = {
+        "category + payment type rule": ((CATEGORY, PAYMENT), (both.taxable, override)),
+        "category rule over payment type rule": ((CATEGORY, OTHER_PAYMENT), (category_only.taxable, override)),
+        "payment type rule over the default": ((OTHER_CATEGORY, PAYMENT), (payment_only.taxable, override)),
+        "default without a matching rule": ((OTHER_CATEGORY, OTHER_PAYMENT), DEFAULT_TAXABILITY[(OTHER_CATEGORY, OTHER_PAYMENT)]),
+    }
+
+    failures = 0
+    for order in permutations([payment_only, category_only, both]):
+        tables = compile_tables(order)
+        for name, (pair, rule) in expected.items():
+            failures += tables[1][pair] != rule
+        failures += 2 in tables
+    failures += check("precedence, every override order", failures == 0)
+    return failures
+
+
+def reload_across_workers():
+    if not BenchConfig.REDIS_URL:
+        print("fakeredis is not installed and BENCH_REDIS_URL is unset, skipping the reload check")
+        return 0
+
+    app = build_app()
+    seed_small(app)
+    admin = login(app.test_client())
+    worker = TaxabilityRules()
+    pair = (CATEGORY, PAYMENT)
+
+    with app.test_request_context():
+        before = worker.resolve(*pair, location_id=1)
+    failures = check("other worker starts on the default", before == DEFAULT_TAXABILITY[pair])
+
+    response = admin.post("/api/create/taxability_override", json={
+        "location_id": 1, "category": CATEGORY.value, "payment_type": PAYMENT.value, "taxable": not before[0]
+    })
+    failures += check("override added", response.status_code == 201)
+
+    # the next request in the other worker
+    with app.test_request_context():
+        after = worker.resolve(*pair, location_id=1)
+        many = worker.resolve_many([pair, (OTHER_CATEGORY, OTHER_PAYMENT)], location_id=1)
+    failures += check("other worker resolves with the override", after == (not before[0], TaxabilitySourceEnum.LOCATION_OVERRIDE))
+    failures += check("resolve_many agrees", many == [after, DEFAULT_TAXABILITY[(OTHER_CATEGORY, OTHER_PAYMENT)]])
+    return failures
+
+
+def run():
+    failures = precedence() + reload_across_workers()
+    print(f"\n{failures} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
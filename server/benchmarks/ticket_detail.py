@@ -0,0 +1,141 @@
+"""
+Ticket detail: ORM load plan + Base.serialize() vs the column-only fast path
+in app/services/ticket_detail_service.py.
+
+Checks that both produce the same JSON for every seeded ticket, then times
+each one (query + serialize + JSON encode) and counts its statements, on a
+regular ticket and on one large ticket.
+
+run from server/:
+    python -m benchmarks.ticket_detail
+    python -m benchmarks.ticket_detail --iterations 500 --tickets 1000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date
+from app.extensions import db
+from app.models import Ticket, Transaction, LineItem, User, Location, SalesCategoryEnum, PaymentTypeEnum, TaxabilitySourceEnum
+from app.models.load_plans import load_plan
+from app.services.ticket_detail_service import fetch_ticket_detail
+from app.utils.query_counter import QueryCounter
+from app.utils.tools import finalize_ticket
+from benchmarks.fixtures import build_app, seed_small, seed_random, login
+
+LARGE_TICKET_NUMBER = 999_999
+
+
+def orm_ticket_detail(ticket_number):
+    """The previous GET /api/read/ticket/<ticket_number> body"""
+    ticket = db.session.query(Ticket)\
+        .options(*load_plan("ticket_detail"))\
+        .filter_by(ticket_number=ticket_number).first()
+    return ticket.serialize(include_relationships=True) if ticket else None
+
+
+PATHS = {
+    "orm": orm_ticket_detail,
+    "fast": fetch_ticket_detail,
+}
+
+
+def seed_large_ticket(app, transactions=20, line_items=25):
+    with app.app_context():
+        user = db.session.query(User).first()
+        location = db.session.query(Location).first()
+        ticket = Ticket(ticket_number=LARGE_TICKET_NUMBER, ticket_date=date.today(), location=location, user=user)
+        for _ in range(transactions):
+            transaction = Transaction(user=user, location=location, posted_date=date.today())
+            for i in range(line_items):
+                transaction.line_items.append(LineItem(
+                    category=SalesCategoryEnum.NEW_APPLIANCE if i % 2 else SalesCategoryEnum.USED_APPLIANCE,
+                    payment_type=PaymentTypeEnum.CARD,
+                    unit_price=1000 + i,
+                    taxable=True,
+                    taxability_source=TaxabilitySourceEnum.PRODUCT_DEFAULT,
+                    tax_rate=location.current_tax_rate,
+                    is_return=i == 0,
+                ))
+            ticket.transactions.append(transaction)
+        finalize_ticket(ticket)
+        db.session.add(ticket)
+        db.session.commit()
+
+
+def check_equivalence(app):
+    with app.app_context():
+        numbers = db.session.scalars(db.select(Ticket.ticket_number).order_by(Ticket.ticket_number)).all()
+        mismatches = 0
+        for number in numbers:
+            db.session.remove()
+            expected = json.loads(app.json.dumps(orm_ticket_detail(number)))
+            db.session.remove()
+            actual = json.loads(app.json.dumps(fetch_ticket_detail(number)))
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"MISMATCH ticket {number}")
+        missing = fetch_ticket_detail(-1)
+        if missing is not None:
+            mismatches += 1
+            print("MISMATCH missing ticket returned a body")
+    return len(numbers), mismatches
+
+
+def measure(app, engine, fn, ticket_number, iterations, warmup):
+    samples = []
+    with app.test_request_context(), QueryCounter(engine) as counter:
+        for i in range(warmup + iterations):
+            db.session.remove()
+            counter.reset()
+            started = time.perf_counter()
+            app.json.dumps(fn(ticket_number))
+            elapsed = time.perf_counter() - started
+            if i >= warmup:
+                samples.append(elapsed * 1000)
+        queries = counter.count
+    return queries, samples
+
+
+def run(args):
+    app = build_app()
+    seed_small(app)
+    seed_random(app, tickets=args.tickets)
+    seed_large_ticket(app)
+
+    checked, mismatches = check_equivalence(app)
+    print(f"{checked} ticket(s) compared, {mismatches} mismatch(es)\n")
+
+    with app.app_context():
+        engine = db.engine
+        sizes = {
+            "regular": db.session.scalar(db.select(db.func.min(Ticket.ticket_number))),
+            "large": LARGE_TICKET_NUMBER,
+        }
+
+    print(f"{'ticket':<10}{'path':<8}{'queries':>8}{'p50 ms':>10}{'mean ms':>10}")
+    for size, number in sizes.items():
+        for name, fn in PATHS.items():
+            queries, samples = measure(app, engine, fn, number, args.iterations, args.warmup)
+            print(f"{size:<10}{name:<8}{queries:>8}{statistics.median(samples):>10.2f}{statistics.fmean(samples):>10.2f}")
+
+    client = login(app.test_client())
+    with QueryCounter(engine) as counter:
+        response = client.get(f"/api/read/ticket/{sizes['regular']}")
+    print(f"\nGET /api/read/ticket: HTTP {response.status_code}, {counter.count} statement(s) including the user_loader lookup")
+
+    return 1 if mismatches or response.status_code != 200 else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the ORM and fast ticket detail paths")
+    parser.add_argument("--tickets", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
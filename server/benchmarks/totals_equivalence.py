@@ -0,0 +1,180 @@
+"""
+Property check for the batch totals engine in app/utils/totals.py.
+
+Generates random and edge-case line items (exact half cents, negative prices,
+returns, zero and odd rates, rates finer than a basis point) and checks that
+every engine path matches the Decimal path in LineItem.amounts() exactly,
+then compares compute_totals() against per-object finalizing on whole tickets.
+Also prints a rough timing of both paths.
+
+run from server/:
+    python -m benchmarks.totals_equivalence
+    python -m benchmarks.totals_equivalence --cases 1000000 --seed 7
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from decimal import Decimal
+from app.models import Ticket, Transaction, LineItem
+from app.utils import totals
+
+RATES = ["0", "0.0001", "0.0450", "0.0725", "0.0950", "0.1000", "0.1050", "0.1075", "0.1125", "0.9999"]
+
+
+def half_cent_price(rng, bp):
+    """A price where price * bp ends in exactly half a cent, if the rate allows one"""
+    g = math.gcd(bp, 10000)
+    if 5000 % g:
+        return rng.randint(1, 1_000_000)
+    modulus = 10000 // g
+    base = (5000 // g) * pow(bp // g, -1, modulus) % modulus
+    return base + modulus * rng.randint(0, 1_000_000 // modulus)
+
+
+def random_case(rng):
+    """(unit_price, tax_rate, taxable)"""
+    rate = Decimal(rng.choice(RATES)) if rng.random() < 0.8 else Decimal(rng.randint(0, 9999)) / 10000
+    shape = rng.random()
+    if shape < 0.2:
+        # land exactly on half a cent: price * bp ends in 5000
+        bp = int(rate * 10000) or 1
+        rate = Decimal(bp) / 10000
+        price = half_cent_price(rng, bp)
+    elif shape < 0.3:
+        price = rng.randint(0, 9)
+    else:
+        price = rng.randint(1, 5_000_000)
+    if rng.random() < 0.1:
+        price = -price
+    return price, rate, rng.random() < 0.7
+
+
+def check_amounts(cases):
+    prices, rates, taxable = zip(*cases)
+    started = time.perf_counter()
+    expected = [LineItem.amounts(p, r, t) for p, r, t in cases]
+    timings = {"decimal": time.perf_counter() - started}
+    rates_bp = [totals.rate_to_bp(r) for r in rates]
+
+    runners = {
+        "int": lambda: totals._amounts_int(list(prices), rates_bp, taxable),
+        "batch": lambda: totals.batch_amounts(prices, rates, taxable),
+    }
+    if totals.np is not None:
+        runners["numpy"] = lambda: totals._amounts_numpy(list(prices), rates_bp, taxable)
+
+    paths = {}
+    for name, runner in runners.items():
+        started = time.perf_counter()
+        paths[name] = runner()
+        timings[name] = time.perf_counter() - started
+    print("  " + ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings.items()))
+
+    failures = 0
+    for name, (tax_amounts, line_totals) in paths.items():
+        for case, want, tax, total in zip(cases, expected, tax_amounts, line_totals):
+            if (tax, total) != want:
+                failures += 1
+                if failures <= 10:
+                    print(f"MISMATCH {name} {case}: expected {want}, got {(tax, total)}")
+    return failures, list(paths)
+
+
+def check_fine_rates(rng):
+    """Rates with more than 4 decimals fall back to the Decimal path"""
+    cases = [(rng.randint(-100_000, 100_000), Decimal(f"0.{rng.randint(10**6, 10**7 - 1)}"), True) for _ in range(1000)]
+    prices, rates, taxable = zip(*cases)
+    got = list(zip(*totals.batch_amounts(prices, rates, taxable)))
+    expected = [LineItem.amounts(*case) for case in cases]
+    return sum(1 for a, b in zip(got, expected) if a != b)
+
+
+def build_tickets(rng, count):
+    tickets = []
+    for _ in range(count):
+        ticket = Ticket()
+        for _ in range(rng.randint(1, 3)):
+            tx = Transaction()
+            for _ in range(rng.randint(0, 6)):
+                price, rate, taxable = random_case(rng)
+                tx.line_items.append(LineItem(unit_price=price, tax_rate=rate, taxable=taxable, is_return=rng.random() < 0.15))
+            ticket.transactions.append(tx)
+        tickets.append(ticket)
+    return tickets
+
+
+def finalize_per_object(ticket):
+    """The original finalize_ticket()"""
+    for tx in ticket.transactions:
+        for li in tx.line_items:
+            li.compute_total()
+        tx.units = len(tx.line_items)
+        tx.subtotal = sum((-li.unit_price if li.is_return else li.unit_price) or 0 for li in tx.line_items)
+        tx.tax_total = sum((-li.tax_amount if li.is_return else li.tax_amount) or 0 for li in tx.line_items)
+        tx.total = sum(li.signed_total for li in tx.line_items)
+    ticket.compute_total()
+
+
+def snapshot(ticket):
+    return (
+        ticket.subtotal, ticket.tax_total, ticket.total,
+        [
+            (tx.units, tx.subtotal, tx.tax_total, tx.total, [(li.tax_amount, li.total) for li in tx.line_items])
+            for tx in ticket.transactions
+        ],
+    )
+
+
+def check_tickets(rng, count):
+    state = rng.getstate()
+    expected_tickets = build_tickets(rng, count)
+    rng.setstate(state)
+    actual_tickets = build_tickets(rng, count)
+
+    started = time.perf_counter()
+    for ticket in expected_tickets:
+        finalize_per_object(ticket)
+    per_object = time.perf_counter() - started
+
+    started = time.perf_counter()
+    totals.compute_totals(tickets=actual_tickets)
+    batched = time.perf_counter() - started
+
+    failures = sum(1 for a, b in zip(expected_tickets, actual_tickets) if snapshot(a) != snapshot(b))
+    items = sum(len(tx.line_items) for t in actual_tickets for tx in t.transactions)
+    print(f"  {count:,} tickets / {items:,} line items: per-object {per_object * 1000:.1f}ms, batch {batched * 1000:.1f}ms")
+    return failures
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    cases = [random_case(rng) for _ in range(args.cases)]
+
+    failures, paths = check_amounts(cases)
+    print(f"{len(cases):,} line items checked on paths: {', '.join(paths)}")
+    if totals.np is None:
+        print("  numpy not installed, only the int path was checked")
+
+    fine = check_fine_rates(rng)
+    print(f"Sub basis point rates: {fine} mismatch(es)")
+
+    ticket_failures = check_tickets(rng, args.tickets)
+    print(f"Tickets: {ticket_failures} mismatch(es)")
+
+    total = failures + fine + ticket_failures
+    print(f"\n{total} mismatch(es)")
+    return 1 if total else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check the batch totals engine against the Decimal path")
+    parser.add_argument("--cases", type=int, default=200_000)
+    parser.add_argument("--tickets", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -0,0 +1,212 @@
+"""
+Gunicorn worker models under concurrent load.
+
+Seeds a file database, then for each worker class starts gunicorn with
+gunicorn.conf.py (GUNICORN_WORKER_CLASS set per run) and drives the report
+and ticket endpoints from --concurrency client threads over keep-alive
+connections. Reports requests/sec and p50/p95/p99 latency per endpoint.
+
+The report cache is off so reports are computed every time. Without
+--redis-url the server runs with no redis and signed cookie sessions, a
+per-worker fakeredis couldn't share a login between workers. Worker classes whose package isn't
+installed (gevent) are skipped.
+
+run from server/:
+    python -m benchmarks.worker_models
+    python -m benchmarks.worker_models --models sync gthread --workers 4 --threads 8 --concurrency 32
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from app.extensions import db
+from app.models import Ticket
+from benchmarks.fixtures import BENCH_PASSWORD, BenchConfig, build_app, seed_small, seed_random
+from benchmarks.load import percentile
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+TODAY = date.today()
+MONTH_START = TODAY.replace(day=1)
+
+# package each worker class needs besides gunicorn
+WORKER_PACKAGES = {"sync": None, "gthread": None, "gevent": "gevent"}
+
+
+def endpoints(ticket_number):
+    return {
+        "reports/summary master month": f"/api/reports/summary?start={MONTH_START}&end={TODAY}&type=master",
+        "reports/summary location month": f"/api/reports/summary?start={MONTH_START}&end={TODAY}&type=location&locations=1",
+        "read/tickets 7d page": f"/api/read/tickets?start_date={TODAY - timedelta(days=7)}&end_date={TODAY}",
+        "read/ticket detail": f"/api/read/ticket/{ticket_number}",
+    }
+
+
+def seed(database_uri, tickets):
+    app = build_app(type("WorkerBenchConfig", (BenchConfig,), {"SQLALCHEMY_DATABASE_URI": database_uri}))
+    seed_small(app)
+    seed_random(app, tickets=tickets)
+    with app.app_context():
+        ticket_number = db.session.query(db.func.max(Ticket.ticket_number)).scalar()
+        db.engine.dispose()
+    return ticket_number
+
+
+def start_server(model, args, database_uri):
+    env = {
+        **os.environ,
+        "DATABASE_URI": database_uri,
+        "GUNICORN_WORKER_CLASS": model,
+        "GUNICORN_WORKERS": str(args.workers),
+        "GUNICORN_THREADS": str(args.threads),
+        "GUNICORN_BIND": f"127.0.0.1:{args.port}",
+        "GUNICORN_LOG_LEVEL": "warning",
+        "REPORT_CACHE_ENABLED": "0",
+        "SESSION_TYPE": "redis" if args.redis_url else "cookie",
+        "REDIS_URL": args.redis_url or "",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn ({model}) exited: {process.stderr.read()[-2000:]}")
+        try:
+            status, _, _ = request(http.client.HTTPConnection("127.0.0.1", args.port, timeout=5), "GET", "/api/bootstrap/status")
+            if status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"gunicorn ({model}) did not start within 30s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def request(connection, method, url, body=None, cookie=None):
+    headers = {"Content-Type": "application/json"}
+    if cookie:
+        headers["Cookie"] = cookie
+    connection.request(method, url, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.getheader("Set-Cookie"), response.read()
+
+
+def login(port):
+    status, set_cookie, body = request(
+        http.client.HTTPConnection("127.0.0.1", port, timeout=30), "POST", "/api/auth/login",
+        {"email": "admin@bench.local", "password": BENCH_PASSWORD}
+    )
+    if status != 200 or not set_cookie:
+        raise RuntimeError(f"Benchmark login failed: HTTP {status} {body[:200]}")
+    return set_cookie.split(";", 1)[0]
+
+
+def load(port, url, cookie, total, concurrency):
+    """total GETs of url from concurrency threads -> (requests/sec, latencies ms, errors)"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    remaining = iter(range(total))
+
+    def client():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        own, failed = [], 0
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            started = time.perf_counter()
+            try:
+                status, _, _ = request(connection, "GET", url, cookie=cookie)
+            except (OSError, http.client.HTTPException):
+                # a recycled worker drops its keep-alive connections
+                status = None
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+            own.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                failed += 1
+        with lock:
+            latencies.extend(own)
+            errors.append(failed)
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return total / (time.perf_counter() - started), latencies, sum(errors)
+
+
+def run(args):
+    if importlib.util.find_spec("gunicorn") is None:
+        print("gunicorn is not installed (pip install -r requirements.txt)")
+        return 1
+
+    database = args.database or os.path.join(tempfile.gettempdir(), "cerberus_worker_models.db")
+    database_uri = f"sqlite:///{database}"
+    print(f"Seeding {args.tickets:,} tickets into {database}...")
+    ticket_number = seed(database_uri, args.tickets)
+    targets = endpoints(ticket_number)
+
+    print(f"\n{args.workers} worker(s), {args.threads} thread(s) for gthread, {args.concurrency} concurrent clients\n")
+    print(f"{'model':<10}{'endpoint':<34}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err':>6}")
+    failures = 0
+    for model in args.models:
+        package = WORKER_PACKAGES.get(model)
+        if package and importlib.util.find_spec(package) is None:
+            print(f"{model:<10}skipped, {package} is not installed")
+            continue
+
+        process = start_server(model, args, database_uri)
+        try:
+            cookie = login(args.port)
+            for name, url in targets.items():
+                # warm each worker's caches and connections first
+                load(args.port, url, cookie, args.workers * 2, min(args.concurrency, args.workers * 2))
+                rps, latencies, errors = load(args.port, url, cookie, args.requests, args.concurrency)
+                failures += errors
+                print(
+                    f"{model:<10}{name:<34}{rps:>8.1f}{percentile(latencies, 50):>10.1f}"
+                    f"{percentile(latencies, 95):>10.1f}{percentile(latencies, 99):>10.1f}{errors:>6}"
+                )
+        finally:
+            stop_server(process)
+
+    return 1 if failures else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare gunicorn worker models under concurrent load")
+    parser.add_argument("--models", nargs="+", default=["sync", "gthread", "gevent"], choices=list(WORKER_PACKAGES))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint per model")
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database", help="sqlite file to seed (default: a temp file)")
+    parser.add_argument("--redis-url", help="share sessions through this redis instead of signed cookies")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -1,9 +1,9 @@
 import csv
 from datetime import date
-from decimal import Decimal, ROUND_HALF_UP
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.old_models import EOD as OldEOD, Users as OldUsers
+from app.utils.totals import batch_amounts
 from app.models import Ticket, Transaction, LineItem, Location, User, SalesCategoryEnum, PaymentTypeEnum, TaxabilitySourceEnum
 
 # -------------------------------
@@ -68,13 +68,7 @@ def to_int(val):
 
 def compute_line_item(li, location):
     """Compute tax_amount and total for a line item."""
-    unit_price = Decimal(li.unit_price or 0)
-    tax_rate = Decimal(location.current_tax_rate or 0)
-    if li.taxable:
-        li.tax_amount = int((unit_price * tax_rate).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
-    else:
-        li.tax_amount = 0
-    li.total = int(unit_price) + li.tax_amount
+    (li.tax_amount,), (li.total,) = batch_amounts([li.unit_price], [location.current_tax_rate], [li.taxable])
 
 def compute_transaction(tx):
     for li in tx.line_items:
@@ -1,7 +1,6 @@
 import os 
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import redis
 
 load_dotenv()
 
@@ -9,12 +8,73 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev_secret")
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Database pool, per worker process: GUNICORN_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) has to fit in MySQL's max_connections
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),  # seconds to wait for a connection before erroring
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),  # seconds, keep below MySQL's wait_timeout
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",  # test connections on checkout, MySQL drops idle ones
+    }
+    DB_POOL_SLOW_CHECKOUT_MS = int(os.environ.get("DB_POOL_SLOW_CHECKOUT_MS", 100))  # log waits for a free connection longer than this
+    DB_ISOLATION_LEVEL = os.environ.get("DB_ISOLATION_LEVEL", "")  # MySQL only, empty = READ COMMITTED, which refresh_rollups() relies on
     FLASK_ENV = os.environ.get("FLASK_ENV", "development")
     DEBUG = FLASK_ENV == "development"
     
+    # Reports
+    REPORT_BACKEND = os.environ.get("REPORT_BACKEND", "python")  # python | sql | rollup
+    REPORT_CACHE_ENABLED = os.environ.get("REPORT_CACHE_ENABLED", "1") == "1"
+    REPORT_CACHE_TTL = int(os.environ.get("REPORT_CACHE_TTL", 86400))  # seconds, redis only
+    REPORT_CACHE_MAX_ENTRIES = int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", 256))  # in-process fallback
+    REPORT_CACHE_LOCAL_TTL = int(os.environ.get("REPORT_CACHE_LOCAL_TTL", 30))  # seconds, in-process fallback; other workers see a write after this, 0 = off
+    REPORT_FANOUT_WORKERS = int(os.environ.get("REPORT_FANOUT_WORKERS", 4))  # threads (and db connections) per master/multi_location report, 1 = serial
+    REPORT_FANOUT_BY_MONTH = os.environ.get("REPORT_FANOUT_BY_MONTH", "1") == "1"  # also split partitions by calendar month
+    
+    # Ticket listings
+    TICKET_PAGE_SIZE = int(os.environ.get("TICKET_PAGE_SIZE", 100))
+    TICKET_PAGE_SIZE_MAX = int(os.environ.get("TICKET_PAGE_SIZE_MAX", 500))
+    EXPORT_YIELD_PER = int(os.environ.get("EXPORT_YIELD_PER", 1000))  # rows per fetch when streaming exports
+    BULK_TICKET_MAX = int(os.environ.get("BULK_TICKET_MAX", 1000))  # tickets per /create/tickets/bulk request
+    
+    # Tax rates
+    TAX_RATE_CACHE_TTL = int(os.environ.get("TAX_RATE_CACHE_TTL", 300))  # seconds before a worker reloads tax_rate history
+    TAXABILITY_CACHE_TTL = int(os.environ.get("TAXABILITY_CACHE_TTL", 300))  # seconds before a worker reloads taxability overrides
+    TAX_RECALC_CHUNK_SIZE = int(os.environ.get("TAX_RECALC_CHUNK_SIZE", 1000))  # line items per committed chunk
+    
+    # Background jobs
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))  # threads per worker process
+    JOB_HISTORY = int(os.environ.get("JOB_HISTORY", 100))  # finished jobs kept for polling
+    JOB_RESULT_TTL = int(os.environ.get("JOB_RESULT_TTL", 3600))  # seconds job records/results stay in redis
+    JOB_DEDUPE_TTL = int(os.environ.get("JOB_DEDUPE_TTL", 900))  # longest a job can hold its dedupe key
+    JOB_HEARTBEAT_INTERVAL = int(os.environ.get("JOB_HEARTBEAT_INTERVAL", 10))  # seconds between refreshes of an unfinished job's record
+    JOB_STALE_AFTER = int(os.environ.get("JOB_STALE_AFTER", 60))  # an unfinished job not refreshed for this long died with its worker
+    REPORT_JOB_MAX_WAIT = int(os.environ.get("REPORT_JOB_MAX_WAIT", 30))  # cap on ?wait= long-polls
+    
+    # JSON
+    JSON_PROVIDER = os.environ.get("JSON_PROVIDER", "orjson")  # orjson (stdlib if not installed) | json
+    JSON_STREAM_MIN_ITEMS = int(os.environ.get("JSON_STREAM_MIN_ITEMS", 0))  # stream ticket pages at least this long, 0 = never
+    
+    # Request instrumentation
+    REQUEST_STATS_ENABLED = os.environ.get("REQUEST_STATS_ENABLED", "1") == "1"
+    REQUEST_STATS_WINDOW = int(os.environ.get("REQUEST_STATS_WINDOW", 1000))  # samples kept per route
+    REQUEST_STATS_SLOW_MS = int(os.environ.get("REQUEST_STATS_SLOW_MS", 500))  # log requests slower than this
+    SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "1") == "1"
+    
+    # Auth
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))  # cost for new hashes, other costs are rehashed at login
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))  # bcrypt threads per worker process
+    PASSWORD_QUEUE_TIMEOUT = int(os.environ.get("PASSWORD_QUEUE_TIMEOUT", 10))  # seconds a login waits for bcrypt before a 503
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 30))  # seconds a worker reuses a logged in user's principal, 0 = every request
+    
+    # Redis (sessions, report cache, job records)
+    REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379")  # memory:// = fakeredis, empty = no redis
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", 20))  # pool size per worker process
+    REDIS_POOL_TIMEOUT = int(os.environ.get("REDIS_POOL_TIMEOUT", 5))  # seconds to wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT = int(os.environ.get("REDIS_SOCKET_TIMEOUT", 2))
+    
     # Sessions
-    SESSION_TYPE = "redis"
-    SESSION_REDIS = redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379"))
+    SESSION_TYPE = os.environ.get("SESSION_TYPE", "redis")  # redis (server-side) | cookie (Flask's signed cookie)
     SESSION_COOKIE_SAMESITE = "Lax"
     SESSION_PERMANENT = True
     SESSION_COOKIE_SECURE = FLASK_ENV == "production"   # only secure cookies in prod
@@ -0,0 +1,60 @@
+# Production server profile, run from server/:
+#     gunicorn -c gunicorn.conf.py
+#     GUNICORN_WORKER_CLASS=sync GUNICORN_WORKERS=8 gunicorn -c gunicorn.conf.py
+#
+# Worker models (GUNICORN_WORKER_CLASS):
+#   gthread  default. Threads per worker, bcrypt and I/O waits release the GIL
+#            so one slow login or report doesn't block the worker.
+#   sync     one request per worker, the simplest to reason about.
+#   gevent   greenlets, needs `pip install gevent`. Report generation is CPU
+#            bound and blocks every greenlet in the worker while it runs.
+import multiprocessing
+import os
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # patch before the app (and its db/redis sockets) is imported by preload_app
+    from gevent import monkey
+    monkey.patch_all()
+
+wsgi_app = "wsgi:app"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))  # gthread only
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))  # gevent only
+
+# import the app once in the master, workers fork with it already loaded
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+# recycle workers to cap slow memory growth, jittered so they don't all restart together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))  # long reports run in /reports/jobs, but master month can be slow
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")  # "-" for stdout, off by default
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """
+    With preload_app the master may have opened db connections while the app
+    loaded. Drop the forked copies of the pool without closing the sockets,
+    which still belong to the master, so each worker opens its own.
+    redis-py already resets its pool when it sees a new pid.
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from app.extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    server.log.info(f"[GUNICORN]: worker {worker.pid} reset its db pool")
@@ -0,0 +1,51 @@
+"""daily sales rollup
+
+Revision ID: 2740c2e16d68
+Revises: 79f96a3b274c
+Create Date: 2026-10-18 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2740c2e16d68'
+down_revision = '79f96a3b274c'
+branch_labels = None
+depends_on = None
+
+
+SALES_CATEGORIES = (
+    'NEW_APPLIANCE', 'USED_APPLIANCE', 'EXTENDED_WARRANTY', 'DIAGNOSTIC_FEE',
+    'IN_SHOP_REPAIR', 'LABOR', 'PARTS', 'DELIVERY', 'EBAY_SALE',
+)
+PAYMENT_TYPES = (
+    'CASH', 'CHECK', 'CARD', 'EBAY_PAYMENT', 'STRIPE_PAYMENT', 'ACIMA',
+    'TOWER_LOAN', 'SNAP',
+)
+
+
+def upgrade():
+    op.create_table(
+        'daily_sales_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.Enum(*SALES_CATEGORIES, name='sales_category_enum', native_enum=False), nullable=False),
+        sa.Column('payment_type', sa.Enum(*PAYMENT_TYPES, name='payment_type_enum', native_enum=False), nullable=False),
+        sa.Column('subtotal', sa.Integer(), nullable=False),
+        sa.Column('tax', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('date', 'location_id', 'user_id', 'category', 'payment_type', name='uq_daily_sales_rollup_key'),
+    )
+    # Backfill with: python rebuild_rollups.py
+
+
+def downgrade():
+    op.drop_table('daily_sales_rollup')
@@ -0,0 +1,31 @@
+"""ticket keyset indexes
+
+Revision ID: 4255e7f765db
+Revises: 2740c2e16d68
+Create Date: 2026-10-18 10:03:27.904431
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4255e7f765db'
+down_revision = '2740c2e16d68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.create_index('ix_tickets_date_number', ['ticket_date', 'ticket_number'], unique=False)
+        batch_op.create_index('ix_tickets_user_date_number', ['user_id', 'ticket_date', 'ticket_number'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        # on MySQL this index is also the user_id foreign key's, which needs one to drop it
+        if op.get_bind().dialect.name == 'mysql':
+            batch_op.create_index('ix_tickets_user_id', ['user_id'], unique=False)
+        batch_op.drop_index('ix_tickets_user_date_number')
+        batch_op.drop_index('ix_tickets_date_number')
@@ -0,0 +1,44 @@
+"""taxability overrides
+
+Revision ID: 5b1e9d3c7a20
+Revises: ca7e47b4ff14
+Create Date: 2026-10-18 12:02:37.804113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e9d3c7a20'
+down_revision = 'ca7e47b4ff14'
+branch_labels = None
+depends_on = None
+
+
+SALES_CATEGORIES = (
+    'NEW_APPLIANCE', 'USED_APPLIANCE', 'EXTENDED_WARRANTY', 'DIAGNOSTIC_FEE',
+    'IN_SHOP_REPAIR', 'LABOR', 'PARTS', 'DELIVERY', 'EBAY_SALE',
+)
+PAYMENT_TYPES = (
+    'CASH', 'CHECK', 'CARD', 'EBAY_PAYMENT', 'STRIPE_PAYMENT', 'ACIMA',
+    'TOWER_LOAN', 'SNAP',
+)
+
+
+def upgrade():
+    op.create_table(
+        'taxability_overrides',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.Enum(*SALES_CATEGORIES, name='sales_category_enum', native_enum=False), nullable=True),
+        sa.Column('payment_type', sa.Enum(*PAYMENT_TYPES, name='payment_type_enum', native_enum=False), nullable=True),
+        sa.Column('taxable', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('location_id', 'category', 'payment_type', name='uq_taxability_override_rule'),
+    )
+
+
+def downgrade():
+    op.drop_table('taxability_overrides')
@@ -0,0 +1,33 @@
+"""rollup slice locks
+
+Revision ID: 8d3f1a6b2c47
+Revises: 5b1e9d3c7a20
+Create Date: 2026-10-18 15:20:11.402871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3f1a6b2c47'
+down_revision = '5b1e9d3c7a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # rows are created on demand by refresh_rollups(), no backfill needed
+    op.create_table(
+        'daily_sales_rollup_locks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('date', 'location_id', 'user_id', name='uq_daily_sales_rollup_lock_slice'),
+    )
+
+
+def downgrade():
+    op.drop_table('daily_sales_rollup_locks')
@@ -0,0 +1,68 @@
+"""hot path indexes
+
+Revision ID: ca7e47b4ff14
+Revises: 4255e7f765db
+Create Date: 2026-10-18 10:41:09.127356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ca7e47b4ff14'
+down_revision = '4255e7f765db'
+branch_labels = None
+depends_on = None
+
+
+# table -> [(index name, columns)]
+# checked against the real queries with: python -m benchmarks.explain_hot_queries
+# line_items.transaction_id and transactions.ticket_id are served by the index
+# InnoDB creates for their foreign keys
+INDEXES = {
+    'transactions': [
+        ('ix_transactions_posted_date', ['posted_date']),
+        ('ix_transactions_user_posted', ['user_id', 'posted_date']),
+        ('ix_transactions_location_posted', ['location_id', 'posted_date']),
+    ],
+    'deductions': [
+        ('ix_deductions_date', ['date']),
+        ('ix_deductions_user_date', ['user_id', 'date']),
+    ],
+    'tax_rate': [
+        ('ix_tax_rate_location_active', ['location_id', 'effective_to', 'effective_from']),
+    ],
+    'daily_sales_rollup': [
+        ('ix_daily_sales_rollup_user_date', ['user_id', 'date']),
+        ('ix_daily_sales_rollup_location_date', ['location_id', 'date']),
+    ],
+}
+
+# foreign key columns the indexes above lead with. InnoDB drops the index it
+# created for such a key once another index starts with the column, and won't
+# let that one be dropped while the constraint needs it
+FOREIGN_KEYS = {
+    'transactions': ['user_id', 'location_id'],
+    'deductions': ['user_id'],
+    'tax_rate': ['location_id'],
+    'daily_sales_rollup': ['user_id', 'location_id'],
+}
+
+
+def upgrade():
+    for table, indexes in INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in indexes:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    mysql = op.get_bind().dialect.name == 'mysql'
+    for table, indexes in INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in reversed(indexes):
+                # give the foreign key its own index back first
+                if mysql and columns[0] in FOREIGN_KEYS.get(table, []):
+                    batch_op.create_index(f'ix_{table}_{columns[0]}', [columns[0]], unique=False)
+                batch_op.drop_index(name)
@@ -0,0 +1,34 @@
+"""
+Backfill daily_sales_rollup from line items.
+
+usage (from server/):
+    python rebuild_rollups.py                         # everything
+    python rebuild_rollups.py 2026-01-01              # from a date on
+    python rebuild_rollups.py 2026-01-01 2026-01-31   # a date range
+"""
+import sys
+from datetime import datetime
+
+args = sys.argv[1:]
+try:
+    start_date = datetime.strptime(args[0], "%Y-%m-%d").date() if len(args) > 0 else None
+    end_date = datetime.strptime(args[1], "%Y-%m-%d").date() if len(args) > 1 else None
+except ValueError:
+    print("Invalid date format, use YYYY-MM-DD")
+    sys.exit(1)
+
+print("Importing extensions")
+from app import create_app
+from app.extensions import db
+from app.services.rollup_service import rebuild_rollups
+from app.services.report_cache import report_cache
+
+print("creating application")
+app = create_app()
+with app.app_context():
+    print(f"rebuilding rollups: {start_date or 'beginning'} -> {end_date or 'today'}")
+    rows = rebuild_rollups(start_date, end_date)
+    db.session.commit()
+    report_cache.clear()
+
+print(f"Rollups rebuilt! {rows} rows written")
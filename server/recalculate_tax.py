@@ -0,0 +1,49 @@
+"""
+Recompute line item tax for a location after a tax rate change or correction.
+
+Uses the rate in effect on each posted date from the tax_rate history, or a
+fixed rate with --rate. Transaction/ticket totals, rollups and cached reports
+are updated as it goes.
+
+usage (from server/):
+    python recalculate_tax.py 1 2026-01-01                          # location 1 from a date on
+    python recalculate_tax.py 1 2026-01-01 2026-01-31 --dry-run     # just show the diff
+    python recalculate_tax.py 1 2026-01-01 --rate 0.1075
+"""
+import argparse
+import json
+from datetime import datetime
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+parser = argparse.ArgumentParser(description="Recompute line item tax for a location")
+parser.add_argument("location_id", type=int)
+parser.add_argument("start_date", type=parse_date)
+parser.add_argument("end_date", type=parse_date, nargs="?")
+parser.add_argument("--rate", type=float)
+parser.add_argument("--dry-run", action="store_true")
+parser.add_argument("--chunk-size", type=int, default=1000)
+args = parser.parse_args()
+
+print("Importing extensions")
+from app import create_app
+from app.services.tax_recalc_service import recalculate_tax
+
+
+def progress(scanned, total, summary):
+    print(f"  {scanned:,} / {total:,} line items scanned, {summary['changed']:,} changed")
+
+
+print("creating application")
+app = create_app()
+with app.app_context():
+    print(f"recalculating tax for location {args.location_id}: {args.start_date} -> {args.end_date or 'open'}{' (dry run)' if args.dry_run else ''}")
+    summary = recalculate_tax(
+        args.location_id, args.start_date, args.end_date,
+        rate=args.rate, dry_run=args.dry_run, chunk_size=args.chunk_size, progress=progress
+    )
+
+print(json.dumps(summary, indent=2))
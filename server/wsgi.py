@@ -1,5 +1,6 @@
 from app import create_app
 
+# production: gunicorn -c gunicorn.conf.py (serves wsgi:app), this file's __main__ is the dev server
 app = create_app()
 
 if __name__ == "__main__":